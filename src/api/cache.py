@@ -0,0 +1,94 @@
+"""
+Cached JSON responses with ETag / If-None-Match handling.
+
+ETags are derived from the write version, the cache key and the body, and
+are stored with the cached entry. A matching If-None-Match is answered with
+304 without database work while that entry is live; once it is evicted or
+expired the response is rendered again and compared by its new ETag.
+"""
+import hashlib
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.cache import VersionedCache, write_version
+from ..core.routing import RoutingSession
+
+# (body, extra headers) of a rendered response; None when there is nothing to return
+Rendered = Optional[Tuple[bytes, Dict[str, str]]]
+
+
+def cache_key(request: Request, db: AsyncSession) -> str:
+    """Database, path and sorted query parameters of a request."""
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"{db.get_bind().url}|{request.url.path}?{query}"
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _may_be_stale(db: Optional[AsyncSession]) -> bool:
+    # A lagging replica's answer must not be stored under the current version
+    session = db.sync_session if db is not None else None
+    return isinstance(session, RoutingSession) and session.replica_may_lag(write_version.bumped_at)
+
+
+class ResponseCache:
+    """Serves rendered GET responses from a VersionedCache."""
+
+    def __init__(self, cache: Optional[VersionedCache] = None):
+        self.cache = cache if cache is not None else VersionedCache()
+
+    def etag(self, key: str, version: int, body: bytes) -> str:
+        digest = hashlib.sha1(f"{write_version.epoch}:{version}:{key}:".encode())
+        digest.update(body)
+        return f'"{digest.hexdigest()[:20]}"'
+
+    async def respond(
+        self,
+        request: Request,
+        key: str,
+        render: Callable[[], Awaitable[Rendered]],
+        db: Optional[AsyncSession] = None
+    ) -> Optional[Response]:
+        """
+        Answer from the cache, or render, store and return the response.
+
+        Args:
+            request: Incoming request, checked for If-None-Match
+            key: Cache key, usually cache_key(request, db)
+            render: Produces the JSON body and headers; None means not found
+            db: Session render() reads through; replica reads made shortly
+                after a write are served but not cached
+
+        Returns:
+            Optional[Response]: 304, cached or fresh 200 response; None if
+            render() returned None (nothing is cached)
+        """
+        # write_version only counts this process's writes. Other workers, jobs
+        # in other processes and replicas catching up change data without
+        # moving it, so a 304 is only given for an entry still within its TTL
+        # or for a body just rendered, never from the version alone.
+        version = self.cache.version.value
+        cached = self.cache.get(key)
+        if cached is None:
+            rendered = await render()
+            if rendered is None:
+                return None
+            body, headers = rendered
+            cached = (self.etag(key, version, body), body, headers)
+            if not _may_be_stale(db):
+                self.cache.set(key, cached, version)
+        etag, body, headers = cached
+        if _matches(request.headers.get("if-none-match"), etag):
+            self.cache.stats.not_modified += 1
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(body, media_type="application/json", headers={**headers, "ETag": etag})
+
+
+response_cache = ResponseCache()
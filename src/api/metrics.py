@@ -0,0 +1,73 @@
+"""
+Per-route request metrics.
+
+MetricsMiddleware is plain ASGI so it adds no per-request task or body
+copying. Requests are labelled by the matched route template (e.g.
+/tasks/{task_id}), which Starlette leaves in scope["route"], never by the
+raw path, so ids cannot blow up the number of series. The SQL hooks in
+core.metrics add each statement to the request's RequestSql, giving the
+query count and database time per route.
+"""
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.metrics import RequestSql, counter, current_request_sql, histogram
+
+# Label for requests no route matched (404s, probes)
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Buckets for the number of SQL statements per request
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+HTTP_REQUEST_SECONDS = histogram(
+    "dayplanner_http_request_duration_seconds", "HTTP request latency by route",
+    ("method", "route", "status")
+)
+HTTP_REQUESTS = counter(
+    "dayplanner_http_requests_total", "HTTP requests handled", ("method", "route", "status")
+)
+HTTP_REQUEST_QUERIES = histogram(
+    "dayplanner_http_request_sql_queries", "SQL statements per request", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS
+)
+HTTP_REQUEST_SQL_SECONDS = histogram(
+    "dayplanner_http_request_sql_seconds", "Database time per request", ("method", "route")
+)
+
+
+def route_label(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        sql = RequestSql()
+        token = current_request_sql.set(sql)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request_sql.reset(token)
+            method, route = scope["method"], route_label(scope)
+            HTTP_REQUEST_SECONDS.observe(elapsed, method, route, str(status))
+            HTTP_REQUESTS.inc(1.0, method, route, str(status))
+            HTTP_REQUEST_QUERIES.observe(sql.queries, method, route)
+            HTTP_REQUEST_SQL_SECONDS.observe(sql.seconds, method, route)
@@ -1,8 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from ..core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
+from ..core.database import get_async_db, get_async_read_db
+from .cache import cache_key, response_cache
 from ..core.task_manager import Task, Category, TimeTracking
+from ..models.schemas import BulkImportResult, TaskFilter
+from ..services.bulk_service import BulkTaskService
+from ..services.task_service import TaskService, parse_fields
+from .serialization import RowsResponse, encode_rows_ndjson
 from pydantic import BaseModel
 from datetime import date
 
@@ -25,34 +32,80 @@ class TaskResponse(BaseModel):
     class Config:
         from_attributes = True
 
+TASK_RESPONSE_FIELDS = tuple(TaskResponse.model_fields)
+
 @router.post("/tasks/", response_model=TaskResponse)
-def create_task(task: TaskCreate, db: Session = Depends(get_db)):
+async def create_task(task: TaskCreate, db: AsyncSession = Depends(get_async_db)):
     db_task = Task(
         title=task.title,
         due_date=task.due_date,
         priority=task.priority
     )
-    
+
     if task.category_ids:
-        categories = db.query(Category).filter(
-            Category.id.in_(task.category_ids)
-        ).all()
-        db_task.categories = categories
-    
+        categories = await db.scalars(
+            select(Category).filter(Category.id.in_(task.category_ids))
+        )
+        db_task.categories = list(categories)
+
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    await db.commit()
+    await db.refresh(db_task)
     return db_task
 
 @router.get("/tasks/", response_model=List[TaskResponse])
-def get_tasks(db: Session = Depends(get_db)):
-    return db.query(Task).all()
+async def get_tasks(
+    filters: TaskFilter = Depends(),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    fields: Optional[str] = Query(None, description="Comma-separated subset of id,title,completed,due_date,priority"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    try:
+        selected = parse_fields(fields, TASK_RESPONSE_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    task_service = TaskService(db)
+    if stream:
+        batches = task_service.stream_task_rows(filters, selected)
+        return StreamingResponse(
+            (encode_rows_ndjson(selected, batch) async for batch in batches), media_type="application/x-ndjson"
+        )
+    try:
+        rows, next_page = await task_service.list_task_rows(filters, limit, cursor, selected)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return RowsResponse(selected, rows, headers={"X-Next-Cursor": next_page} if next_page else None)
+
+@router.post("/tasks/bulk", response_model=BulkImportResult)
+async def bulk_import_tasks(request: Request, db: AsyncSession = Depends(get_async_db)):
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("text/csv"):
+        fmt = "csv"
+    elif content_type.startswith(("application/x-ndjson", "application/jsonl")):
+        fmt = "ndjson"
+    else:
+        raise HTTPException(status_code=415, detail="Use text/csv or application/x-ndjson")
+    return await BulkTaskService(db).import_tasks(request.stream(), fmt)
+
+@router.get("/tasks/bulk")
+async def bulk_export_tasks(
+    format: Literal["csv", "ndjson"] = "ndjson",
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(BulkTaskService(db).export_tasks(format), media_type=media_type)
 
 @router.get("/tasks/{task_id}", response_model=TaskResponse)
-def get_task(task_id: int, db: Session = Depends(get_db)):
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
+async def get_task(request: Request, task_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    async def render():
+        task = await db.get(Task, task_id)
+        return None if task is None else (TaskResponse.model_validate(task).model_dump_json().encode(), {})
+
+    response = await response_cache.respond(request, cache_key(request, db), render, db)
+    if response is None:
         raise HTTPException(status_code=404, detail="Task not found")
-    return task
+    return response
 
 # Add more routes as needed
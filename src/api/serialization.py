@@ -0,0 +1,55 @@
+"""
+Direct JSON encoding of projected rows.
+
+Listing endpoints select only the columns a response needs, as tuples, and
+encode them here without building ORM objects or Pydantic models. orjson
+does the encoding when installed (dates come out as ISO strings, like
+Pydantic's); the standard library is the fallback.
+"""
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, Mapping, Optional, Sequence
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Compact JSON, as bytes."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(",", ":"), default=_default).encode()
+
+
+def encode_rows(fields: Sequence[str], rows: Iterable[Sequence[Any]]) -> bytes:
+    """JSON array with one object per row, keys in the order of fields."""
+    return dumps([dict(zip(fields, row)) for row in rows])
+
+
+def encode_rows_ndjson(fields: Sequence[str], rows: Iterable[Sequence[Any]]) -> bytes:
+    """One JSON object per line, for streamed listings."""
+    return b"".join(dumps(dict(zip(fields, row))) + b"\n" for row in rows)
+
+
+class RowsResponse(Response):
+    """Encodes (fields, rows) straight to a JSON array of objects."""
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        fields: Sequence[str],
+        rows: Iterable[Sequence[Any]],
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None
+    ):
+        super().__init__(encode_rows(fields, rows), status_code, headers)
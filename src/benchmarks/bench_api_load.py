@@ -0,0 +1,177 @@
+"""
+Concurrent load test comparing the old blocking handlers with the async session path.
+
+Reads and writes are reported separately as well: on SQLite every write
+waits for the single write lock, so the write tail says more about the
+database than about the handlers.
+
+The "blocking" app reproduces the previous handler shape: ``async def`` endpoints
+that run queries on a synchronous Session, stalling the event loop. The "async"
+app is the real application wired to an AsyncSession.
+
+Usage:
+    python -m src.benchmarks.bench_api_load --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..core.database import Base, build_async_engine, build_engine, get_async_db, get_async_read_db
+from ..core.routing import DatabaseRouter
+from ..core.task_manager import Category, Task
+
+
+def seed(sync_engine, tasks: int) -> None:
+    with Session(sync_engine) as db:
+        work = Category(name="Work", color="#0000ff")
+        db.add(work)
+        for i in range(tasks):
+            db.add(Task(
+                title=f"Task {i}",
+                due_date=date.today() - timedelta(days=i % 7),
+                priority=i % 5 + 1,
+                estimated_minutes=30,
+                categories=[work] if i % 2 else [],
+            ))
+        db.commit()
+
+
+def blocking_app(sync_engine) -> FastAPI:
+    SyncSession = sessionmaker(bind=sync_engine, autoflush=False)
+
+    def get_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+
+    @app.get("/api/tasks/{task_id}")
+    async def get_task(task_id: int, db: Session = Depends(get_db)):
+        task = db.get(Task, task_id)
+        return {"id": task.id, "title": task.title}
+
+    @app.get("/tasks")
+    async def get_tasks(db: Session = Depends(get_db)):
+        return [{"id": t.id, "title": t.title} for t in db.scalars(select(Task).limit(200))]
+
+    @app.get("/categories/{category}/workload")
+    async def get_category_workload(category: str, db: Session = Depends(get_db)):
+        rows = db.scalars(
+            select(Task).join(Task.categories).where(Category.name == category)
+        ).all()
+        return {"category": category, "total_tasks": len(rows)}
+
+    @app.post("/tasks")
+    async def add_task(payload: Dict, db: Session = Depends(get_db)):
+        task = Task(title=payload["title"], due_date=date.fromisoformat(payload["due_date"]),
+                    priority=payload["priority"])
+        db.add(task)
+        db.commit()
+        return {"id": task.id}
+
+    return app
+
+
+async def drive(app: FastAPI, total: int, concurrency: int, task_count: int) -> Dict[str, List[float]]:
+    latencies: Dict[str, List[float]] = {"GET": [], "POST": []}
+    rng = random.Random(42)
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(total):
+        roll = rng.random()
+        if roll < 0.6:
+            queue.put_nowait(("GET", f"/api/tasks/{rng.randint(1, task_count)}", None))
+        elif roll < 0.8:
+            queue.put_nowait(("GET", "/categories/Work/workload", None))
+        else:
+            queue.put_nowait(("POST", "/tasks", {
+                "title": f"Load {i}", "due_date": str(date.today()), "priority": 3,
+            }))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            while not queue.empty():
+                method, url, body = queue.get_nowait()
+                started = time.perf_counter()
+                await client.request(method, url, json=body)
+                latencies[method].append((time.perf_counter() - started) * 1000)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def percentiles(latencies: List[float]) -> str:
+    ordered = sorted(latencies)
+    p50 = statistics.median(ordered)
+    p99 = ordered[max(int(len(ordered) * 0.99) - 1, 0)]
+    return f"p50={p50:7.2f}ms  p99={p99:7.2f}ms"
+
+
+def report(label: str, latencies: Dict[str, List[float]], elapsed: float) -> None:
+    """Overall throughput and latency, then reads and writes separately."""
+    combined = latencies["GET"] + latencies["POST"]
+    print(f"{label:>9}: {len(combined) / elapsed:8.1f} req/s  {percentiles(combined)}")
+    print(f"{'reads':>9}:  {percentiles(latencies['GET'])}")
+    print(f"{'writes':>9}:  {percentiles(latencies['POST'])}")
+
+
+async def run(total: int, concurrency: int, task_count: int) -> None:
+    from ..main import app as async_app
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label in ("blocking", "async"):
+            path = Path(tmp) / f"{label}.db"
+            # Sized so the blocking app is limited by the event loop, not pool checkout
+            sync_engine = build_engine(f"sqlite:///{path}", pool_size=concurrency, max_overflow=0)
+            Base.metadata.create_all(bind=sync_engine)
+            seed(sync_engine, task_count)
+
+            if label == "blocking":
+                app = blocking_app(sync_engine)
+                async_engine = None
+            else:
+                async_engine = build_async_engine(f"sqlite+aiosqlite:///{path}")
+                router = DatabaseRouter(async_engine)
+
+                async def override():
+                    async with router.session() as db:
+                        yield db
+
+                async_app.dependency_overrides[get_async_db] = override
+                async_app.dependency_overrides[get_async_read_db] = override
+                app = async_app
+
+            started = time.perf_counter()
+            latencies = await drive(app, total, concurrency, task_count)
+            report(label, latencies, time.perf_counter() - started)
+
+            if async_engine is not None:
+                async_app.dependency_overrides.clear()
+                await async_engine.dispose()
+            sync_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency, args.tasks))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Throughput benchmark for chunked bulk task import and streaming export.
+
+Usage:
+    python -m src.benchmarks.bench_bulk_import --rows 1000000
+"""
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import AsyncIterator
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..core.database import Base, build_async_engine, build_engine
+from ..core.task_manager import Category
+from ..services.bulk_service import IMPORT_CHUNK_SIZE, BulkTaskService
+
+
+async def synthetic_body(rows: int, categories: int) -> AsyncIterator[bytes]:
+    rng = random.Random(7)
+    start = date.today()
+    for i in range(rows):
+        yield json.dumps({
+            "title": f"Imported task {i}",
+            "due_date": (start + timedelta(days=rng.randint(-30, 60))).isoformat(),
+            "priority": rng.randint(1, 5),
+            "estimated_minutes": rng.choice([15, 30, 45, 60, 90]),
+            "category_ids": rng.sample(range(1, categories + 1), rng.randint(0, 2)),
+        }).encode() + b"\n"
+
+
+async def run(rows: int, chunk_size: int, categories: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bulk.db"
+        sync_engine = build_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=sync_engine)
+        with Session(sync_engine) as db:
+            db.add_all(Category(id=i, name=f"Category {i}", color="#808080") for i in range(1, categories + 1))
+            db.commit()
+        sync_engine.dispose()
+
+        async_engine = build_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with AsyncSession(async_engine) as db:
+            started = time.perf_counter()
+            result = await BulkTaskService(db, chunk_size).import_tasks(synthetic_body(rows, categories))
+            elapsed = time.perf_counter() - started
+            print(f"import: {result.imported} rows in {elapsed:.1f}s -> {result.imported / elapsed:,.0f} rows/sec")
+
+            started = time.perf_counter()
+            exported = 0
+            async for block in BulkTaskService(db).export_tasks("ndjson"):
+                exported += block.count("\n")
+            elapsed = time.perf_counter() - started
+            print(f"export: {exported} rows in {elapsed:.1f}s -> {exported / elapsed:,.0f} rows/sec")
+        await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    parser.add_argument("--categories", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.chunk_size, args.categories))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Benchmark subtree queries over deep and wide category trees: closure table vs
+walking parent_id one level per query.
+
+Usage:
+    python -m src.benchmarks.bench_hierarchy --depth 500 --fanout 10 --levels 4 --tasks 200000
+"""
+import argparse
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from ..core import hierarchy
+from ..core.database import Base, build_engine
+from ..core.task_manager import Category, Task, task_category
+from ..models.schemas import TaskFilter
+from ..services.task_service import filter_task_query
+
+PAGE_SIZE = 100
+
+
+def deep_tree(depth: int) -> List[Tuple[int, int]]:
+    """A single chain: (id, parent_id) pairs."""
+    return [(i, i - 1 if i > 1 else None) for i in range(1, depth + 1)]
+
+
+def wide_tree(fanout: int, levels: int) -> List[Tuple[int, int]]:
+    nodes = [(1, None)]
+    frontier = [1]
+    for _ in range(levels):
+        next_frontier = []
+        for parent in frontier:
+            for _ in range(fanout):
+                nodes.append((len(nodes) + 1, parent))
+                next_frontier.append(len(nodes))
+        frontier = next_frontier
+    return nodes
+
+
+def seed(sync_engine, nodes: List[Tuple[int, int]], tasks: int) -> float:
+    rng = random.Random(4)
+    today = date.today()
+    started = time.perf_counter()
+    with sync_engine.begin() as conn:
+        # Parents are inserted before children so the insert trigger sees their paths
+        conn.execute(insert(Category), [
+            {"id": i, "name": f"Category {i}", "color": "#808080", "parent_id": parent} for i, parent in nodes
+        ])
+    elapsed = time.perf_counter() - started
+    with sync_engine.begin() as conn:
+        conn.execute(insert(Task), [
+            {"id": i, "title": f"Task {i}", "priority": rng.randint(1, 5), "completed": rng.random() < 0.3,
+             "due_date": today - timedelta(days=rng.randint(0, 6)), "estimated_minutes": 30}
+            for i in range(1, tasks + 1)
+        ])
+        conn.execute(insert(task_category), [
+            {"task_id": i, "category_id": rng.randint(1, len(nodes))} for i in range(1, tasks + 1)
+        ])
+    return elapsed
+
+
+def walk_subtree(db: Session, root: int) -> List[int]:
+    """The previous approach: one query per tree level."""
+    ids, level = [root], [root]
+    while level:
+        level = list(db.scalars(select(Category.id).where(Category.parent_id.in_(level))))
+        ids.extend(level)
+    return ids
+
+
+def timed(fn: Callable[[], object], repeat: int = 5) -> Tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def run_tree(label: str, nodes: List[Tuple[int, int]], tasks: int, root: int, leaf: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_engine = build_engine(f"sqlite:///{Path(tmp) / 'tree.db'}")
+        Base.metadata.create_all(bind=sync_engine)
+        insert_seconds = seed(sync_engine, nodes, tasks)
+        print(f"{label}: {len(nodes)} categories, {tasks} tasks, category insert {insert_seconds * 1000:.0f} ms")
+
+        window = Task.due_date >= date.today() - timedelta(days=6)
+        with Session(sync_engine) as db:
+            # First page of GET /tasks, as the listing endpoint orders it
+            def naive_page():
+                linked = select(task_category.c.task_id).where(
+                    task_category.c.category_id.in_(walk_subtree(db, root))
+                )
+                return list(db.scalars(select(Task.id).where(Task.id.in_(linked))
+                                       .order_by(Task.due_date, Task.priority, Task.id).limit(PAGE_SIZE)))
+
+            def closure_page():
+                stmt = filter_task_query(select(Task.id), TaskFilter(category_subtree=root))
+                return list(db.scalars(stmt.limit(PAGE_SIZE)))
+
+            def naive_count():
+                return db.scalar(select(func.count(func.distinct(task_category.c.task_id)))
+                                 .where(task_category.c.category_id.in_(walk_subtree(db, root))))
+
+            def closure_count():
+                return db.scalar(select(func.count()).select_from(Task)
+                                 .where(Task.id.in_(hierarchy.subtree_task_ids(root))))
+
+            def closure_workload():
+                return db.execute(select(func.count(), func.sum(Task.estimated_minutes))
+                                  .where(Task.id.in_(hierarchy.subtree_task_ids(root)), window)).one()
+
+            def naive_ancestors():
+                path, current = [], db.get(Category, leaf).parent_id
+                while current is not None:
+                    path.append(current)
+                    current = db.scalar(select(Category.parent_id).where(Category.id == current))
+                return path
+
+            def closure_ancestors():
+                return list(db.scalars(hierarchy.ancestors(leaf)))
+
+            for name, fn in (
+                ("first page, level walk", naive_page),
+                ("first page, closure", closure_page),
+                ("subtree count, level walk", naive_count),
+                ("subtree count, closure", closure_count),
+                ("subtree workload, closure", closure_workload),
+                ("ancestors, parent walk", naive_ancestors),
+                ("ancestors, closure", closure_ancestors),
+            ):
+                seconds, result = timed(fn)
+                size = len(result) if isinstance(result, list) else result
+                print(f"  {name:28} {seconds * 1000:9.2f} ms  ({size})")
+
+            # Move the first child's subtree under the last leaf's parent
+            child = nodes[1][0]
+            new_parent = nodes[-1][1]
+            if new_parent is not None and new_parent not in walk_subtree(db, child):
+                started = time.perf_counter()
+                db.execute(update(Category).where(Category.id == child).values(parent_id=new_parent))
+                db.commit()
+                print(f"  {'move subtree':28} {(time.perf_counter() - started) * 1000:9.2f} ms")
+        sync_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--depth", type=int, default=500)
+    parser.add_argument("--fanout", type=int, default=10)
+    parser.add_argument("--levels", type=int, default=4)
+    parser.add_argument("--tasks", type=int, default=200_000)
+    args = parser.parse_args()
+    run_tree("deep", deep_tree(args.depth), args.tasks, root=args.depth // 2, leaf=args.depth)
+    wide = wide_tree(args.fanout, args.levels)
+    run_tree("wide", wide, args.tasks, root=2, leaf=len(wide))
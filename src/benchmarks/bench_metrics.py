@@ -0,0 +1,94 @@
+"""
+Cost of the metrics instrumentation: histogram observe() on its own, SQL
+statements on an engine with and without the cursor hooks, and requests
+through a small app with and without MetricsMiddleware.
+
+Usage:
+    python -m src.benchmarks.bench_metrics --observations 200000 --queries 20000 --requests 5000
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+
+from ..api.metrics import MetricsMiddleware
+from ..core.metrics import REGISTRY, Histogram, instrument_engine
+
+
+def bench_observe(observations: int) -> None:
+    hist = Histogram("bench_seconds", "benchmark", ("route",))
+    values = [(i % 1000) / 10_000 for i in range(observations)]
+    started = time.perf_counter()
+    for value in values:
+        hist.observe(value, "/tasks")
+    elapsed = time.perf_counter() - started
+    print(f"{'histogram observe':>22}: {elapsed / observations * 1e9:8.0f} ns/op")
+
+
+def bench_sql(queries: int) -> None:
+    results = {}
+    for label in ("plain engine", "instrumented engine"):
+        engine = create_engine("sqlite://")
+        if label == "instrumented engine":
+            instrument_engine(engine)
+        with engine.connect() as conn:
+            statement = text("SELECT :x")
+            for i in range(1000):
+                conn.execute(statement, {"x": i})
+            started = time.perf_counter()
+            for i in range(queries):
+                conn.execute(statement, {"x": i})
+            results[label] = (time.perf_counter() - started) / queries * 1e6
+        engine.dispose()
+        print(f"{label:>22}: {results[label]:8.2f} us/query")
+    print(f"{'hook overhead':>22}: {results['instrumented engine'] - results['plain engine']:8.2f} us/query")
+
+
+def build_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def bench_http(requests: int, rounds: int = 3) -> None:
+    # Alternate the two apps and keep each one's best round; single runs are noisy
+    results = {"without middleware": float("inf"), "with middleware": float("inf")}
+    for _ in range(rounds):
+        for label in results:
+            app = build_app(label == "with middleware")
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+                for i in range(200):
+                    await client.get(f"/items/{i}")
+                started = time.perf_counter()
+                for i in range(requests):
+                    await client.get(f"/items/{i}")
+                results[label] = min(results[label], (time.perf_counter() - started) / requests * 1e6)
+    for label, micros in results.items():
+        print(f"{label:>22}: {micros:8.1f} us/request")
+    overhead = results["with middleware"] - results["without middleware"]
+    print(f"{'middleware overhead':>22}: {overhead:8.1f} us/request "
+          f"({overhead / results['without middleware']:.1%})")
+
+    started = time.perf_counter()
+    body = REGISTRY.render()
+    print(f"{'render /metrics':>22}: {(time.perf_counter() - started) * 1000:8.2f} ms ({len(body):,} bytes)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--observations", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    bench_observe(args.observations)
+    bench_sql(args.queries)
+    asyncio.run(bench_http(args.requests))
@@ -0,0 +1,57 @@
+"""
+Reminder burst: sending each reminder synchronously vs the dispatcher, with a
+backend that takes a fixed time per message (like a desktop or push API).
+
+Usage:
+    python -m src.benchmarks.bench_notifications --reminders 100000 --recipients 200 --send-ms 2
+"""
+import argparse
+import time
+
+from ..utils.notification import Notification, NotificationDispatcher, Reminder
+
+
+class SlowBackend:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def send(self, notification: Notification) -> None:
+        time.sleep(self.seconds)
+
+
+def run(reminders: int, recipients: int, send_ms: float, workers: int, coalesce: float) -> None:
+    backend = SlowBackend(send_ms / 1000)
+    batch = [Reminder(i, f"Task {i}", recipient=f"user{i % recipients}") for i in range(reminders)]
+
+    sample = batch[:200]
+    started = time.perf_counter()
+    for reminder in sample:
+        backend.send(Notification(reminder.channel, reminder.recipient, [reminder]))
+    per_reminder = (time.perf_counter() - started) / len(sample)
+    print(f"synchronous: {per_reminder * 1000:.2f} ms per reminder, "
+          f"~{per_reminder * reminders:.0f} s blocking for {reminders}")
+
+    dispatcher = NotificationDispatcher({"desktop": backend}, workers=workers, coalesce_seconds=coalesce)
+    dispatcher.start()
+    started = time.perf_counter()
+    dispatcher.enqueue_many(batch)
+    enqueue_seconds = time.perf_counter() - started
+    dispatcher.join()
+    total_seconds = time.perf_counter() - started
+    dispatcher.stop()
+    stats = dispatcher.stats
+    print(f"dispatcher:  enqueue {enqueue_seconds * 1000:.0f} ms ({enqueue_seconds / reminders * 1e6:.2f} us each), "
+          f"all delivered after {total_seconds:.2f} s")
+    print(f"             {stats.sent} messages for {stats.delivered} reminders "
+          f"({stats.coalesced} coalesced), {stats.reminders_per_second:,.0f} reminders/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reminders", type=int, default=100_000)
+    parser.add_argument("--recipients", type=int, default=200)
+    parser.add_argument("--send-ms", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--coalesce", type=float, default=0.25)
+    args = parser.parse_args()
+    run(args.reminders, args.recipients, args.send_ms, args.workers, args.coalesce)
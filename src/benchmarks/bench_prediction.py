@@ -0,0 +1,88 @@
+"""
+Benchmark batch completion predictions: estimator fit, warm batch, per-task calls.
+
+Usage:
+    python -m src.benchmarks.bench_prediction --tasks 200000 --batch 5000
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.database import Base, build_async_engine, build_engine
+from ..core.task_manager import Category, Task, task_category
+from ..services.prediction import PredictionEngine, invalidate_estimators
+
+
+def seed(sync_engine, categories: int, tasks: int) -> None:
+    rng = random.Random(5)
+    today = date.today()
+    with sync_engine.begin() as conn:
+        conn.execute(insert(Category), [
+            {"id": i, "name": f"Category {i}", "color": "#808080"} for i in range(1, categories + 1)
+        ])
+        rows = []
+        for i in range(1, tasks + 1):
+            estimate = rng.choice([15, 30, 60, 90])
+            completed = rng.random() < 0.5
+            rows.append({
+                "id": i, "title": f"Task {i}", "priority": rng.randint(1, 5), "completed": completed,
+                "due_date": today + timedelta(days=rng.randint(-30, 30)), "estimated_minutes": estimate,
+                "actual_minutes": int(estimate * rng.lognormvariate(0.2, 0.4)) if completed else None,
+            })
+        conn.execute(insert(Task), rows)
+        conn.execute(insert(task_category), [
+            {"task_id": i, "category_id": rng.randint(1, categories)} for i in range(1, tasks + 1)
+        ])
+
+
+async def run(categories: int, tasks: int, batch: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "prediction.db"
+        sync_engine = build_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=sync_engine)
+        seed(sync_engine, categories, tasks)
+        sync_engine.dispose()
+
+        async_engine = build_async_engine(f"sqlite+aiosqlite:///{path}")
+        task_ids = random.Random(1).sample(range(1, tasks + 1), batch)
+        async with AsyncSession(async_engine) as db:
+            engine = PredictionEngine(db)
+            invalidate_estimators()
+            started = time.perf_counter()
+            await engine.estimators()
+            print(f"estimator fit ({tasks} tasks):  {(time.perf_counter() - started) * 1000:9.1f} ms")
+
+            started = time.perf_counter()
+            predictions = await engine.predict(task_ids)
+            elapsed = time.perf_counter() - started
+            print(f"batch of {len(predictions)} (warm):     {elapsed * 1000:9.1f} ms  "
+                  f"({len(predictions) / elapsed:,.0f} tasks/s)")
+
+            sample = task_ids[:500]
+            started = time.perf_counter()
+            for task_id in sample:
+                await engine.predict([task_id])
+            elapsed = time.perf_counter() - started
+            print(f"{len(sample)} single calls (warm):   {elapsed * 1000:9.1f} ms  "
+                  f"({len(sample) / elapsed:,.0f} tasks/s)")
+        await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args.categories, args.tasks, args.batch))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Polling-dashboard workload against the real app: no cache, server-side cache,
+and server-side cache plus clients revalidating with If-None-Match.
+
+Usage:
+    python -m src.benchmarks.bench_read_cache --requests 5000 --concurrency 20 --write-ratio 0.01
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from ..core.database import Base, build_async_engine, build_engine, get_async_db, get_async_read_db
+from .bench_api_load import seed
+
+HOT_TASKS = 20
+
+
+def workload(total: int, write_ratio: float) -> List[Tuple[str, str]]:
+    rng = random.Random(8)
+    requests = []
+    for _ in range(total):
+        roll = rng.random()
+        if roll < write_ratio:
+            requests.append(("POST", "/tasks"))
+        elif roll < 0.4:
+            requests.append(("GET", "/tasks?limit=100"))
+        elif roll < 0.8:
+            requests.append(("GET", f"/api/tasks/{rng.randint(1, HOT_TASKS)}"))
+        else:
+            requests.append(("GET", "/categories/Work/workload"))
+    return requests
+
+
+async def drive(app, requests: List[Tuple[str, str]], concurrency: int, revalidate: bool) -> Dict[str, object]:
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in requests:
+        queue.put_nowait(item)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def dashboard():
+            etags: Dict[str, str] = {}
+            while not queue.empty():
+                method, url = queue.get_nowait()
+                headers = {"If-None-Match": etags[url]} if revalidate and url in etags else {}
+                body = {"title": "Poll write", "due_date": str(date.today()), "priority": 3} if method == "POST" else None
+                started = time.perf_counter()
+                response = await client.request(method, url, json=body, headers=headers)
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                if "etag" in response.headers:
+                    etags[url] = response.headers["etag"]
+
+        started = time.perf_counter()
+        await asyncio.gather(*(dashboard() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+        "statuses": statuses,
+    }
+
+
+async def run(total: int, concurrency: int, tasks: int, write_ratio: float) -> None:
+    from ..api.cache import response_cache
+    from ..main import app
+
+    requests = workload(total, write_ratio)
+    cache = response_cache.cache
+    default_entries = cache.max_entries
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, entries, revalidate in (
+            ("no cache", 0, False),
+            ("cache", default_entries, False),
+            ("cache+etag", default_entries, True),
+        ):
+            path = Path(tmp) / f"{label.replace('+', '_').replace(' ', '_')}.db"
+            sync_engine = build_engine(f"sqlite:///{path}")
+            Base.metadata.create_all(bind=sync_engine)
+            seed(sync_engine, tasks)
+            sync_engine.dispose()
+
+            async_engine = build_async_engine(f"sqlite+aiosqlite:///{path}")
+            factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+            async def override():
+                async with factory() as db:
+                    yield db
+
+            app.dependency_overrides[get_async_db] = override
+            app.dependency_overrides[get_async_read_db] = override
+            cache.clear()
+            cache.max_entries = entries
+            before = (cache.stats.hits, cache.stats.misses)
+            result = await drive(app, requests, concurrency, revalidate)
+            hits, misses = cache.stats.hits - before[0], cache.stats.misses - before[1]
+            hit_rate = hits / (hits + misses) if hits + misses else 0.0
+            print(f"{label:>10}: {result['rps']:8.1f} req/s  p50={result['p50']:6.2f}ms  "
+                  f"p99={result['p99']:7.2f}ms  hit rate={hit_rate:5.1%}  statuses={result['statuses']}")
+            app.dependency_overrides.clear()
+            await async_engine.dispose()
+    cache.max_entries = default_entries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--write-ratio", type=float, default=0.01)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency, args.tasks, args.write_ratio))
+
+
+if __name__ == "__main__":
+    main()
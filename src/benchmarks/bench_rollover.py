@@ -0,0 +1,82 @@
+"""
+Benchmark the overdue rollover: ORM load-and-mutate vs chunked set-based updates.
+
+Reports total time and the longest single transaction (how long other writers
+wait on SQLite's write lock).
+
+Usage:
+    python -m src.benchmarks.bench_rollover --tasks 300000 --chunk 5000
+"""
+import argparse
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from ..core.database import Base, build_engine
+from ..core.rollover import rollover_overdue_tasks
+from ..core.task_manager import Task
+
+
+def seed(sync_engine, tasks: int) -> None:
+    rng = random.Random(3)
+    today = date.today()
+    with sync_engine.begin() as conn:
+        conn.execute(insert(Task), [
+            {
+                "id": i, "title": f"Task {i}", "priority": rng.randint(1, 5), "completed": rng.random() < 0.4,
+                "due_date": today + timedelta(days=rng.randint(-20, 10)), "estimated_minutes": 30,
+            }
+            for i in range(1, tasks + 1)
+        ])
+
+
+def legacy_rollover(db: Session) -> int:
+    """The previous implementation: load every overdue task and commit once."""
+    today = date.today()
+    overdue_tasks = db.query(Task).filter(Task.due_date < today, Task.completed == False).all()
+    for task in overdue_tasks:
+        task.due_date = today
+    db.commit()
+    return len(overdue_tasks)
+
+
+def run(tasks: int, chunk: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("legacy", "chunked"):
+            sync_engine = build_engine(f"sqlite:///{Path(tmp) / f'{name}.db'}")
+            Base.metadata.create_all(bind=sync_engine)
+            seed(sync_engine, tasks)
+            with Session(sync_engine) as db:
+                started = time.perf_counter()
+                if name == "legacy":
+                    moved = legacy_rollover(db)
+                    longest = time.perf_counter() - started
+                else:
+                    marks = [time.perf_counter()]
+                    gaps = []
+
+                    def progress(report, ids):
+                        now = time.perf_counter()
+                        if ids:
+                            gaps.append(now - marks[-1])
+                        marks.append(now)
+
+                    moved = rollover_overdue_tasks(db, chunk_size=chunk, progress=progress).updated
+                    longest = max(gaps, default=0.0)
+                elapsed = time.perf_counter() - started
+            sync_engine.dispose()
+            print(f"{name:8} moved {moved:7d} tasks in {elapsed:6.2f} s, "
+                  f"longest transaction {longest * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=300_000)
+    parser.add_argument("--chunk", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.tasks, args.chunk)
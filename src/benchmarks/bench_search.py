@@ -0,0 +1,123 @@
+"""
+Benchmark title search on a large tasks table: LIKE '%word%' scans vs the
+FTS5 index (whole words, prefixes, ranked first page), plus the cost the
+index triggers add to inserts.
+
+Usage:
+    python -m src.benchmarks.bench_search --rows 1000000
+"""
+import argparse
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.orm import Session
+
+from ..core.database import Base, build_engine
+from ..core.search import fts_match, fts_rank, match_expression, search_table
+from ..core.task_manager import Task
+
+PAGE_SIZE = 50
+BATCH_SIZE = 50_000
+
+VERBS = ["review", "write", "fix", "plan", "call", "email", "update", "prepare", "clean", "book",
+         "deploy", "test", "draft", "pay", "order", "schedule", "refactor", "migrate", "read", "submit"]
+NOUNS = ["report", "invoice", "budget", "slides", "release", "dentist", "groceries", "contract",
+         "roadmap", "backlog", "newsletter", "garden", "flights", "taxes", "database", "proposal",
+         "interview", "onboarding", "dashboard", "migration", "laundry", "meeting", "notes", "server"]
+
+
+def titles(rows: int, seed: int = 12) -> List[str]:
+    rng = random.Random(seed)
+    words = [f"{noun}{i}" for noun in NOUNS for i in range(40)]  # rarer, unique-ish words
+    return [
+        f"{rng.choice(VERBS)} {rng.choice(NOUNS)} {rng.choice(words)} {rng.choice(NOUNS)}"
+        for _ in range(rows)
+    ]
+
+
+def load(sync_engine, rows: int) -> float:
+    today = date.today()
+    started = time.perf_counter()
+    with sync_engine.begin() as conn:
+        for offset in range(0, rows, BATCH_SIZE):
+            batch = titles(min(BATCH_SIZE, rows - offset), seed=offset)
+            conn.execute(insert(Task), [
+                {"title": title, "priority": 1 + i % 5, "due_date": today + timedelta(days=i % 30)}
+                for i, title in enumerate(batch)
+            ])
+    return time.perf_counter() - started
+
+
+def timed(fn: Callable[[], object], repeat: int = 3) -> Tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def run(rows: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        indexed = build_engine(f"sqlite:///{Path(tmp) / 'indexed.db'}")
+        Base.metadata.create_all(bind=indexed)
+        plain = build_engine(f"sqlite:///{Path(tmp) / 'plain.db'}")
+        Base.metadata.create_all(bind=plain)
+        with plain.begin() as conn:
+            for name in ("fts_task_insert", "fts_task_delete", "fts_task_update"):
+                conn.execute(text(f"DROP TRIGGER {name}"))
+
+        plain_seconds = load(plain, rows)
+        indexed_seconds = load(indexed, rows)
+        print(f"{rows} rows: insert {plain_seconds:.1f} s without index, {indexed_seconds:.1f} s with "
+              f"({(indexed_seconds / plain_seconds - 1):+.0%})")
+
+        with Session(indexed) as db:
+            def like(pattern: str) -> Callable[[], object]:
+                return lambda: list(db.scalars(
+                    select(Task.id).where(Task.title.like(pattern)).order_by(Task.id).limit(PAGE_SIZE)
+                ))
+
+            def like_count(pattern: str) -> Callable[[], object]:
+                return lambda: db.scalar(select(func.count()).select_from(Task).where(Task.title.like(pattern)))
+
+            def fts_page(query: str, prefix: bool) -> Callable[[], object]:
+                rank = fts_rank()
+                stmt = (select(Task.id).select_from(search_table)
+                        .join(Task, Task.id == search_table.c.rowid)
+                        .where(fts_match(match_expression(query, prefix)))
+                        .order_by(rank, Task.id).limit(PAGE_SIZE))
+                return lambda: list(db.scalars(stmt))
+
+            def fts_count(query: str, prefix: bool) -> Callable[[], object]:
+                stmt = select(func.count()).select_from(search_table).where(fts_match(match_expression(query, prefix)))
+                return lambda: db.scalar(stmt)
+
+            for name, fn in (
+                ("rare word, LIKE page", like("%budget17%")),
+                ("rare word, FTS ranked page", fts_page("budget17", False)),
+                ("two words, LIKE page", like("%pay%taxes%")),
+                ("two words, FTS ranked page", fts_page("pay taxes", False)),
+                ("prefix 'dash', LIKE count", like_count("%dash%")),
+                ("prefix 'dash', FTS count", fts_count("dash", True)),
+                ("prefix 'rep', FTS ranked page", fts_page("rep", True)),
+                ("no match, LIKE", like("%zzzz%")),
+                ("no match, FTS", fts_page("zzzz", True)),
+            ):
+                seconds, result = timed(fn)
+                size = len(result) if isinstance(result, list) else result
+                print(f"  {name:30} {seconds * 1000:9.2f} ms  ({size})")
+        indexed.dispose()
+        plain.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    run(args.rows)
@@ -0,0 +1,114 @@
+"""
+Rows/sec of task listings: ORM objects validated into Pydantic schemas and
+dumped (the previous read path, reproduced here) vs projected column tuples
+encoded straight to JSON, for a full page, a narrow field selection and a
+streamed export.
+
+Usage:
+    python -m src.benchmarks.bench_serialization --tasks 20000 --page 1000 --repeat 5
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, List
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..api.serialization import encode_rows, encode_rows_ndjson, orjson
+from ..core.database import build_async_engine, build_engine
+from ..core.loading import TASK_LIST_OPTIONS, load_category_names, load_category_names_for_ids
+from ..core.task_manager import Task as TaskModel
+from ..models.schemas import Task, TaskFilter
+from ..services.task_service import STREAM_BATCH_SIZE, TASK_FIELDS, TaskService, filter_task_query
+from .datagen import DatasetSpec, generate
+
+TASK_LIST_ADAPTER = TypeAdapter(List[Task])
+
+NARROW_FIELDS = ("id", "title", "due_date")
+
+
+async def model_page_tasks(db: AsyncSession, filters: TaskFilter, limit: int) -> List[Task]:
+    """One page as the previous read path built it: ORM objects, then schemas."""
+    stmt = filter_task_query(select(TaskModel).options(*TASK_LIST_OPTIONS), filters).limit(limit)
+    rows = (await db.scalars(stmt)).all()
+    names = await load_category_names(db, stmt)
+    return [TaskService._to_schema(task, names.get(task.id, [])) for task in rows]
+
+
+async def model_stream(db: AsyncSession, filters: TaskFilter) -> AsyncIterator[str]:
+    """NDJSON export as the previous read path built it."""
+    stmt = filter_task_query(
+        select(TaskModel).options(*TASK_LIST_OPTIONS), filters
+    ).execution_options(yield_per=STREAM_BATCH_SIZE)
+    result = await db.stream_scalars(stmt)
+    async for batch in result.partitions():
+        names = await load_category_names_for_ids(db, [task.id for task in batch])
+        yield "".join(
+            TaskService._to_schema(task, names.get(task.id, [])).model_dump_json() + "\n" for task in batch
+        )
+
+
+async def best_of(repeat: int, fn: Callable[[], Awaitable[bytes]]) -> (float, int):
+    best, size = float("inf"), 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = await fn()
+        best = min(best, time.perf_counter() - started)
+        size = len(body)
+    return best, size
+
+
+async def run(tasks: int, page: int, repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+        sync_engine = build_engine(f"sqlite:///{path}")
+        generate(sync_engine, DatasetSpec(tasks=tasks))
+        sync_engine.dispose()
+        async_engine = build_async_engine(f"sqlite+aiosqlite:///{path}")
+        filters = TaskFilter()
+
+        async with AsyncSession(async_engine) as db:
+            service = TaskService(db)
+
+            async def model_page() -> bytes:
+                return TASK_LIST_ADAPTER.dump_json(await model_page_tasks(db, filters, page))
+
+            async def projected_page() -> bytes:
+                rows, _ = await service.list_task_rows(filters, page)
+                return encode_rows(TASK_FIELDS, rows)
+
+            async def narrow_page() -> bytes:
+                rows, _ = await service.list_task_rows(filters, page, fields=NARROW_FIELDS)
+                return encode_rows(NARROW_FIELDS, rows)
+
+            async def model_export() -> bytes:
+                return "".join([chunk async for chunk in model_stream(db, filters)]).encode()
+
+            async def projected_stream() -> bytes:
+                return b"".join([encode_rows_ndjson(TASK_FIELDS, batch)
+                                 async for batch in service.stream_task_rows(filters)])
+
+            print(f"encoder: {'orjson' if orjson is not None else 'json (stdlib)'}")
+            for label, rows, fn in (
+                (f"page of {page}, ORM + Pydantic", page, model_page),
+                (f"page of {page}, projection", page, projected_page),
+                (f"page of {page}, {','.join(NARROW_FIELDS)}", page, narrow_page),
+                (f"stream {tasks}, ORM + Pydantic", tasks, model_export),
+                (f"stream {tasks}, projection", tasks, projected_stream),
+            ):
+                seconds, size = await best_of(repeat, fn)
+                print(f"{label:>36}: {rows / seconds:12,.0f} rows/s  ({seconds * 1000:8.1f} ms, {size:,} bytes)")
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=20_000)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.tasks, args.page, args.repeat))
@@ -0,0 +1,133 @@
+"""
+Benchmark the free-slot index and day optimizer.
+
+Usage:
+    python -m src.benchmarks.bench_slots --tasks 5000 --busy 50000
+"""
+import argparse
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from ..core.database import Base, build_engine
+from ..core.scheduler import TaskScheduler
+from ..core.slots import FreeSlotIndex, pack_tasks, working_windows
+from ..core.task_manager import Task, TimeTracking
+
+
+def seed(sync_engine, day: date, tasks: int, tracked: int) -> None:
+    rng = random.Random(11)
+    with sync_engine.begin() as conn:
+        conn.execute(insert(Task), [
+            {
+                "id": i, "title": f"Task {i}", "priority": rng.randint(1, 5), "completed": False,
+                "due_date": day - timedelta(days=rng.choice([0, 0, 0, 1, 2])),
+                "estimated_minutes": rng.choice([None, 5, 10, 15, 30, 60]),
+            }
+            for i in range(1, tasks + 1)
+        ])
+        rows = []
+        for i in range(tracked):
+            start = datetime.combine(day, datetime.min.time()) + timedelta(minutes=rng.randrange(8 * 60, 18 * 60))
+            minutes = rng.choice([1, 2, 5])
+            rows.append({
+                "task_id": rng.randint(1, tasks), "start_time": start,
+                "end_time": start + timedelta(minutes=minutes), "duration_minutes": minutes,
+            })
+        conn.execute(insert(TimeTracking), rows)
+
+
+def bench_optimizer(tasks: int, tracked: int, repeat: int) -> None:
+    day = date.today() + timedelta(days=30)
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_engine = build_engine(f"sqlite:///{Path(tmp) / 'slots.db'}")
+        Base.metadata.create_all(bind=sync_engine)
+        seed(sync_engine, day, tasks, tracked)
+        plan_timings, optimize_timings = [], []
+        for _ in range(repeat):
+            with Session(sync_engine) as db:
+                started = time.perf_counter()
+                planned, unscheduled = TaskScheduler.plan_day(db, day, include_overdue=True)
+                plan_timings.append(time.perf_counter() - started)
+            with Session(sync_engine) as db:
+                started = time.perf_counter()
+                TaskScheduler.optimize_schedule(db, day, include_overdue=True)
+                optimize_timings.append(time.perf_counter() - started)
+        sync_engine.dispose()
+    print(f"{tasks} tasks, {tracked} tracked entries: {len(planned)} planned, {len(unscheduled)} unscheduled")
+    for name, timings in (("plan_day", plan_timings), ("optimize_schedule", optimize_timings)):
+        timings.sort()
+        print(f"{name + ':':19} best {timings[0] * 1000:6.1f} ms, median {timings[len(timings) // 2] * 1000:6.1f} ms")
+
+
+def bench_index(busy: int, queries: int, days: int) -> None:
+    rng = random.Random(5)
+    first_day = date(2024, 1, 1)
+    origin = datetime(2024, 1, 1)
+    windows = working_windows(first_day, days)
+    intervals = []
+    for _ in range(busy):
+        start = origin + timedelta(minutes=rng.randrange(0, days * 24 * 60))
+        intervals.append((start, start + timedelta(minutes=rng.choice([1, 2, 3, 5]))))
+
+    started = time.perf_counter()
+    index = FreeSlotIndex(windows, intervals)
+    print(f"index build ({busy} busy intervals, {len(index)} gaps): {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    probes = [
+        (origin + timedelta(minutes=rng.randrange(0, days * 24 * 60)), rng.choice([5, 15, 30, 60]))
+        for _ in range(queries)
+    ]
+    started = time.perf_counter()
+    for after, minutes in probes:
+        index.find(after, minutes)
+    elapsed = time.perf_counter() - started
+    print(f"find: {elapsed / queries * 1e6:.1f} us/query")
+
+
+def bench_users(users: int, tasks_per_user: int) -> None:
+    """One independent day plan per user, each with its own index."""
+    rng = random.Random(9)
+    day = date(2024, 1, 1)
+    plans = []
+    for _ in range(users):
+        busy = []
+        for _ in range(10):
+            start = datetime(2024, 1, 1, 9) + timedelta(minutes=rng.randrange(0, 8 * 60))
+            busy.append((start, start + timedelta(minutes=rng.choice([15, 30, 60]))))
+        tasks = [
+            SimpleNamespace(priority=rng.randint(1, 5), due_date=day, estimated_minutes=rng.choice([None, 5, 15, 30]))
+            for _ in range(tasks_per_user)
+        ]
+        plans.append((busy, tasks))
+
+    started = time.perf_counter()
+    planned = 0
+    for busy, tasks in plans:
+        placed, _ = pack_tasks(FreeSlotIndex(working_windows(day), busy), tasks, datetime(2024, 1, 1))
+        planned += len(placed)
+    elapsed = time.perf_counter() - started
+    print(f"{users} users x {tasks_per_user} tasks: {elapsed * 1000:.1f} ms total, "
+          f"{elapsed / users * 1000:.2f} ms/user ({planned} planned)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--tracked", type=int, default=100)
+    parser.add_argument("--busy", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tasks-per-user", type=int, default=50)
+    args = parser.parse_args()
+    bench_optimizer(args.tasks, args.tracked, args.repeat)
+    bench_index(args.busy, args.queries, args.days)
+    bench_users(args.users, args.tasks_per_user)
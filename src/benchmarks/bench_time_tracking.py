@@ -0,0 +1,120 @@
+"""
+Sustained timer events/sec: one commit per event (start/stop rows and a
+running-duration update per heartbeat, as a route doing db.commit() would)
+vs the group-committing TimeTrackingWriter.
+
+Usage:
+    python -m src.benchmarks.bench_time_tracking --tasks 1000 --seconds 5 --clients 8
+"""
+import argparse
+import random
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import func, insert, select, text, update
+from sqlalchemy.orm import Session
+
+from ..core.database import Base, build_engine
+from ..core.task_manager import Task, TimeTracking
+from ..core.timetracking import TimeTrackingWriter, TrackerBusy
+
+
+def seed(sync_engine, tasks: int) -> None:
+    with sync_engine.begin() as conn:
+        conn.execute(insert(Task), [
+            {"id": i, "title": f"Task {i}", "priority": 3, "due_date": date.today()} for i in range(1, tasks + 1)
+        ])
+
+
+def drive(clients: int, seconds: float, tasks: int, send) -> int:
+    """Each client picks random tasks and sends start / heartbeats / stop; returns events sent."""
+    counts = [0] * clients
+    deadline = time.perf_counter() + seconds
+
+    def client(n: int) -> None:
+        rng = random.Random(n)
+        # Clients own disjoint task ranges so their timers never collide
+        own = list(range(1 + n, tasks + 1, clients))
+        clock = datetime(2024, 1, 1, 9, 0)
+        while time.perf_counter() < deadline:
+            task_id = rng.choice(own)
+            for kind in ("start", "heartbeat", "heartbeat", "heartbeat", "stop"):
+                clock += timedelta(seconds=30)
+                send(kind, task_id, clock)
+                counts[n] += 1
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts)
+
+
+def per_event_commits(sync_engine):
+    lock = threading.Lock()
+    open_rows = {}
+
+    def send(kind: str, task_id: int, at: datetime) -> None:
+        with Session(sync_engine) as db, lock:
+            if kind == "start":
+                open_rows[task_id] = (db.scalar(insert(TimeTracking).returning(TimeTracking.id),
+                                                [{"task_id": task_id, "start_time": at}]), at)
+            else:
+                row_id, started = open_rows[task_id]
+                minutes = (at - started).total_seconds() / 60
+                db.execute(update(TimeTracking).where(TimeTracking.id == row_id).values(
+                    duration_minutes=minutes, end_time=at if kind == "stop" else None))
+                if kind == "stop":
+                    db.execute(update(Task).where(Task.id == task_id).values(
+                        actual_minutes=func.coalesce(Task.actual_minutes, 0) + round(minutes)))
+            db.commit()
+    return send
+
+
+def run(tasks: int, seconds: float, clients: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        for label in ("commit per event", "group commit"):
+            sync_engine = build_engine(f"sqlite:///{Path(tmp) / (label.replace(' ', '_') + '.db')}")
+            Base.metadata.create_all(bind=sync_engine)
+            seed(sync_engine, tasks)
+
+            started = time.perf_counter()
+            if label == "group commit":
+                writer = TimeTrackingWriter(lambda: Session(sync_engine))
+                writer.start()
+
+                def send(kind, task_id, at):
+                    while True:
+                        try:
+                            writer.record(kind, task_id, at)
+                            return
+                        except TrackerBusy:
+                            time.sleep(0.001)
+                sent = drive(clients, seconds, tasks, send)
+                writer.stop()
+                stats = writer.stats
+                detail = f"{stats.batches} transactions, avg batch {stats.average_batch:.0f}, largest {stats.largest_batch}"
+            else:
+                sent = drive(clients, seconds, tasks, per_event_commits(sync_engine))
+                detail = f"{sent} transactions"
+            elapsed = time.perf_counter() - started
+
+            with sync_engine.connect() as conn:
+                rows = conn.execute(select(func.count()).select_from(TimeTracking)).scalar()
+                tracked = conn.execute(text("SELECT SUM(actual_minutes) FROM tasks")).scalar()
+            print(f"{label:>16}: {sent / elapsed:10,.0f} events/s  ({sent} events incl. final flush in "
+                  f"{elapsed:.2f} s; {rows} sessions, {tracked} min tracked; {detail})")
+            sync_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--clients", type=int, default=8)
+    args = parser.parse_args()
+    run(args.tasks, args.seconds, args.clients)
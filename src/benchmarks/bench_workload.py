@@ -0,0 +1,102 @@
+"""
+Benchmark 90-day workload queries: raw time_tracking scan vs. the daily rollup.
+
+Usage:
+    python -m src.benchmarks.bench_workload --tracks 2000000
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.database import Base, build_async_engine, build_engine
+from ..core.rollups import TRIGGERS, install_rollups
+from ..core.task_manager import Category, Task, TimeTracking, task_category
+from ..services.analytics import WorkloadAnalytics
+
+
+def seed(sync_engine, categories: int, tasks: int, tracks: int) -> None:
+    rng = random.Random(11)
+    today = date.today()
+    with sync_engine.begin() as conn:
+        # Seed raw rows without triggers, then let install_rollups backfill
+        for name in TRIGGERS:
+            conn.execute(text(f"DROP TRIGGER {name}"))
+        conn.execute(insert(Category), [
+            {"id": i, "name": f"Category {i}", "color": "#808080"} for i in range(1, categories + 1)
+        ])
+        conn.execute(insert(Task), [{
+            "id": i, "title": f"Task {i}", "priority": rng.randint(1, 5), "completed": rng.random() < 0.5,
+            "due_date": today - timedelta(days=rng.randint(0, 120)), "estimated_minutes": rng.choice([15, 30, 60]),
+        } for i in range(1, tasks + 1)])
+        conn.execute(insert(task_category), [
+            {"task_id": i, "category_id": rng.randint(1, categories)} for i in range(1, tasks + 1)
+        ])
+        start = datetime.combine(today, datetime.min.time())
+        for offset in range(0, tracks, 100_000):
+            conn.execute(insert(TimeTracking), [{
+                "task_id": rng.randint(1, tasks),
+                "start_time": start - timedelta(minutes=rng.randint(0, 120 * 24 * 60)),
+                "duration_minutes": rng.uniform(5, 90),
+            } for _ in range(min(100_000, tracks - offset))])
+
+        started = time.perf_counter()
+        install_rollups(conn)
+        print(f"rollup backfill: {time.perf_counter() - started:.2f}s")
+
+
+async def timed(label: str, coro_factory, repeat: int = 5) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await coro_factory()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:>28}: {best * 1000:9.2f} ms")
+
+
+async def run(categories: int, tasks: int, tracks: int, days: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "workload.db"
+        sync_engine = build_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=sync_engine)
+        seed(sync_engine, categories, tasks, tracks)
+        sync_engine.dispose()
+
+        async_engine = build_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with AsyncSession(async_engine) as db:
+            analytics = WorkloadAnalytics(db)
+            start = date.today() - timedelta(days=days - 1)
+
+            async def raw_scan():
+                track_day = func.date(TimeTracking.start_time)
+                await db.execute(
+                    select(track_day, func.sum(TimeTracking.duration_minutes))
+                    .join(task_category, task_category.c.task_id == TimeTracking.task_id)
+                    .where(task_category.c.category_id == 1, TimeTracking.start_time >= start)
+                    .group_by(track_day)
+                )
+
+            await timed("raw scan (one category)", raw_scan)
+            await timed("rollup category_workload", lambda: analytics.category_workload("Category 1", days))
+            await timed("rollup balance (all)", lambda: analytics.balance_recommendations(days))
+        await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=200_000)
+    parser.add_argument("--tracks", type=int, default=2_000_000)
+    parser.add_argument("--days", type=int, default=90)
+    args = parser.parse_args()
+    asyncio.run(run(args.categories, args.tasks, args.tracks, args.days))
+
+
+if __name__ == "__main__":
+    main()
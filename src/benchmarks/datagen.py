@@ -0,0 +1,158 @@
+"""
+Deterministic synthetic data for benchmarks.
+
+The same DatasetSpec always produces the same rows, so timings from
+different runs (and the stored baseline) measure the code, not the data.
+Rows are written with bulk Core inserts, which still fire the rollup,
+closure-table and search triggers.
+
+Usage:
+    python -m src.benchmarks.datagen --url sqlite:///./bench.db --tasks 20000
+"""
+import argparse
+import random
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Engine
+
+from ..core.database import Base, build_engine
+from ..core.task_manager import Category, Task, TimeTracking, task_category
+
+# Rows per INSERT statement
+INSERT_BATCH = 5000
+
+VERBS = ["review", "write", "fix", "plan", "call", "email", "update", "prepare", "clean", "book",
+         "deploy", "test", "draft", "pay", "order", "schedule", "refactor", "migrate", "read", "submit"]
+NOUNS = ["report", "invoice", "budget", "slides", "release", "dentist", "groceries", "contract",
+         "roadmap", "backlog", "newsletter", "garden", "flights", "taxes", "database", "proposal",
+         "interview", "onboarding", "dashboard", "migration", "laundry", "meeting", "notes", "server"]
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    tasks: int = 20_000
+    root_categories: int = 4
+    category_fanout: int = 3  # children per category
+    category_depth: int = 3  # levels below each root
+    time_tracks_per_task: float = 0.5  # average, drawn per task
+    days: int = 30  # due dates spread over [today - days, today + days]
+    completed_ratio: float = 0.3
+    seed: int = 1
+    today: Optional[date] = None  # defaults to date.today()
+
+    @property
+    def category_count(self) -> int:
+        per_root = sum(self.category_fanout ** level for level in range(self.category_depth + 1))
+        return self.root_categories * per_root
+
+
+def category_tree(spec: DatasetSpec) -> List[Tuple[int, str, Optional[int]]]:
+    """(id, name, parent_id) in breadth-first order, so parents come before children."""
+    nodes: List[Tuple[int, str, Optional[int]]] = []
+    frontier: List[Tuple[int, str]] = []
+    for r in range(spec.root_categories):
+        nodes.append((len(nodes) + 1, f"Area {r + 1}", None))
+        frontier.append(nodes[-1][:2])
+    for _ in range(spec.category_depth):
+        next_frontier = []
+        for parent_id, parent_name in frontier:
+            for c in range(spec.category_fanout):
+                nodes.append((len(nodes) + 1, f"{parent_name}.{c + 1}", parent_id))
+                next_frontier.append(nodes[-1][:2])
+        frontier = next_frontier
+    return nodes
+
+
+def task_rows(spec: DatasetSpec) -> Iterator[Dict[str, object]]:
+    rng = random.Random(spec.seed)
+    today = spec.today or date.today()
+    for task_id in range(1, spec.tasks + 1):
+        due_date = today + timedelta(days=rng.randint(-spec.days, spec.days))
+        yield {
+            "id": task_id,
+            "title": f"{rng.choice(VERBS)} {rng.choice(NOUNS)} {rng.choice(NOUNS)}",
+            "completed": rng.random() < spec.completed_ratio,
+            "due_date": due_date,
+            "created_at": datetime.combine(due_date - timedelta(days=rng.randint(1, 14)), datetime.min.time()),
+            "priority": rng.randint(1, 5),
+            "estimated_minutes": rng.choice((15, 30, 30, 45, 60, 90, 120)),
+        }
+
+
+def link_rows(spec: DatasetSpec) -> Iterator[Dict[str, int]]:
+    """One or two categories per task, biased towards leaves."""
+    rng = random.Random(spec.seed + 1)
+    categories = spec.category_count
+    for task_id in range(1, spec.tasks + 1):
+        picked = {rng.randint(max(1, categories // 3), categories)}
+        if rng.random() < 0.2:
+            picked.add(rng.randint(1, categories))
+        for category_id in picked:
+            yield {"task_id": task_id, "category_id": category_id}
+
+
+def time_track_rows(spec: DatasetSpec) -> Iterator[Dict[str, object]]:
+    rng = random.Random(spec.seed + 2)
+    today = spec.today or date.today()
+    for task_id in range(1, spec.tasks + 1):
+        tracks = int(spec.time_tracks_per_task) + (rng.random() < spec.time_tracks_per_task % 1)
+        for _ in range(tracks):
+            day = today - timedelta(days=rng.randint(0, spec.days))
+            start = datetime.combine(day, datetime.min.time()) + timedelta(minutes=rng.randint(8 * 60, 17 * 60))
+            minutes = rng.randint(5, 120)
+            yield {"task_id": task_id, "start_time": start,
+                   "end_time": start + timedelta(minutes=minutes), "duration_minutes": float(minutes)}
+
+
+def _batched(rows: Iterator[Dict[str, object]]) -> Iterator[List[Dict[str, object]]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == INSERT_BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate(sync_engine: Engine, spec: DatasetSpec) -> Dict[str, int]:
+    """
+    Create the schema and fill an empty database.
+
+    Returns:
+        Dict[str, int]: Row counts per table
+
+    Raises:
+        ValueError: If the database already has tasks
+    """
+    Base.metadata.create_all(bind=sync_engine)
+    with sync_engine.begin() as conn:
+        if conn.scalar(select(func.count()).select_from(Task)):
+            raise ValueError("Benchmark data needs an empty database")
+        conn.execute(insert(Category), [
+            {"id": i, "name": name, "color": "#808080", "parent_id": parent} for i, name, parent in category_tree(spec)
+        ])
+        for table, rows in ((Task, task_rows(spec)), (task_category, link_rows(spec)),
+                            (TimeTracking, time_track_rows(spec))):
+            for batch in _batched(rows):
+                conn.execute(insert(table), batch)
+        return {
+            "tasks": conn.scalar(select(func.count()).select_from(Task)),
+            "categories": conn.scalar(select(func.count()).select_from(Category)),
+            "links": conn.scalar(select(func.count()).select_from(task_category)),
+            "time_tracks": conn.scalar(select(func.count()).select_from(TimeTracking)),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fill a database with deterministic benchmark data")
+    parser.add_argument("--url", required=True)
+    for name, value in asdict(DatasetSpec()).items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = vars(parser.parse_args())
+    url = args.pop("url")
+    print(generate(build_engine(url), DatasetSpec(**args)))
@@ -0,0 +1,424 @@
+"""
+Regression benchmark suite.
+
+Builds one deterministic dataset (see datagen), times the scheduler and query
+paths directly and the main endpoints through an in-process HTTP load driver,
+and compares every score against the stored baseline. A benchmark regresses
+when it is more than its threshold slower than the baseline after scaling by
+a CPU calibration loop run right before it, which absorbs most of the
+difference between machines and between quiet and busy moments. Micro-benchmarks are scored by their best run, which is the least
+sensitive to other load on the machine; HTTP scenarios by the mean time per
+request at the driver's concurrency (concurrency / throughput) of their
+best round. Any
+regression makes the run exit with status 1.
+
+Usage:
+    python -m src.benchmarks.suite                      # run and compare
+    python -m src.benchmarks.suite --only scheduler     # names containing "scheduler"
+    python -m src.benchmarks.suite --update-baseline    # record new baseline
+"""
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+
+from ..core.database import build_async_engine, build_engine, get_async_db, get_async_read_db
+from ..core.heap_scheduler import HeapScheduler
+from ..core.loading import TASK_LIST_OPTIONS
+from ..core.scheduler import TaskScheduler
+from ..core.search import fts_match, fts_rank, match_expression, search_table
+from ..core.slots import FreeSlotIndex, working_windows
+from ..core.task_manager import Task
+from ..models.schemas import TaskFilter
+from ..services.task_service import filter_task_query
+from .datagen import DatasetSpec, generate
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+# Allowed slowdown over the (calibrated) baseline before a benchmark fails;
+# HTTP scenarios share the process and event loop with the driver and vary
+# far more, so they only catch gross slowdowns
+REGRESSION_THRESHOLD = 0.35
+HTTP_REGRESSION_THRESHOLD = 1.0
+
+SUITE_SPEC = DatasetSpec(tasks=20_000)
+QUICK_SPEC = DatasetSpec(tasks=2_000, category_depth=2)
+
+# Requests per round, rounds and concurrent clients per HTTP scenario
+HTTP_REQUESTS = 400
+HTTP_ROUNDS = 3
+HTTP_CONCURRENCY = 16
+
+
+@dataclass
+class Context:
+    template: Path  # generated database, never modified
+    workdir: Path
+    spec: DatasetSpec
+
+    def copy(self, name: str) -> Path:
+        path = self.workdir / f"{name}.db"
+        shutil.copyfile(self.template, path)
+        return path
+
+
+@dataclass
+class Result:
+    name: str
+    score_ms: float  # compared against the baseline
+    median_ms: float
+    min_ms: float
+    runs: int
+    extra: Dict[str, float] = field(default_factory=dict)
+    calibration_ms: float = 0.0  # calibrate() right before this benchmark
+
+
+@dataclass
+class Benchmark:
+    name: str
+    run: Callable[[Context], Result]
+    threshold: float = REGRESSION_THRESHOLD
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def timed(name: str, fn: Callable[[], object], repeat: int = 7, setup: Optional[Callable[[], None]] = None) -> Result:
+    """
+    Median and best of `repeat` calls after one warm-up; setup() runs untimed before each call.
+
+    Like timeit, the garbage collector is paused while timing so collections
+    triggered by earlier benchmarks do not land in this one.
+    """
+    samples = []
+    for i in range(repeat + 1):
+        if setup is not None:
+            setup()
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - started
+        finally:
+            gc.enable()
+        if i:
+            samples.append(elapsed * 1000)
+    return Result(name, min(samples), statistics.median(samples), min(samples), repeat)
+
+
+def micro(name: str, repeat: int = 7, threshold: float = REGRESSION_THRESHOLD):
+    """Register fn(db, ctx) -> zero-argument callable, timed on a read-only session."""
+    def register(factory: Callable[[Session, Context], Callable[[], object]]):
+        def run(ctx: Context) -> Result:
+            engine = build_engine(f"sqlite:///{ctx.template}")
+            try:
+                with Session(engine) as db:
+                    return timed(name, factory(db, ctx), repeat)
+            finally:
+                engine.dispose()
+        BENCHMARKS.append(Benchmark(name, run, threshold))
+        return factory
+    return register
+
+
+def register(name: str, threshold: float = REGRESSION_THRESHOLD):
+    """Register fn(ctx) -> Result for benchmarks that manage their own setup."""
+    def wrap(fn: Callable[[Context], Result]):
+        BENCHMARKS.append(Benchmark(name, fn, threshold))
+        return fn
+    return wrap
+
+
+@micro("query.list_first_page")
+def _list_first_page(db: Session, ctx: Context):
+    stmt = filter_task_query(select(Task).options(*TASK_LIST_OPTIONS), TaskFilter(completed=False)).limit(100)
+    return lambda: db.scalars(stmt).all()
+
+
+@micro("query.list_subtree_page")
+def _list_subtree_page(db: Session, ctx: Context):
+    stmt = filter_task_query(select(Task.id), TaskFilter(category_subtree=1)).limit(100)
+    return lambda: db.scalars(stmt).all()
+
+
+@micro("query.search_page")
+def _search_page(db: Session, ctx: Context):
+    stmt = (select(Task.id).select_from(search_table).join(Task, Task.id == search_table.c.rowid)
+            .where(fts_match(match_expression("rep"))).order_by(fts_rank(), Task.id).limit(50))
+    return lambda: db.scalars(stmt).all()
+
+
+@micro("scheduler.plan_day")
+def _plan_day(db: Session, ctx: Context):
+    return lambda: TaskScheduler.plan_day(db, date.today(), include_overdue=True)
+
+
+@micro("scheduler.optimize_schedule")
+def _optimize_schedule(db: Session, ctx: Context):
+    return lambda: TaskScheduler.optimize_schedule(db, date.today(), include_overdue=True)
+
+
+# Commits per chunk, so disk speed (which calibration does not see) shows up too
+@register("scheduler.reschedule_overdue_tasks", threshold=0.6)
+def _reschedule_overdue(ctx: Context) -> Result:
+    # Mutating: every run gets a fresh copy of the dataset
+    state = {}
+
+    def setup():
+        if "engine" in state:
+            state["engine"].dispose()
+        state["engine"] = build_engine(f"sqlite:///{ctx.copy('rollover')}")
+
+    def run():
+        with Session(state["engine"]) as db:
+            TaskScheduler.reschedule_overdue_tasks(db)
+
+    result = timed("scheduler.reschedule_overdue_tasks", run, repeat=5, setup=setup)
+    state["engine"].dispose()
+    return result
+
+
+@register("scheduler.heap_add_cancel")
+def _heap_add_cancel(ctx: Context) -> Result:
+    start = datetime(2024, 1, 1, 9, 0)
+    rng = random.Random(5)
+    offsets = [rng.randint(0, 7 * 24 * 60) for _ in range(20_000)]
+
+    def run():
+        scheduler = HeapScheduler(clock=lambda: start.timestamp())
+        for i, minutes in enumerate(offsets):
+            scheduler.add(f"job{i}", bool, start + timedelta(minutes=minutes), priority=i % 5 + 1)
+        for i in range(0, len(offsets), 2):
+            scheduler.cancel(f"job{i}")
+        scheduler.run_pending()
+
+    return timed("scheduler.heap_add_cancel", run)
+
+
+@register("scheduler.free_slot_search")
+def _free_slot_search(ctx: Context) -> Result:
+    rng = random.Random(6)
+    windows = working_windows(date(2024, 1, 1), 30)
+    busy = []
+    for window_start, _ in windows:
+        for _ in range(6):
+            begin = window_start + timedelta(minutes=rng.randint(0, 8 * 60))
+            busy.append((begin, begin + timedelta(minutes=rng.choice((15, 30, 60)))))
+    queries = [(windows[0][0] + timedelta(hours=rng.randint(0, 24 * 25)), rng.choice((15, 30, 45, 90)))
+               for _ in range(10_000)]
+
+    def run():
+        index = FreeSlotIndex(windows, busy)
+        for after, minutes in queries:
+            index.find(after, minutes)
+
+    return timed("scheduler.free_slot_search", run)
+
+
+async def drive_http(app, requests: List[tuple], concurrency: int) -> Dict[str, float]:
+    """Send requests from `concurrency` clients through the ASGI app; latency stats in ms."""
+    latencies: List[float] = []
+    errors = 0
+    pending = list(reversed(requests))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def user():
+            nonlocal errors
+            while pending:
+                method, url, body = pending.pop()
+                started = time.perf_counter()
+                response = await client.request(method, url, json=body)
+                latencies.append((time.perf_counter() - started) * 1000)
+                errors += response.status_code >= 400
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "min": latencies[0],
+        "rps": len(latencies) / elapsed,
+        "errors": errors,
+    }
+
+
+def _http_scenario(name: str, make_requests: Callable[[random.Random], List[tuple]]):
+    def run(ctx: Context) -> Result:
+        from ..api.cache import response_cache
+        from ..main import app
+
+        path = ctx.copy(name.replace(".", "_"))
+        async_engine = build_async_engine(f"sqlite+aiosqlite:///{path}")
+        factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+        async def override():
+            async with factory() as db:
+                yield db
+
+        async def go():
+            try:
+                # Warm up pools and caches of the query plans, then measure
+                await drive_http(app, make_requests(random.Random(0))[:HTTP_CONCURRENCY], HTTP_CONCURRENCY)
+                return [await drive_http(app, make_requests(random.Random(i)), HTTP_CONCURRENCY)
+                        for i in range(1, HTTP_ROUNDS + 1)]
+            finally:
+                await async_engine.dispose()
+
+        # Measure the query path, not the read cache
+        cache = response_cache.cache
+        entries, cache.max_entries = cache.max_entries, 0
+        app.dependency_overrides[get_async_db] = override
+        app.dependency_overrides[get_async_read_db] = override
+        try:
+            rounds = asyncio.run(go())
+        finally:
+            app.dependency_overrides.clear()
+            cache.max_entries = entries
+        stats = max(rounds, key=lambda r: r["rps"])
+        if any(r["errors"] for r in rounds):
+            raise RuntimeError(f"{name}: {sum(r['errors'] for r in rounds)} requests failed")
+        return Result(name, HTTP_CONCURRENCY * 1000 / stats["rps"], stats["p50"], stats["min"], HTTP_REQUESTS * HTTP_ROUNDS,
+                      {"p95_ms": stats["p95"], "rps": stats["rps"]})
+
+    BENCHMARKS.append(Benchmark(name, run, HTTP_REGRESSION_THRESHOLD))
+
+
+_http_scenario("http.list_tasks", lambda rng: [
+    ("GET", f"/tasks?limit=100&completed={rng.random() < 0.5}".lower(), None) for _ in range(HTTP_REQUESTS)
+])
+_http_scenario("http.create_task", lambda rng: [
+    ("POST", "/tasks", {"title": f"Load task {i}", "due_date": str(date.today() + timedelta(days=rng.randint(0, 9))),
+                        "priority": rng.randint(1, 5), "estimated_minutes": 30, "categories": ["Area 1"]})
+    for i in range(HTTP_REQUESTS)
+])
+_http_scenario("http.search_tasks", lambda rng: [
+    ("GET", f"/tasks/search?q={rng.choice(('rep', 'budget', 'review slides', 'pay'))}&limit=20", None)
+    for _ in range(HTTP_REQUESTS)
+])
+_http_scenario("http.category_workload", lambda rng: [
+    ("GET", f"/categories/Area {rng.randint(1, 4)}/workload?days={rng.choice((7, 14))}", None)
+    for _ in range(HTTP_REQUESTS)
+])
+
+
+def calibrate() -> float:
+    """Milliseconds for a fixed pure-Python workload; scales baselines across machines."""
+    def loop():
+        total = 0
+        for i in range(300_000):
+            total += i % 7
+        return sorted(str(i) for i in range(30_000))
+    return timed("calibration", loop, repeat=5).score_ms
+
+
+def compare(results: List[Result], baseline: Dict, threshold: Optional[float] = None) -> List[str]:
+    """
+    Check results against a baseline.
+
+    Each score is scaled by how much slower or faster the calibration loop
+    ran right before it than right before the baseline run.
+
+    Args:
+        results: Current results
+        baseline: Parsed baseline file
+        threshold: Overrides every benchmark's own threshold
+
+    Returns:
+        List[str]: One line per regression; empty if none
+    """
+    thresholds = {b.name: b.threshold for b in BENCHMARKS}
+    regressions = []
+    for result in results:
+        previous = baseline["results"].get(result.name)
+        if previous is None:
+            continue
+        scale = result.calibration_ms / previous["calibration_ms"]
+        allowed = previous["score_ms"] * scale * (1 + (threshold if threshold is not None else
+                                                        thresholds.get(result.name, REGRESSION_THRESHOLD)))
+        if result.score_ms > allowed:
+            regressions.append(f"{result.name}: {result.score_ms:.2f} ms > {allowed:.2f} ms allowed "
+                               f"(baseline {previous['score_ms']:.2f} ms x {scale:.2f})")
+    return regressions
+
+
+def run_suite(spec: DatasetSpec, only: Optional[str] = None, echo: Callable[[str], None] = print) -> List[Result]:
+    selected = [b for b in BENCHMARKS if only is None or only in b.name]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = Context(Path(tmp) / "template.db", Path(tmp), spec)
+        started = time.perf_counter()
+        counts = generate(build_engine(f"sqlite:///{ctx.template}"), spec)
+        echo(f"dataset {counts} in {time.perf_counter() - started:.1f} s")
+        for benchmark in selected:
+            calibration_ms = calibrate()
+            result = benchmark.run(ctx)
+            result.calibration_ms = calibration_ms
+            extra = "".join(f"  {key}={value:.1f}" for key, value in result.extra.items())
+            echo(f"  {result.name:38} score {result.score_ms:9.2f} ms  median {result.median_ms:9.2f} ms  "
+                 f"min {result.min_ms:9.2f} ms{extra}")
+            results.append(result)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and compare against the baseline")
+    parser.add_argument("--only", help="Run benchmarks whose name contains this text")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, help="Allowed slowdown for every benchmark, e.g. 0.5")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--quick", action="store_true", help="Small dataset; nothing is compared")
+    args = parser.parse_args()
+
+    spec = QUICK_SPEC if args.quick else SUITE_SPEC
+    results = run_suite(spec, args.only)
+    if args.quick:
+        return 0
+
+    if args.update_baseline:
+        recorded = {r.name: json.loads(json.dumps(asdict(r)), parse_float=lambda v: round(float(v), 3)) for r in results}
+        if args.only and args.baseline.exists():
+            results_out = {**json.loads(args.baseline.read_text())["results"], **recorded}
+        else:
+            results_out = recorded
+        args.baseline.write_text(json.dumps({
+            "machine": f"{platform.machine()} {platform.python_implementation()} {platform.python_version()}",
+            "spec": asdict(spec),
+            "results": results_out,
+        }, indent=2, default=str) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; run with --update-baseline first")
+        return 1
+    baseline = json.loads(args.baseline.read_text())
+    if baseline["spec"] != json.loads(json.dumps(asdict(spec), default=str)):
+        print("baseline was recorded with a different dataset; re-record it with --update-baseline")
+        return 1
+    regressions = compare(results, baseline, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    print(f"{len(results) - len(regressions)}/{len(results)} within threshold")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+In-process read cache invalidated by a global write version.
+
+Every flush or commit that touches tasks, categories or time tracking bumps
+write_version, as does any ORM-enabled insert/update/delete statement run
+through a session. Cache entries remember the version they were computed at
+and are treated as misses once it moves on, so no per-key invalidation is
+needed. Raw SQL writes bypass the session events and must call
+write_version.bump() themselves.
+"""
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, Callable, Hashable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from .task_manager import Category, Task, TimeTracking
+
+# Default bounds of a cache: entries kept and seconds an entry may be served
+CACHE_MAX_ENTRIES = 1024
+CACHE_TTL_SECONDS = 30.0
+
+_CACHED_MODELS = (Task, Category, TimeTracking)
+
+
+class WriteVersion:
+    """Monotonic counter of committed writes, tagged with a per-process epoch."""
+
+    def __init__(self):
+        self.epoch = secrets.token_hex(4)
+        self._value = 0
+        self.bumped_at = float("-inf")  # time.monotonic() of the last bump
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def bump(self) -> int:
+        with self._lock:
+            self._value += 1
+            self.bumped_at = time.monotonic()
+            return self._value
+
+
+write_version = WriteVersion()
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_on_flush(session: Session, flush_context) -> None:
+    if any(isinstance(obj, _CACHED_MODELS) for obj in chain(session.new, session.dirty, session.deleted)):
+        session.info["cache_dirty"] = True
+        write_version.bump()
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_on_bulk_write(orm_execute_state: ORMExecuteState) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["cache_dirty"] = True
+        write_version.bump()
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session: Session) -> None:
+    # Readers may have cached pre-commit data under the flush-time version
+    if session.info.pop("cache_dirty", False):
+        write_version.bump()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stale: int = 0  # misses because a write happened since the entry was stored
+    expired: int = 0
+    evictions: int = 0
+    not_modified: int = 0  # conditional requests answered with 304
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class VersionedCache:
+    """
+    Bounded LRU cache with a TTL whose entries expire on any write.
+
+    Callers read write_version.value before computing a value and pass it to
+    set(); a write during the computation then leaves the entry stale.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl_seconds: float = CACHE_TTL_SECONDS,
+        version: WriteVersion = write_version,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version = version
+        self.stats = CacheStats()
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            version, expires_at, value = entry
+            if version != self.version.value:
+                self.stats.stale += 1
+            elif expires_at <= self._clock():
+                self.stats.expired += 1
+            else:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return value
+            del self._entries[key]
+            self.stats.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any, version: int) -> None:
+        with self._lock:
+            self._entries[key] = (version, self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -1,4 +1,8 @@
-from typing import Dict, Any, List
+import json
+import os
+from dataclasses import dataclass, field, fields, replace
+from pathlib import Path
+from typing import Dict, Any, List, Mapping, Optional, Tuple
 
 INITIAL_TASKS: List[Dict[str, Any]] = [
     {
@@ -8,3 +12,137 @@ INITIAL_TASKS: List[Dict[str, Any]] = [
     },
     # ... other tasks ...
 ]
+
+# Prefix of the environment variables read by load_database_settings()
+ENV_PREFIX = "DAYPLANNER_"
+
+# Seconds a client's reads stay on the primary after it wrote; also how far
+# behind the primary a replica is assumed to be at most
+READ_STICKY_SECONDS = 2.0
+
+
+@dataclass(frozen=True)
+class DatabaseSettings:
+    """
+    Where the database lives and how connections are made.
+
+    Pool options and pragmas are overrides merged over the defaults in
+    core.database (ASYNC_POOL_OPTIONS, SQLITE_PRAGMAS). Pool options apply
+    to the sync engine as well as the async primary and replicas.
+    """
+    database_url: str = "sqlite:///./dayplanner.db"
+    async_database_url: Optional[str] = None  # derived from database_url when unset
+    replica_urls: Tuple[str, ...] = ()  # async URLs of read replicas
+    pool: Dict[str, Any] = field(default_factory=dict)
+    sqlite_pragmas: Dict[str, Any] = field(default_factory=dict)
+    read_sticky_seconds: float = READ_STICKY_SECONDS
+
+    @property
+    def primary_async_url(self) -> str:
+        return self.async_database_url or async_url(self.database_url)
+
+
+# Sync driver prefix -> async driver prefix, for deriving async URLs
+ASYNC_DRIVERS = {
+    "sqlite://": "sqlite+aiosqlite://",
+    "postgresql://": "postgresql+asyncpg://",
+    "postgresql+psycopg2://": "postgresql+asyncpg://",
+}
+
+# Environment variables (after ENV_PREFIX) holding pool options
+POOL_ENV = {
+    "POOL_SIZE": ("pool_size", int),
+    "MAX_OVERFLOW": ("max_overflow", int),
+    "POOL_RECYCLE": ("pool_recycle", int),
+    "POOL_TIMEOUT": ("pool_timeout", float),
+}
+
+
+def async_url(url: str) -> str:
+    """Async-driver form of a database URL (sqlite:// -> sqlite+aiosqlite://)."""
+    for sync_prefix, async_prefix in ASYNC_DRIVERS.items():
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+
+def _parse_pragmas(value: str) -> Dict[str, Any]:
+    pragmas: Dict[str, Any] = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, sep, setting = item.partition("=")
+        if not sep or not name.strip():
+            raise ValueError(f"Expected name=value in {ENV_PREFIX}SQLITE_PRAGMAS, got {item!r}")
+        setting = setting.strip()
+        pragmas[name.strip()] = int(setting) if setting.lstrip("-").isdigit() else setting
+    return pragmas
+
+
+def _from_file(path: Path) -> Dict[str, Any]:
+    values = json.loads(path.read_text())
+    if not isinstance(values, dict):
+        raise ValueError(f"{path} must hold a JSON object")
+    known = {f.name for f in fields(DatabaseSettings)}
+    unknown = set(values) - known
+    if unknown:
+        raise ValueError(f"Unknown database settings in {path}: {', '.join(sorted(unknown))}")
+    if "replica_urls" in values:
+        values["replica_urls"] = tuple(async_url(u) for u in values["replica_urls"])
+    return values
+
+
+def _from_env(environ: Mapping[str, str], base: DatabaseSettings) -> Dict[str, Any]:
+    def get(name: str) -> Optional[str]:
+        value = environ.get(ENV_PREFIX + name)
+        return value if value not in (None, "") else None
+
+    values: Dict[str, Any] = {}
+    if get("DATABASE_URL"):
+        values["database_url"] = get("DATABASE_URL")
+    if get("ASYNC_DATABASE_URL"):
+        values["async_database_url"] = get("ASYNC_DATABASE_URL")
+    if get("REPLICA_URLS"):
+        values["replica_urls"] = tuple(async_url(u.strip()) for u in get("REPLICA_URLS").split(",") if u.strip())
+    pool = dict(base.pool)
+    for name, (option, convert) in POOL_ENV.items():
+        if get(name):
+            try:
+                pool[option] = convert(get(name))
+            except ValueError:
+                raise ValueError(f"{ENV_PREFIX}{name} must be a number, got {get(name)!r}")
+    if pool != base.pool:
+        values["pool"] = pool
+    if get("SQLITE_PRAGMAS"):
+        values["sqlite_pragmas"] = {**base.sqlite_pragmas, **_parse_pragmas(get("SQLITE_PRAGMAS"))}
+    if get("READ_STICKY_SECONDS"):
+        try:
+            values["read_sticky_seconds"] = float(get("READ_STICKY_SECONDS"))
+        except ValueError:
+            raise ValueError(f"{ENV_PREFIX}READ_STICKY_SECONDS must be a number, got {get('READ_STICKY_SECONDS')!r}")
+    return values
+
+
+def load_database_settings(environ: Optional[Mapping[str, str]] = None) -> DatabaseSettings:
+    """
+    Database settings from an optional JSON file and the environment.
+
+    The file named by DAYPLANNER_CONFIG_FILE holds DatabaseSettings fields
+    as a JSON object; DAYPLANNER_* variables override it (DATABASE_URL,
+    ASYNC_DATABASE_URL, REPLICA_URLS comma-separated, POOL_SIZE,
+    MAX_OVERFLOW, POOL_RECYCLE, POOL_TIMEOUT, SQLITE_PRAGMAS as
+    name=value pairs, READ_STICKY_SECONDS).
+
+    Args:
+        environ: Variables to read; defaults to os.environ
+
+    Returns:
+        DatabaseSettings: Defaults overridden by the file, then the environment
+
+    Raises:
+        ValueError: If the file has unknown keys or a variable is malformed
+    """
+    environ = os.environ if environ is None else environ
+    settings = DatabaseSettings()
+    config_file = environ.get(ENV_PREFIX + "CONFIG_FILE")
+    if config_file:
+        settings = replace(settings, **_from_file(Path(config_file)))
+    return replace(settings, **_from_env(environ, settings))
@@ -0,0 +1,307 @@
+import asyncio
+import calendar
+import heapq
+import itertools
+import logging
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .metrics import counter, gauge, histogram
+
+RECURRENCES = ("daily", "weekly", "monthly")
+
+logger = logging.getLogger(__name__)
+
+# Live schedulers, summed by the gauges below at scrape time
+_schedulers: "weakref.WeakSet[HeapScheduler]" = weakref.WeakSet()
+
+SCHEDULER_JOBS = gauge("dayplanner_scheduler_jobs", "Registered scheduler jobs")
+SCHEDULER_READY = gauge("dayplanner_scheduler_ready_jobs", "Due jobs waiting for a free worker")
+SCHEDULER_BUSY_WORKERS = gauge("dayplanner_scheduler_busy_workers", "Scheduler workers running a job")
+SCHEDULER_DISPATCH_LAG = histogram(
+    "dayplanner_scheduler_dispatch_lag_seconds", "Delay between a job's fire time and its start", ("job",)
+)
+SCHEDULER_JOB_SECONDS = histogram("dayplanner_scheduler_job_duration_seconds", "Job run time", ("job",))
+SCHEDULER_JOB_FAILURES = counter(
+    "dayplanner_scheduler_job_failures_total", "Jobs that raised or returned False", ("job",)
+)
+SCHEDULER_JOBS.set_function(lambda: sum(len(s._jobs) for s in list(_schedulers)))
+SCHEDULER_READY.set_function(lambda: sum(len(s._ready) for s in list(_schedulers)))
+SCHEDULER_BUSY_WORKERS.set_function(lambda: sum(s.max_workers - s._idle_workers for s in list(_schedulers)))
+
+
+def job_kind(job_id: str) -> str:
+    """Metric label for a job: the id up to the first ':' (e.g. reminder:42 -> reminder)."""
+    return job_id.split(":", 1)[0]
+
+
+def next_occurrence(previous: datetime, recurrence: str, anchor_day: int) -> datetime:
+    """
+    Next fire time after `previous` for a recurring job.
+
+    Monthly jobs keep their original day of month (anchor_day), clamped to
+    the length of shorter months (e.g. the 31st fires on Feb 28/29).
+
+    Raises:
+        ValueError: If recurrence is not daily, weekly or monthly
+    """
+    if recurrence == "daily":
+        return previous + timedelta(days=1)
+    if recurrence == "weekly":
+        return previous + timedelta(weeks=1)
+    if recurrence == "monthly":
+        year, month = (previous.year + 1, 1) if previous.month == 12 else (previous.year, previous.month + 1)
+        day = min(anchor_day, calendar.monthrange(year, month)[1])
+        return previous.replace(year=year, month=month, day=day)
+    raise ValueError(f"Unknown recurrence: {recurrence}")
+
+
+class ScheduledJob:
+    """A registered job and its next fire time."""
+
+    __slots__ = ("job_id", "func", "priority", "recurrence", "run_at", "anchor_day", "seq", "cancelled")
+
+    def __init__(
+        self,
+        job_id: str,
+        func: Callable[[], object],
+        run_at: datetime,
+        priority: int,
+        recurrence: Optional[str]
+    ):
+        self.job_id = job_id
+        self.func = func
+        self.run_at = run_at
+        self.priority = priority
+        self.recurrence = recurrence
+        self.anchor_day = run_at.day
+        self.seq = 0
+        self.cancelled = False
+
+
+class HeapScheduler:
+    """
+    Min-heap of next fire times with a bounded worker pool.
+
+    The loop sleeps until the earliest deadline (or until a job is added,
+    cancelled or a worker frees up). Due jobs are dispatched in priority order
+    (1 = highest); when every worker is busy they wait in a ready queue.
+    Cancellation is lazy: the job is marked and skipped when it reaches the
+    top of the heap, and the heap is compacted once half of it is stale.
+    """
+
+    def __init__(self, max_workers: int = 4, clock: Callable[[], float] = time.time):
+        self.max_workers = max_workers
+        self._clock = clock
+        self._heap: List[Tuple[float, int, int, ScheduledJob]] = []
+        self._ready: List[Tuple[int, float, int, ScheduledJob]] = []
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._stale = 0
+        self._seq = itertools.count()
+        self._idle_workers = max_workers
+        self._cond = threading.Condition()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_wake: Optional[asyncio.Event] = None
+        _schedulers.add(self)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._jobs
+
+    def get_job(self, job_id: str) -> Optional[ScheduledJob]:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> List[ScheduledJob]:
+        """Snapshot of the registered jobs."""
+        with self._cond:
+            return list(self._jobs.values())
+
+    def add(
+        self,
+        job_id: str,
+        func: Callable[[], object],
+        run_at: datetime,
+        priority: int = 3,
+        recurrence: Optional[str] = None
+    ) -> ScheduledJob:
+        """
+        Register a job, replacing any job with the same id. O(log n).
+
+        Raises:
+            ValueError: If recurrence is not None, daily, weekly or monthly
+        """
+        if recurrence is not None and recurrence not in RECURRENCES:
+            raise ValueError(f"Unknown recurrence: {recurrence}")
+        job = ScheduledJob(job_id, func, run_at, priority, recurrence)
+        with self._cond:
+            previous = self._jobs.pop(job_id, None)
+            if previous is not None:
+                self._discard(previous)
+            self._jobs[job_id] = job
+            self._push(job)
+            self._wake()
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job by id. Returns False if no such job is registered."""
+        with self._cond:
+            job = self._jobs.pop(job_id, None)
+            if job is None:
+                return False
+            self._discard(job)
+            self._wake()
+        return True
+
+    def next_deadline(self) -> Optional[float]:
+        """Timestamp of the earliest live job, or None if nothing is scheduled."""
+        with self._cond:
+            self._drop_stale_top()
+            return self._heap[0][0] if self._heap else None
+
+    def run_pending(self) -> int:
+        """Move every due job to the ready queue and dispatch as many as workers allow."""
+        with self._cond:
+            now = self._clock()
+            moved = 0
+            while self._heap:
+                self._drop_stale_top()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                fire_at, priority, seq, job = heapq.heappop(self._heap)
+                heapq.heappush(self._ready, (priority, fire_at, seq, job))
+                moved += 1
+                if job.recurrence:
+                    job.run_at = next_occurrence(job.run_at, job.recurrence, job.anchor_day)
+                    # Skip occurrences missed while the process was not running
+                    while job.run_at.timestamp() <= now:
+                        job.run_at = next_occurrence(job.run_at, job.recurrence, job.anchor_day)
+                    self._push(job)
+                else:
+                    del self._jobs[job.job_id]
+            self._dispatch_ready()
+            return moved
+
+    def start(self) -> None:
+        """Run the scheduling loop in a background thread."""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="scheduler-worker")
+        self._thread = threading.Thread(target=self._run_thread, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop the loop; running jobs finish, queued ones stay registered."""
+        with self._cond:
+            self._running = False
+            self._wake()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def run_forever(self) -> None:
+        """Run the scheduling loop in the calling thread until stop() is called."""
+        with self._cond:
+            self._running = True
+            self._executor = self._executor or ThreadPoolExecutor(self.max_workers, thread_name_prefix="scheduler-worker")
+        self._run_thread()
+
+    async def serve(self) -> None:
+        """
+        Run the scheduling loop on the current asyncio event loop.
+
+        Jobs still execute in the worker pool, so blocking jobs never stall the
+        loop. Cancel the awaiting task (e.g. on application shutdown) to stop.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._async_wake = asyncio.Event()
+        with self._cond:
+            self._running = True
+            self._executor = self._executor or ThreadPoolExecutor(self.max_workers, thread_name_prefix="scheduler-worker")
+        try:
+            while self._running:
+                self._async_wake.clear()
+                self.run_pending()
+                timeout = self._sleep_time()
+                try:
+                    await asyncio.wait_for(self._async_wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._loop = None
+            self._async_wake = None
+            self.stop(wait=False)
+
+    def _run_thread(self) -> None:
+        with self._cond:
+            while self._running:
+                self.run_pending()
+                self._cond.wait(self._sleep_time())
+
+    def _sleep_time(self) -> Optional[float]:
+        deadline = self.next_deadline()
+        if deadline is None:
+            return None
+        return max(0.0, deadline - self._clock())
+
+    def _push(self, job: ScheduledJob) -> None:
+        job.seq = next(self._seq)
+        heapq.heappush(self._heap, (job.run_at.timestamp(), job.priority, job.seq, job))
+
+    def _discard(self, job: ScheduledJob) -> None:
+        job.cancelled = True
+        self._stale += 1
+        if self._stale > len(self._heap) // 2:
+            self._heap = [entry for entry in self._heap if not entry[3].cancelled]
+            heapq.heapify(self._heap)
+            self._stale = 0
+
+    def _drop_stale_top(self) -> None:
+        while self._heap and self._heap[0][3].cancelled:
+            heapq.heappop(self._heap)
+            self._stale = max(0, self._stale - 1)
+
+    def _dispatch_ready(self) -> None:
+        while self._ready and self._idle_workers > 0 and self._executor is not None:
+            _, fire_at, _, job = heapq.heappop(self._ready)
+            if job.cancelled:
+                continue
+            self._idle_workers -= 1
+            self._executor.submit(self._execute, job, fire_at)
+
+    def _execute(self, job: ScheduledJob, fire_at: float) -> None:
+        kind = job_kind(job.job_id)
+        SCHEDULER_DISPATCH_LAG.observe(max(0.0, self._clock() - fire_at), kind)
+        started = time.perf_counter()
+        try:
+            if job.func() is False:
+                SCHEDULER_JOB_FAILURES.inc(1.0, kind)
+        except Exception:
+            SCHEDULER_JOB_FAILURES.inc(1.0, kind)
+            logger.exception("Error executing job %s", job.job_id)
+        finally:
+            SCHEDULER_JOB_SECONDS.observe(time.perf_counter() - started, kind)
+            with self._cond:
+                self._idle_workers += 1
+                # Hand the freed worker straight to the next ready job
+                if self._running:
+                    self._dispatch_ready()
+                self._wake()
+
+    def _wake(self) -> None:
+        self._cond.notify_all()
+        if self._loop is not None and self._async_wake is not None:
+            self._loop.call_soon_threadsafe(self._async_wake.set)
@@ -0,0 +1,122 @@
+"""
+Closure table for the category tree.
+
+category_closure holds one row per (ancestor, descendant) pair, including each
+category paired with itself at depth 0, so subtrees and ancestor paths are a
+single indexed lookup at any depth. SQLite triggers on categories keep it
+current on insert and on parent_id changes (moves, and the SET NULL applied
+when a parent is deleted); deleted categories drop out through the ON DELETE
+CASCADE foreign keys. On other dialects the triggers are not installed and
+rebuild_closure() has to be run after tree changes.
+"""
+from typing import Dict, List
+
+from sqlalchemy import Select, event, select, text
+from sqlalchemy.engine import Connection
+
+from .database import Base
+from .task_manager import Category, CategoryClosure, task_category
+
+CLOSURE_TABLE = CategoryClosure.__tablename__
+
+# Links from every ancestor of the new parent to every node of the moved subtree
+_LINK_SUBTREE = f"""
+INSERT INTO {CLOSURE_TABLE} (ancestor_id, descendant_id, depth)
+SELECT a.ancestor_id, d.descendant_id, a.depth + d.depth + 1
+FROM {CLOSURE_TABLE} a, {CLOSURE_TABLE} d
+WHERE a.descendant_id = NEW.parent_id AND d.ancestor_id = NEW.id;
+"""
+
+TRIGGERS: Dict[str, str] = {
+    "cc_category_insert": f"""
+CREATE TRIGGER IF NOT EXISTS cc_category_insert AFTER INSERT ON categories BEGIN
+INSERT INTO {CLOSURE_TABLE} (ancestor_id, descendant_id, depth) VALUES (NEW.id, NEW.id, 0);
+INSERT INTO {CLOSURE_TABLE} (ancestor_id, descendant_id, depth)
+SELECT ancestor_id, NEW.id, depth + 1 FROM {CLOSURE_TABLE} WHERE descendant_id = NEW.parent_id;
+END""",
+    # A category cannot become a child of itself or of one of its descendants
+    "cc_category_cycle": f"""
+CREATE TRIGGER IF NOT EXISTS cc_category_cycle BEFORE UPDATE OF parent_id ON categories
+WHEN NEW.parent_id IS NOT NULL AND EXISTS (
+    SELECT 1 FROM {CLOSURE_TABLE} WHERE ancestor_id = NEW.id AND descendant_id = NEW.parent_id
+) BEGIN
+SELECT RAISE(ABORT, 'category cannot be moved below itself');
+END""",
+    # Detach the subtree from all of its former ancestors, then link it under the new parent
+    "cc_category_move": f"""
+CREATE TRIGGER IF NOT EXISTS cc_category_move AFTER UPDATE OF parent_id ON categories
+WHEN NEW.parent_id IS NOT OLD.parent_id BEGIN
+DELETE FROM {CLOSURE_TABLE}
+WHERE descendant_id IN (SELECT descendant_id FROM {CLOSURE_TABLE} WHERE ancestor_id = NEW.id)
+  AND ancestor_id NOT IN (SELECT descendant_id FROM {CLOSURE_TABLE} WHERE ancestor_id = NEW.id);
+{_LINK_SUBTREE}END""",
+}
+
+_REBUILD: List[str] = [
+    f"DELETE FROM {CLOSURE_TABLE}",
+    f"""
+WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+    SELECT id, id, 0 FROM categories
+    UNION ALL
+    SELECT tree.ancestor_id, c.id, tree.depth + 1
+    FROM tree JOIN categories c ON c.parent_id = tree.descendant_id
+)
+INSERT INTO {CLOSURE_TABLE} (ancestor_id, descendant_id, depth)
+SELECT ancestor_id, descendant_id, depth FROM tree
+""",
+]
+
+
+def rebuild_closure(conn: Connection) -> None:
+    """Recompute category_closure from categories.parent_id."""
+    for statement in _REBUILD:
+        conn.execute(text(statement))
+
+
+def install_closure(conn: Connection) -> bool:
+    """
+    Create any missing closure triggers, rebuilding the closure if some were missing.
+
+    Returns:
+        bool: True if triggers were (re)created and the closure rebuilt
+    """
+    if conn.dialect.name != "sqlite":
+        return False
+    existing = set(conn.execute(
+        text("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'cc_%'")
+    ).scalars())
+    if existing >= TRIGGERS.keys():
+        return False
+    for ddl in TRIGGERS.values():
+        conn.execute(text(ddl))
+    rebuild_closure(conn)
+    return True
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_closure_after_create(target, connection, **kw) -> None:
+    install_closure(connection)
+
+
+def subtree_ids(category_id: int) -> Select:
+    """Ids of the category and all of its descendants."""
+    return select(CategoryClosure.descendant_id).where(CategoryClosure.ancestor_id == category_id)
+
+
+def subtree_task_ids(category_id: int) -> Select:
+    """Ids of tasks linked to the category or any of its descendants (may repeat)."""
+    return (
+        select(task_category.c.task_id)
+        .join(CategoryClosure, CategoryClosure.descendant_id == task_category.c.category_id)
+        .where(CategoryClosure.ancestor_id == category_id)
+    )
+
+
+def ancestors(category_id: int) -> Select:
+    """Ancestors of a category from the root down, excluding the category itself."""
+    return (
+        select(Category)
+        .join(CategoryClosure, CategoryClosure.ancestor_id == Category.id)
+        .where(CategoryClosure.descendant_id == category_id, CategoryClosure.depth > 0)
+        .order_by(CategoryClosure.depth.desc())
+    )
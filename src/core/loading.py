@@ -0,0 +1,113 @@
+"""
+Loading strategies for Task relationships and a query budget guard.
+
+Relationships on Task and Category are declared ``lazy="raise_on_sql"``, so
+every query has to pick its strategy here. Listings use a column projection plus
+one category query per page; single-task reads use selectin loading.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Union
+
+from sqlalchemy import Select, event, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import load_only, selectinload
+
+from .task_manager import Task, Category, task_category
+
+# Task detail: categories in one extra SELECT ... WHERE task_id IN (...)
+TASK_DETAIL_OPTIONS = (
+    selectinload(Task.categories).load_only(Category.name),
+)
+
+# Columns exposed by list endpoints; skips created_at and relationship loading
+TASK_LIST_OPTIONS = (
+    load_only(
+        Task.id, Task.title, Task.completed, Task.due_date, Task.priority,
+        Task.estimated_minutes, Task.actual_minutes,
+    ),
+)
+
+
+async def load_category_names(db: AsyncSession, task_query: Select) -> Dict[int, List[str]]:
+    """
+    Fetch category names for every task matched by a listing query in one round trip.
+
+    The listing query is reused as an id subquery, so the cost does not grow
+    with the number of tasks on the page.
+
+    Args:
+        db: Async database session
+        task_query: Filtered (and possibly limited) select over Task
+
+    Returns:
+        Dict[int, List[str]]: Category names keyed by task id
+    """
+    task_ids = task_query.with_only_columns(Task.id).subquery()
+    result = await db.execute(
+        select(task_category.c.task_id, Category.name)
+        .join(Category, Category.id == task_category.c.category_id)
+        .where(task_category.c.task_id.in_(select(task_ids.c.id)))
+    )
+    names: Dict[int, List[str]] = defaultdict(list)
+    for task_id, name in result:
+        names[task_id].append(name)
+    return names
+
+
+async def load_category_names_for_ids(db: AsyncSession, task_ids: Sequence[int]) -> Dict[int, List[str]]:
+    """Fetch category names for an explicit batch of task ids in one query."""
+    result = await db.execute(
+        select(task_category.c.task_id, Category.name)
+        .join(Category, Category.id == task_category.c.category_id)
+        .where(task_category.c.task_id.in_(task_ids))
+    )
+    names: Dict[int, List[str]] = defaultdict(list)
+    for task_id, name in result:
+        names[task_id].append(name)
+    return names
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block issues more SQL statements than its budget allows."""
+
+
+class QueryCounter:
+    """Counts statements executed on an engine while attached."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+
+@contextmanager
+def query_budget(bind: Union[Engine, AsyncEngine], max_queries: int) -> Iterator[QueryCounter]:
+    """
+    Fail when the enclosed block issues more than max_queries statements.
+
+    Usage:
+        with query_budget(engine, 3):
+            client.get("/tasks")
+
+    Raises:
+        QueryBudgetExceeded: If the budget is exceeded, listing the statements
+    """
+    sync_engine = getattr(bind, "sync_engine", bind)
+    counter = QueryCounter()
+    event.listen(sync_engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", counter)
+    if counter.count > max_queries:
+        listing = "\n".join(f"  {i + 1}. {s}" for i, s in enumerate(counter.statements))
+        raise QueryBudgetExceeded(
+            f"Expected at most {max_queries} queries, got {counter.count}:\n{listing}"
+        )
@@ -0,0 +1,287 @@
+"""
+In-process metrics in the Prometheus text format, plus SQL timing hooks.
+
+Counters, gauges and histograms live in a module-level REGISTRY and are
+rendered by GET /metrics. Recording is a dict lookup and a few additions
+under a per-metric lock, cheap enough to leave on in production; histogram
+buckets are fixed, so memory does not grow with traffic. Label values must
+come from small sets (route templates, job kinds, statement verbs), never
+from ids or user input.
+
+instrument_engine() times every statement on an engine, logs the slow ones
+with their parameters, and adds them to the current request's totals when
+a request scope is active (see api.metrics).
+"""
+import contextvars
+import functools
+import logging
+import math
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Default histogram buckets, in seconds
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Statements slower than this are logged with their parameters
+SLOW_QUERY_SECONDS = 0.1
+
+# Longest parameter repr written to the slow query log
+SLOW_QUERY_PARAMS_CHARS = 500
+
+slow_query_log = logging.getLogger("dayplanner.sql.slow")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_text(self, labels: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(self.labelnames, labels)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {_escape(self.documentation)}\n# TYPE {self.name} {self.kind}\n"
+        return header + "".join(line + "\n" for line in self.samples())
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{self._label_text(labels)} {_format_value(value)}" for labels, value in items]
+
+
+class Gauge(_Metric):
+    """Current value per label set, or a function read at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._function = function
+
+    def value(self, *labels: str) -> float:
+        if self._function is not None:
+            return self._function()
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterable[str]:
+        if self._function is not None:
+            return [f"{self.name} {_format_value(self._function())}"]
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{self._label_text(labels)} {_format_value(value)}" for labels, value in items]
+
+
+@dataclass
+class _HistogramValue:
+    counts: List[int]  # per bucket, not cumulative; the last one is +Inf
+    total: float = 0.0
+    count: int = 0
+
+
+class Histogram(_Metric):
+    """Fixed-bucket distribution per label set."""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], _HistogramValue] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = _HistogramValue([0] * (len(self.buckets) + 1))
+            entry.counts[index] += 1
+            entry.total += value
+            entry.count += 1
+
+    def count(self, *labels: str) -> int:
+        entry = self._values.get(labels)
+        return entry.count if entry is not None else 0
+
+    def total(self, *labels: str) -> float:
+        entry = self._values.get(labels)
+        return entry.total if entry is not None else 0.0
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = [(labels, list(v.counts), v.total, v.count) for labels, v in self._values.items()]
+        lines = []
+        for labels, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{self._label_text(labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_text(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._label_text(labels)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """
+        Add a metric; registering the same name again returns the existing one.
+
+        Raises:
+            ValueError: If the name is taken by a metric of another type or labels
+        """
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is None:
+                self._metrics[metric.name] = metric
+                return metric
+        if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+            raise ValueError(f"Metric {metric.name} is already registered with another type or labels")
+        return existing
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        return "".join(metric.render() for metric in metrics)
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(
+    name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+SQL_QUERY_SECONDS = histogram(
+    "dayplanner_sql_query_duration_seconds", "SQL statement execution time", ("statement",)
+)
+SQL_SLOW_QUERIES = counter(
+    "dayplanner_sql_slow_queries_total", f"SQL statements slower than {SLOW_QUERY_SECONDS}s", ("statement",)
+)
+
+
+@dataclass
+class RequestSql:
+    """SQL work done on behalf of the current request."""
+    queries: int = 0
+    seconds: float = 0.0
+
+
+current_request_sql: contextvars.ContextVar[Optional[RequestSql]] = contextvars.ContextVar(
+    "current_request_sql", default=None
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def statement_kind(statement: str) -> str:
+    """Leading keyword of a statement (select, insert, ...), for labels."""
+    head = statement.lstrip()[:10].split(None, 1)
+    verb = head[0].lower() if head else ""
+    return verb if verb in ("select", "insert", "update", "delete", "with", "pragma") else "other"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = getattr(context, "_metrics_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    kind = statement_kind(statement)
+    SQL_QUERY_SECONDS.observe(elapsed, kind)
+    request = current_request_sql.get()
+    if request is not None:
+        request.queries += 1
+        request.seconds += elapsed
+    if elapsed >= SLOW_QUERY_SECONDS:
+        SQL_SLOW_QUERIES.inc(1.0, kind)
+        params = repr(parameters)
+        if len(params) > SLOW_QUERY_PARAMS_CHARS:
+            params = params[:SLOW_QUERY_PARAMS_CHARS] + "..."
+        slow_query_log.warning("slow query (%.1f ms): %s | params=%s", elapsed * 1000, statement, params)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement run on the engine (idempotent)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
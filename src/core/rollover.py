@@ -0,0 +1,100 @@
+"""
+Set-based rollover of overdue tasks to today.
+
+Overdue incomplete tasks are moved in chunks of UPDATE ... WHERE id IN
+(SELECT id ... LIMIT n) statements, each committed on its own so SQLite's
+write lock is released between chunks instead of being held for the whole
+table. The (completed, due_date, ...) index on tasks serves both the count
+and the chunk selection.
+"""
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Callable, List, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from .task_manager import Task
+
+# Tasks moved per UPDATE/commit
+ROLLOVER_CHUNK_SIZE = 5000
+
+
+@dataclass
+class RolloverReport:
+    """Progress and outcome of a rollover run; updated in place after every chunk."""
+
+    today: date
+    dry_run: bool
+    overdue: int = 0
+    updated: int = 0
+    chunks: int = 0
+    started_at: datetime = field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+
+def overdue_condition(today: date):
+    return Task.completed == False, Task.due_date < today
+
+
+def rollover_overdue_tasks(
+    db: Session,
+    today: Optional[date] = None,
+    chunk_size: int = ROLLOVER_CHUNK_SIZE,
+    dry_run: bool = False,
+    progress: Optional[Callable[[RolloverReport, List[int]], None]] = None
+) -> RolloverReport:
+    """
+    Move every incomplete task due before `today` to `today`.
+
+    Args:
+        db: Database session; committed after every chunk
+        today: Target date, defaults to date.today()
+        chunk_size: Tasks updated per statement and transaction
+        dry_run: Only count the overdue tasks
+        progress: Called after each chunk with the report and the chunk's task ids
+
+    Returns:
+        RolloverReport: Counts of overdue and updated tasks
+
+    Raises:
+        ValueError: If chunk_size is not positive
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    today = today or date.today()
+    report = RolloverReport(today=today, dry_run=dry_run)
+    condition = overdue_condition(today)
+    report.overdue = db.scalar(select(func.count()).select_from(Task).where(*condition))
+    if progress:
+        progress(report, [])
+
+    if not dry_run:
+        returning = db.get_bind().dialect.update_returning
+        while True:
+            chunk = select(Task.id).where(*condition).limit(chunk_size)
+            stmt = update(Task).values(due_date=today).execution_options(synchronize_session=False)
+            if returning:
+                ids = list(db.scalars(stmt.where(Task.id.in_(chunk.scalar_subquery())).returning(Task.id)))
+            else:
+                ids = list(db.scalars(chunk))
+                if ids:
+                    db.execute(stmt.where(Task.id.in_(ids)))
+            db.commit()
+            if not ids:
+                break
+            report.updated += len(ids)
+            report.chunks += 1
+            if progress:
+                progress(report, ids)
+            if len(ids) < chunk_size:
+                break
+
+    report.finished_at = datetime.now()
+    if progress:
+        progress(report, [])
+    return report
@@ -0,0 +1,149 @@
+"""
+Incrementally maintained category_daily_load rollup.
+
+SQLite triggers on tasks, task_category and time_tracking add or subtract each
+row's contribution, so ORM writes, Core bulk inserts and FK cascades all keep the
+rollup current. On other dialects the triggers are not installed and
+rebuild_rollups() has to be run after writes.
+"""
+from typing import Dict, List
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+
+from .database import Base
+from .task_manager import CategoryDailyLoad
+
+ROLLUP_TABLE = CategoryDailyLoad.__tablename__
+
+_UPSERT = f"""
+INSERT INTO {ROLLUP_TABLE}
+    (category_id, day, task_count, completed_count, planned_minutes, open_minutes, tracked_minutes)
+SELECT {{category}}, {{day}}, {{values}}
+FROM {{source}}
+WHERE {{where}}
+ON CONFLICT (category_id, day) DO UPDATE SET
+    task_count = task_count + excluded.task_count,
+    completed_count = completed_count + excluded.completed_count,
+    planned_minutes = planned_minutes + excluded.planned_minutes,
+    open_minutes = open_minutes + excluded.open_minutes,
+    tracked_minutes = tracked_minutes + excluded.tracked_minutes;
+"""
+
+
+def _task_values(row: str, sign: int) -> str:
+    estimate = f"COALESCE({row}.estimated_minutes, 0)"
+    return (
+        f"{sign}, {sign} * {row}.completed, {sign} * {estimate}, "
+        f"{sign} * CASE WHEN {row}.completed THEN 0 ELSE {estimate} END, 0"
+    )
+
+
+def _track_values(row: str, sign: int) -> str:
+    return f"0, 0, 0, 0, {sign} * COALESCE({row}.duration_minutes, 0)"
+
+
+def _upsert(category: str, day: str, values: str, source: str, where: str) -> str:
+    return _UPSERT.format(category=category, day=day, values=values, source=source, where=where)
+
+
+def _trigger(name: str, timing: str, condition: str, *statements: str) -> str:
+    return f"CREATE TRIGGER IF NOT EXISTS {name} {timing} {condition}BEGIN{''.join(statements)}END"
+
+
+TRIGGERS: Dict[str, str] = {
+    # Linking a task to a category moves its estimate and tracked time into the category
+    "cdl_link_insert": _trigger(
+        "cdl_link_insert", "AFTER INSERT ON task_category", "",
+        _upsert("NEW.category_id", "t.due_date", _task_values("t", 1), "tasks t", "t.id = NEW.task_id"),
+        _upsert("NEW.category_id", "date(tt.start_time)", _track_values("tt", 1),
+                "time_tracking tt", "tt.task_id = NEW.task_id"),
+    ),
+    # Skipped when the category itself is being deleted; its rollup rows cascade away
+    "cdl_link_delete": _trigger(
+        "cdl_link_delete", "AFTER DELETE ON task_category",
+        "WHEN EXISTS (SELECT 1 FROM categories WHERE id = OLD.category_id) ",
+        _upsert("OLD.category_id", "t.due_date", _task_values("t", -1), "tasks t", "t.id = OLD.task_id"),
+        _upsert("OLD.category_id", "date(tt.start_time)", _track_values("tt", -1),
+                "time_tracking tt", "tt.task_id = OLD.task_id"),
+    ),
+    # Runs before FK cascades remove the links; the cascaded link deletes then no
+    # longer see the task row, so its estimate is subtracted exactly once
+    "cdl_task_delete": _trigger(
+        "cdl_task_delete", "BEFORE DELETE ON tasks", "",
+        _upsert("l.category_id", "OLD.due_date", _task_values("OLD", -1), "task_category l", "l.task_id = OLD.id"),
+    ),
+    "cdl_task_update": _trigger(
+        "cdl_task_update", "AFTER UPDATE OF due_date, estimated_minutes, completed ON tasks", "",
+        _upsert("l.category_id", "OLD.due_date", _task_values("OLD", -1), "task_category l", "l.task_id = OLD.id"),
+        _upsert("l.category_id", "NEW.due_date", _task_values("NEW", 1), "task_category l", "l.task_id = NEW.id"),
+    ),
+    "cdl_track_insert": _trigger(
+        "cdl_track_insert", "AFTER INSERT ON time_tracking", "",
+        _upsert("l.category_id", "date(NEW.start_time)", _track_values("NEW", 1),
+                "task_category l", "l.task_id = NEW.task_id"),
+    ),
+    "cdl_track_delete": _trigger(
+        "cdl_track_delete", "AFTER DELETE ON time_tracking", "",
+        _upsert("l.category_id", "date(OLD.start_time)", _track_values("OLD", -1),
+                "task_category l", "l.task_id = OLD.task_id"),
+    ),
+    "cdl_track_update": _trigger(
+        "cdl_track_update", "AFTER UPDATE OF task_id, start_time, duration_minutes ON time_tracking", "",
+        _upsert("l.category_id", "date(OLD.start_time)", _track_values("OLD", -1),
+                "task_category l", "l.task_id = OLD.task_id"),
+        _upsert("l.category_id", "date(NEW.start_time)", _track_values("NEW", 1),
+                "task_category l", "l.task_id = NEW.task_id"),
+    ),
+}
+
+_REBUILD: List[str] = [
+    f"DELETE FROM {ROLLUP_TABLE}",
+    _upsert(
+        "l.category_id", "t.due_date",
+        "COUNT(*), SUM(t.completed), SUM(COALESCE(t.estimated_minutes, 0)), "
+        "SUM(CASE WHEN t.completed THEN 0 ELSE COALESCE(t.estimated_minutes, 0) END), 0",
+        "task_category l JOIN tasks t ON t.id = l.task_id",
+        "1 = 1 GROUP BY l.category_id, t.due_date",
+    ),
+    _upsert(
+        "l.category_id", "date(tt.start_time)",
+        "0, 0, 0, 0, SUM(COALESCE(tt.duration_minutes, 0))",
+        "task_category l JOIN time_tracking tt ON tt.task_id = l.task_id",
+        "1 = 1 GROUP BY l.category_id, date(tt.start_time)",
+    ),
+]
+
+
+def rebuild_rollups(conn: Connection) -> None:
+    """Recompute category_daily_load from the raw tables."""
+    for statement in _REBUILD:
+        conn.execute(text(statement))
+
+
+def install_rollups(conn: Connection) -> bool:
+    """
+    Create any missing rollup triggers, rebuilding the rollup if some were missing.
+
+    Safe to call on every startup; databases created before the rollup existed
+    are backfilled once.
+
+    Returns:
+        bool: True if triggers were (re)created and the rollup rebuilt
+    """
+    if conn.dialect.name != "sqlite":
+        return False
+    existing = set(conn.execute(
+        text("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'cdl_%'")
+    ).scalars())
+    if existing >= TRIGGERS.keys():
+        return False
+    for ddl in TRIGGERS.values():
+        conn.execute(text(ddl))
+    rebuild_rollups(conn)
+    return True
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_rollups_after_create(target, connection, **kw) -> None:
+    install_rollups(connection)
@@ -0,0 +1,236 @@
+"""
+Read/write routing between a primary database and read replicas.
+
+Handlers that only read take their session from DatabaseRouter.session(...,
+read_only=True); everything else gets a session pinned to the primary.
+A read-only session sends its SELECTs to one replica (round robin across
+sessions) and switches to the primary for good at its first write, flush
+or SELECT ... FOR UPDATE, so a handler never mixes its own writes with
+replica reads.
+
+Read-your-writes: once a client commits a write, its read-only sessions
+stay on the primary for sticky_seconds, which should cover replica lag.
+Clients are told apart by the key the caller passes (the API uses the
+client address). With no replicas configured every session is a plain
+primary session.
+
+On SQLite, write transactions from this process take turns on an asyncio
+lock. SQLite has one write lock per database and a writer that finds it
+taken polls for it with growing sleeps (up to 100 ms each), so under
+concurrent writes the last writers in line waited seconds; queueing them
+in the event loop hands the lock over as soon as the previous transaction
+ends. SQLite takes its lock at a transaction's first write, so a session
+acquires the asyncio lock before its first DML statement, flush with
+pending changes or run_sync() call, and holds it until commit, rollback
+or close.
+"""
+import asyncio
+import itertools
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Sequence
+
+from sqlalchemy import TextClause
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.selectable import Select
+
+from .config import READ_STICKY_SECONDS
+from .metrics import counter
+
+# Clients whose last write is remembered for read-your-writes
+STICKY_MAX_CLIENTS = 10_000
+
+DB_SESSIONS = counter(
+    "dayplanner_db_sessions_total", "Database sessions by the engine their reads went to", ("target",)
+)
+
+
+def is_write_statement(statement: Any) -> bool:
+    """Whether a statement writes (DML or raw SQL) or locks rows for writing."""
+    return isinstance(statement, (UpdateBase, TextClause)) or (
+        isinstance(statement, Select) and statement._for_update_arg is not None
+    )
+
+
+class RoutingSession(Session):
+    """Session whose get_bind() picks the primary or a replica per statement."""
+
+    def __init__(
+        self,
+        router: "DatabaseRouter",
+        client_key: Optional[Hashable] = None,
+        use_primary: bool = True,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.router = router
+        self.client_key = client_key
+        self.use_primary = use_primary or not router.replicas
+        self.wrote = False
+        self._replica: Optional[Engine] = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs) -> Engine:
+        # Without a statement the caller is asking which database this is
+        if mapper is None and clause is None and not self._flushing:
+            return self.router.primary.sync_engine
+        if self._flushing or is_write_statement(clause):
+            self.wrote = True
+            self.use_primary = True
+        if self.use_primary:
+            return self.router.primary.sync_engine
+        if self._replica is None:
+            self._replica = self.router.next_replica()
+        return self._replica
+
+    def replica_may_lag(self, last_write_at: float) -> bool:
+        """
+        Whether this session read from a replica that may miss writes made
+        on the primary at last_write_at (time.monotonic()) or later.
+        """
+        return self._replica is not None and time.monotonic() - last_write_at < self.router.sticky_seconds
+
+    def commit(self) -> None:
+        super().commit()
+        if self.wrote:
+            self.router.note_write(self.client_key)
+
+
+class RoutingAsyncSession(AsyncSession):
+    """AsyncSession holding the router's write lock, if it has one, while it writes."""
+
+    _write_lock: Optional[asyncio.Lock] = None
+
+    async def _begin_write(self) -> None:
+        if self._write_lock is None:
+            lock = self.sync_session.router.write_lock()
+            if lock is not None:
+                await lock.acquire()
+                self._write_lock = lock
+
+    def _end_write(self) -> None:
+        lock, self._write_lock = self._write_lock, None
+        if lock is not None:
+            lock.release()
+
+    def _has_changes(self) -> bool:
+        session = self.sync_session
+        return bool(session.new or session.dirty or session.deleted)
+
+    async def execute(self, statement, *args, **kwargs):
+        if is_write_statement(statement):
+            await self._begin_write()
+        return await super().execute(statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        if is_write_statement(statement):
+            await self._begin_write()
+        return await super().scalar(statement, *args, **kwargs)
+
+    async def stream(self, statement, *args, **kwargs):
+        if is_write_statement(statement):
+            await self._begin_write()
+        return await super().stream(statement, *args, **kwargs)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        # The sync code may write; there is no way to tell beforehand
+        await self._begin_write()
+        return await super().run_sync(fn, *args, **kwargs)
+
+    async def flush(self, objects=None) -> None:
+        if self._has_changes():
+            await self._begin_write()
+        await super().flush(objects)
+
+    async def commit(self) -> None:
+        if self._has_changes():
+            await self._begin_write()
+        await super().commit()
+        self._end_write()
+
+    async def rollback(self) -> None:
+        try:
+            await super().rollback()
+        finally:
+            self._end_write()
+
+    async def close(self) -> None:
+        try:
+            await super().close()
+        finally:
+            self._end_write()
+
+
+class DatabaseRouter:
+    """Hands out sessions routed between a primary and its replicas."""
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: Sequence[AsyncEngine] = (),
+        sticky_seconds: float = READ_STICKY_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.sticky_seconds = sticky_seconds
+        self._clock = clock
+        self._cycle = itertools.cycle([replica.sync_engine for replica in self.replicas])
+        self._last_writes: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        # One write transaction at a time per event loop; only SQLite has a single writer
+        self._serialize_writes = primary.dialect.name == "sqlite"
+        self._write_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._sessionmaker = async_sessionmaker(
+            class_=RoutingAsyncSession, expire_on_commit=False, autoflush=False,
+            sync_session_class=RoutingSession, router=self
+        )
+
+    def session(self, client_key: Optional[Hashable] = None, read_only: bool = False) -> AsyncSession:
+        """
+        A new session; read_only ones read from a replica unless the client wrote recently.
+
+        Args:
+            client_key: Identifies the client for read-your-writes
+            read_only: The handler is not expected to write
+        """
+        use_primary = not read_only or not self.replicas or self.wrote_recently(client_key)
+        DB_SESSIONS.inc(1.0, "primary" if use_primary else "replica")
+        return self._sessionmaker(client_key=client_key, use_primary=use_primary)
+
+    def write_lock(self) -> Optional[asyncio.Lock]:
+        """Lock write transactions on the primary hold, for the running event loop; None if not needed."""
+        if not self._serialize_writes:
+            return None
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            lock = self._write_locks.get(loop)
+            if lock is None:
+                lock = self._write_locks[loop] = asyncio.Lock()
+        return lock
+
+    def next_replica(self) -> Engine:
+        with self._lock:
+            return next(self._cycle)
+
+    def note_write(self, client_key: Optional[Hashable]) -> None:
+        with self._lock:
+            self._last_writes[client_key] = self._clock()
+            self._last_writes.move_to_end(client_key)
+            while len(self._last_writes) > STICKY_MAX_CLIENTS:
+                self._last_writes.popitem(last=False)
+
+    def wrote_recently(self, client_key: Optional[Hashable]) -> bool:
+        with self._lock:
+            written = self._last_writes.get(client_key)
+        return written is not None and self._clock() - written < self.sticky_seconds
+
+    async def dispose(self) -> None:
+        for engine in [self.primary, *self.replicas]:
+            await engine.dispose()
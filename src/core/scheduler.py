@@ -1,45 +1,76 @@
-import schedule
-import time
-from datetime import datetime, timedelta, date
-from typing import Callable, Dict, Optional, List, Any
+import logging
+from datetime import datetime, timedelta, date, time
+from typing import Callable, Dict, Optional, List, Any, Tuple
+from sqlalchemy import Row, or_
 from sqlalchemy.orm import Session
-from .task_manager import Task
+from .heap_scheduler import HeapScheduler, RECURRENCES, next_occurrence
+from .slots import (
+    BREAK_MINUTES, WORKDAY_END, WORKDAY_START, FreeSlotIndex, Interval, PlannedTask,
+    pack_tasks, working_windows
+)
+from .rollover import ROLLOVER_CHUNK_SIZE, RolloverReport, rollover_overdue_tasks
+from .task_manager import Task, TimeTracking
+from ..utils.notification import NotificationDispatcher, Reminder
+
+logger = logging.getLogger(__name__)
+
+# Days ahead searched for a free slot when retrying a failed task
+SLOT_SEARCH_DAYS = 7
+
+# Job id and daily run time of the overdue-task rollover
+ROLLOVER_JOB = "rollover-overdue"
+ROLLOVER_TIME = "00:05"
+
+# Job id and daily run time of the reminders for tasks due that day
+REMINDER_JOB = "due-reminders"
+REMINDER_TIME = "08:00"
 
 class TaskScheduler:
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers: int = 4,
+        session_factory: Optional[Callable[[], Session]] = None,
+        workday_start: time = WORKDAY_START,
+        workday_end: time = WORKDAY_END,
+        notifier: Optional[NotificationDispatcher] = None
+    ):
+        """
+        Args:
+            max_workers: Size of the worker pool running due tasks
+            session_factory: Opens a database session; when set, tracked time
+                counts as busy when looking for free slots
+            workday_start: Start of working hours for free-slot search
+            workday_end: End of working hours for free-slot search
+            notifier: Receives reminders from schedule_reminder and
+                schedule_due_reminders
+        """
         self.pending_tasks: Dict[str, Dict[str, Any]] = {}
         self.active_tasks: Dict[str, Dict[str, Any]] = {}
         self.recurring_tasks: Dict[str, Dict[str, Any]] = {}
-    
-    def schedule_task(
+        self.scheduled_tasks: Dict[str, Dict[str, Any]] = {}
+        self.engine = HeapScheduler(max_workers=max_workers)
+        self.session_factory = session_factory
+        self.workday_start = workday_start
+        self.workday_end = workday_end
+        self.rollover_report: Optional[RolloverReport] = None
+        self.notifier = notifier
+
+    @staticmethod
+    def _next_run_at(scheduled_time: str) -> datetime:
+        """Next occurrence of "HH:MM" today or tomorrow."""
+        hour, minute = (int(part) for part in scheduled_time.split(":"))
+        now = datetime.now()
+        run_at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        return run_at if run_at > now else run_at + timedelta(days=1)
+
+    def _wrap(
         self,
         task_name: str,
-        task_func: Callable[[], bool],  # Specify return type
+        task_func: Callable[[], bool],
         scheduled_time: str,
-        priority: int = 1,
-        recurring: Optional[str] = None,  # 'daily', 'weekly', 'monthly'
-        duration_minutes: int = 30
-    ) -> bool:
-        """
-        Schedule a task with advanced features
-        
-        Args:
-            task_name: Name of the task
-            task_func: Function to execute, should return bool indicating success
-            scheduled_time: Time in "HH:MM" format
-            priority: Task priority (1-5, 1 being highest)
-            recurring: Frequency of recurring task
-            duration_minutes: Expected task duration in minutes
-            
-        Returns:
-            bool: True if task was scheduled successfully
-        
-        Raises:
-            ValueError: If priority is not between 1 and 5
-        """
-        if not 1 <= priority <= 5:
-            raise ValueError("Priority must be between 1 and 5")
-
+        priority: int,
+        duration_minutes: int
+    ) -> Callable[[], bool]:
         def wrapped_task():
             try:
                 # Mark task as active
@@ -60,24 +91,61 @@ class TaskScheduler:
                         'priority': priority,
                         'duration': duration_minutes
                     }
-                
-                # Remove from active tasks
-                self.active_tasks.pop(task_name, None)
+                    self.reschedule_pending_tasks()
                 return success
                 
-            except Exception as e:
-                print(f"Error executing task {task_name}: {e}")
+            except Exception:
+                logger.exception("Error executing task %s", task_name)
                 return False
+            finally:
+                # Remove from active tasks
+                self.active_tasks.pop(task_name, None)
+
+        return wrapped_task
+
+    def schedule_task(
+        self,
+        task_name: str,
+        task_func: Callable[[], bool],  # Specify return type
+        scheduled_time: str,
+        priority: int = 1,
+        recurring: Optional[str] = None,  # 'daily', 'weekly', 'monthly'
+        duration_minutes: int = 30
+    ) -> bool:
+        """
+        Schedule a task with advanced features
+        
+        Args:
+            task_name: Name of the task, used as its job id
+            task_func: Function to execute, should return bool indicating success
+            scheduled_time: Time in "HH:MM" format
+            priority: Task priority (1-5, 1 being highest)
+            recurring: Frequency of recurring task; runs once if None
+            duration_minutes: Expected task duration in minutes
+            
+        Returns:
+            bool: True if task was scheduled successfully
+        
+        Raises:
+            ValueError: If priority is not between 1 and 5 or recurring is unknown
+        """
+        if not 1 <= priority <= 5:
+            raise ValueError("Priority must be between 1 and 5")
+        if recurring is not None and recurring not in RECURRENCES:
+            raise ValueError(f"Recurring must be one of {', '.join(RECURRENCES)}")
 
-        # Schedule based on recurrence
-        if recurring == 'daily':
-            schedule.every().day.at(scheduled_time).do(wrapped_task)
-        elif recurring == 'weekly':
-            schedule.every().week.at(scheduled_time).do(wrapped_task)
-        elif recurring == 'monthly':
-            schedule.every().month.at(scheduled_time).do(wrapped_task)
-        else:
-            schedule.every().day.at(scheduled_time).do(wrapped_task)
+        self.engine.add(
+            task_name,
+            self._wrap(task_name, task_func, scheduled_time, priority, duration_minutes),
+            self._next_run_at(scheduled_time),
+            priority=priority,
+            recurrence=recurring
+        )
+        self.scheduled_tasks[task_name] = {
+            'time': scheduled_time,
+            'priority': priority,
+            'duration': duration_minutes
+        }
             
         # Store recurring task info
         if recurring:
@@ -90,19 +158,18 @@ class TaskScheduler:
         return True
 
     def cancel_task(self, task_name: str) -> bool:
-        """Cancel a scheduled task"""
-        try:
-            # Remove from all task collections
-            self.pending_tasks.pop(task_name, None)
-            self.active_tasks.pop(task_name, None)
-            self.recurring_tasks.pop(task_name, None)
-            
-            # Remove from schedule
-            schedule.clear(task_name)
-            return True
-        except Exception as e:
-            print(f"Error cancelling task {task_name}: {e}")
-            return False
+        """Cancel a scheduled task and any pending retry"""
+        # Remove from all task collections
+        self.pending_tasks.pop(task_name, None)
+        self.active_tasks.pop(task_name, None)
+        self.recurring_tasks.pop(task_name, None)
+        self.scheduled_tasks.pop(task_name, None)
+        self.scheduled_tasks.pop(self._retry_id(task_name), None)
+        
+        # Remove from schedule
+        cancelled = self.engine.cancel(task_name)
+        retry_cancelled = self.engine.cancel(self._retry_id(task_name))
+        return cancelled or retry_cancelled
 
     def get_active_tasks(self) -> Dict:
         """Get currently running tasks"""
@@ -112,23 +179,40 @@ class TaskScheduler:
         """Get tasks that need rescheduling"""
         return self.pending_tasks
 
+    @staticmethod
+    def _retry_id(task_name: str) -> str:
+        return f"{task_name}:retry"
+
     def reschedule_pending_tasks(self) -> None:
         """Reschedule failed tasks for next available time"""
-        for task_name, task_info in self.pending_tasks.items():
+        for task_name in list(self.pending_tasks):
+            task_info = self.pending_tasks.pop(task_name, None)
+            if task_info is None:
+                continue
             # Calculate next available time slot
             next_time = self._find_next_available_slot(
                 task_info['duration'],
                 task_info['priority']
             )
             
-            self.schedule_task(
-                task_name,
-                task_info['task'],
-                next_time.strftime("%H:%M"),
-                task_info['priority'],
-                duration_minutes=task_info['duration']
+            # One-off retry under its own id so a recurring schedule stays intact
+            self.scheduled_tasks[self._retry_id(task_name)] = {
+                'time': next_time.strftime("%H:%M"),
+                'priority': task_info['priority'],
+                'duration': task_info['duration']
+            }
+            self.engine.add(
+                self._retry_id(task_name),
+                self._wrap(
+                    task_name,
+                    task_info['task'],
+                    next_time.strftime("%H:%M"),
+                    task_info['priority'],
+                    task_info['duration']
+                ),
+                next_time,
+                priority=task_info['priority']
             )
-        self.pending_tasks.clear()
 
     def _find_next_available_slot(
         self,
@@ -138,67 +222,253 @@ class TaskScheduler:
         """
         Find next available time slot based on duration and priority
         
+        Searches working hours over the next SLOT_SEARCH_DAYS days, treating
+        scheduled tasks (including recurrences) and tracked time as busy.
+        
         Args:
             duration: Task duration in minutes
-            priority: Task priority level
+            priority: Task priority level; the retry is dispatched with it
             
         Returns:
-            datetime: Next available time slot
+            datetime: Next available time slot, or the start of the first
+            working day after the search window if nothing fits
         """
-        # Simple implementation - can be enhanced with more complex logic
-        next_slot = datetime.now() + timedelta(hours=1)
-        return next_slot
+        now = datetime.now()
+        windows = working_windows(now.date(), SLOT_SEARCH_DAYS, self.workday_start, self.workday_end)
+        horizon_start, horizon_end = windows[0][0], windows[-1][1]
+        busy = self._scheduled_intervals(horizon_end)
+        if self.session_factory is not None:
+            with self.session_factory() as db:
+                busy.extend(self.tracked_intervals(db, horizon_start, horizon_end))
+
+        slot = FreeSlotIndex(windows, busy).find(now, duration)
+        if slot is None:
+            return datetime.combine(now.date() + timedelta(days=SLOT_SEARCH_DAYS), self.workday_start)
+        return slot
+
+    def _scheduled_intervals(self, until: datetime) -> List[Interval]:
+        """Busy intervals of every registered job occurrence before `until`."""
+        intervals = []
+        for job in self.engine.jobs():
+            info = self.scheduled_tasks.get(job.job_id)
+            if info is None:
+                continue
+            length = timedelta(minutes=info['duration'])
+            run_at = job.run_at
+            while run_at < until:
+                intervals.append((run_at, run_at + length))
+                if not job.recurrence:
+                    break
+                run_at = next_occurrence(run_at, job.recurrence, job.anchor_day)
+        return intervals
+
+    @staticmethod
+    def tracked_intervals(db: Session, start: datetime, end: datetime) -> List[Interval]:
+        """
+        Time tracking entries overlapping [start, end) as busy intervals.
+        
+        Entries without an end time last duration_minutes, or are treated as
+        running until now.
+        """
+        rows = db.query(
+            TimeTracking.start_time, TimeTracking.end_time, TimeTracking.duration_minutes
+        ).filter(
+            TimeTracking.start_time < end,
+            or_(TimeTracking.end_time > start, TimeTracking.end_time.is_(None))
+        ).all()
+        now = datetime.now()
+        intervals = []
+        for started, ended, minutes in rows:
+            if ended is None:
+                ended = started + timedelta(minutes=minutes) if minutes else max(started, now)
+            intervals.append((started, ended))
+        return intervals
 
     def run_scheduler(self) -> None:
-        """Run the scheduler with error handling"""
-        while True:
-            try:
-                schedule.run_pending()
-                self.reschedule_pending_tasks()  # Check and reschedule failed tasks
-                time.sleep(60)  # Check every minute
-            except Exception as e:
-                print(f"Error in scheduler: {e}")
-                time.sleep(60)  # Continue running even if there's an error    
+        """Run the scheduler in the calling thread, sleeping until the next job is due"""
+        self.engine.run_forever()
+
+    def start(self) -> None:
+        """Run the scheduler in a background thread"""
+        self.engine.start()
+
+    def stop(self) -> None:
+        """Stop the scheduler loop and wait for running tasks"""
+        self.engine.stop()
+
+    async def serve(self) -> None:
+        """Run the scheduler on the current asyncio event loop (e.g. inside FastAPI)"""
+        await self.engine.serve()
 
     @staticmethod
     def get_tasks_for_date(db: Session, target_date: date) -> List[Task]:
         return db.query(Task).filter(Task.due_date == target_date).all()
     
+    def schedule_rollover(
+        self,
+        at: str = ROLLOVER_TIME,
+        chunk_size: int = ROLLOVER_CHUNK_SIZE,
+        dry_run: bool = False
+    ) -> bool:
+        """
+        Run the overdue-task rollover every day at `at` ("HH:MM")
+        
+        The report of the current or last run, updated after every chunk,
+        is kept in rollover_report.
+        
+        Raises:
+            ValueError: If the scheduler has no session_factory
+        """
+        if self.session_factory is None:
+            raise ValueError("Rollover needs a session_factory")
+
+        def rollover() -> bool:
+            with self.session_factory() as db:
+                rollover_overdue_tasks(
+                    db, chunk_size=chunk_size, dry_run=dry_run, progress=self._record_rollover
+                )
+            return True
+
+        return self.schedule_task(ROLLOVER_JOB, rollover, at, priority=1, recurring="daily", duration_minutes=5)
+
+    def schedule_reminder(self, reminder: Reminder, at: datetime) -> str:
+        """
+        Hand `reminder` to the notifier at `at`; returns the job id
+        
+        Raises:
+            ValueError: If the scheduler has no notifier
+        """
+        if self.notifier is None:
+            raise ValueError("Reminders need a notifier")
+        job_id = f"reminder:{reminder.task_id if reminder.task_id is not None else reminder.title}"
+
+        def remind() -> bool:
+            self.notifier.enqueue(reminder)
+            return True
+
+        self.engine.add(job_id, remind, at, priority=1)
+        return job_id
+
+    def schedule_due_reminders(self, at: str = REMINDER_TIME) -> bool:
+        """
+        Remind about every incomplete task due that day, daily at `at` ("HH:MM")
+        
+        Raises:
+            ValueError: If the scheduler has no session_factory or notifier
+        """
+        if self.session_factory is None or self.notifier is None:
+            raise ValueError("Due reminders need a session_factory and a notifier")
+
+        def remind() -> bool:
+            self.remind_due_tasks(date.today())
+            return True
+
+        return self.schedule_task(REMINDER_JOB, remind, at, priority=1, recurring="daily", duration_minutes=1)
+
+    def remind_due_tasks(self, target_date: date) -> int:
+        """Enqueue a reminder per incomplete task due on target_date; returns the count"""
+        with self.session_factory() as db:
+            rows = db.query(Task.id, Task.title, Task.due_date).filter(
+                Task.due_date == target_date, Task.completed.is_(False)
+            ).all()
+        for task_id, title, due_date in rows:
+            self.notifier.enqueue(Reminder(task_id, title, datetime.combine(due_date, time.min)))
+        return len(rows)
+
+    def _record_rollover(self, report: RolloverReport, task_ids: List[int]) -> None:
+        self.rollover_report = report
+
+    @staticmethod
+    def reschedule_overdue_tasks(db: Session, chunk_size: int = ROLLOVER_CHUNK_SIZE) -> List[int]:
+        """
+        Move overdue incomplete tasks to today in chunked set-based updates
+        
+        Returns:
+            List[int]: Ids of the moved tasks
+        """
+        task_ids: List[int] = []
+        rollover_overdue_tasks(db, chunk_size=chunk_size, progress=lambda report, ids: task_ids.extend(ids))
+        return task_ids
+    
     @staticmethod
-    def reschedule_overdue_tasks(db: Session):
-        today = date.today()
-        overdue_tasks = db.query(Task).filter(
-            Task.due_date < today,
-            Task.completed == False
-        ).all()
+    def plan_day(
+        db: Session,
+        target_date: date,
+        workday_start: time = WORKDAY_START,
+        workday_end: time = WORKDAY_END,
+        break_minutes: int = BREAK_MINUTES,
+        include_overdue: bool = False
+    ) -> Tuple[List[PlannedTask], List[Row]]:
+        """
+        Pack the day's incomplete tasks into the free working time
         
-        for task in overdue_tasks:
-            task.due_date = today
+        Tasks are placed most important first (priority 1 = highest, then
+        earliest due date, then shortest estimate) into the earliest gap
+        left by time already tracked that day. For today, nothing is placed
+        in the past.
         
-        db.commit()
-        return overdue_tasks
+        Args:
+            db: Database session
+            target_date: Date to plan
+            workday_start: Start of working hours
+            workday_end: End of working hours
+            break_minutes: Pause after each task
+            include_overdue: Also plan incomplete tasks due before target_date
+            
+        Returns:
+            Tuple of planned tasks in start order and tasks that did not fit;
+            tasks are (id, title, priority, due_date, estimated_minutes) rows
+        """
+        tasks = db.query(
+            Task.id, Task.title, Task.priority, Task.due_date, Task.estimated_minutes
+        ).filter(*TaskScheduler._plan_filter(target_date, include_overdue)).all()
+        return TaskScheduler._pack_day(db, tasks, target_date, workday_start, workday_end, break_minutes)
     
     @staticmethod
-    def optimize_schedule(db: Session, target_date: date) -> List[Task]:
+    def optimize_schedule(
+        db: Session,
+        target_date: date,
+        workday_start: time = WORKDAY_START,
+        workday_end: time = WORKDAY_END,
+        break_minutes: int = BREAK_MINUTES,
+        include_overdue: bool = False
+    ) -> List[Task]:
         """
         Optimize the schedule for a given date
         
         Args:
             db: Database session
             target_date: Date to optimize schedule for
+            workday_start: Start of working hours
+            workday_end: End of working hours
+            break_minutes: Pause after each task
+            include_overdue: Also schedule incomplete tasks due before target_date
             
         Returns:
-            List[Task]: Optimized list of tasks
+            List[Task]: Tasks in planned start order, followed by tasks that
+            did not fit into the day (most important first)
         """
-        tasks = db.query(Task).filter(
-            Task.due_date == target_date,
-            Task.completed == False
-        ).order_by(Task.priority.desc()).all()
-        
-        # TODO: Implement scheduling optimization logic
-        # Consider:
-        # - Task priorities
-        # - Task durations
-        # - Working hours
-        # - Breaks between tasks
-        return tasks    
\ No newline at end of file
+        tasks = db.query(Task).filter(*TaskScheduler._plan_filter(target_date, include_overdue)).all()
+        planned, unscheduled = TaskScheduler._pack_day(
+            db, tasks, target_date, workday_start, workday_end, break_minutes
+        )
+        return [entry.task for entry in planned] + unscheduled
+
+    @staticmethod
+    def _pack_day(
+        db: Session,
+        tasks: List[Any],
+        target_date: date,
+        workday_start: time,
+        workday_end: time,
+        break_minutes: int
+    ) -> Tuple[List[PlannedTask], List[Any]]:
+        windows = working_windows(target_date, 1, workday_start, workday_end)
+        day_start, day_end = windows[0]
+        index = FreeSlotIndex(windows, TaskScheduler.tracked_intervals(db, day_start, day_end))
+        return pack_tasks(index, tasks, max(day_start, datetime.now()), break_minutes)
+
+    @staticmethod
+    def _plan_filter(target_date: date, include_overdue: bool) -> tuple:
+        due = Task.due_date <= target_date if include_overdue else Task.due_date == target_date
+        return due, Task.completed == False
@@ -0,0 +1,126 @@
+"""
+Full-text index over task titles.
+
+tasks_fts is an external-content FTS5 table over tasks.title: it stores only
+the index, and triggers on tasks keep it in sync with inserts, title updates
+and deletes. Databases created before the index existed are backfilled the
+first time install_search() runs; rebuild it by hand with
+
+    python -m src.core.search [--url sqlite:///./dayplanner.db]
+"""
+import argparse
+import re
+from typing import Dict, List
+
+from sqlalchemy import ColumnElement, column, event, func, literal_column, table, text
+from sqlalchemy.engine import Connection
+
+from .database import SQLALCHEMY_DATABASE_URL, Base, build_engine
+
+SEARCH_TABLE = "tasks_fts"
+
+# Lightweight handle for joining the index in Core/ORM selects
+search_table = table(SEARCH_TABLE, column("rowid"), column("title"))
+
+# Words are split on anything that is not a letter, digit or underscore,
+# matching the unicode61 tokenizer closely enough for query building
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+_CREATE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+    title,
+    content='tasks',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+)
+"""
+
+TRIGGERS: Dict[str, str] = {
+    "fts_task_insert": f"""
+CREATE TRIGGER IF NOT EXISTS fts_task_insert AFTER INSERT ON tasks BEGIN
+INSERT INTO {SEARCH_TABLE} (rowid, title) VALUES (NEW.id, NEW.title);
+END""",
+    "fts_task_delete": f"""
+CREATE TRIGGER IF NOT EXISTS fts_task_delete AFTER DELETE ON tasks BEGIN
+INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, title) VALUES ('delete', OLD.id, OLD.title);
+END""",
+    "fts_task_update": f"""
+CREATE TRIGGER IF NOT EXISTS fts_task_update AFTER UPDATE OF title ON tasks BEGIN
+INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, title) VALUES ('delete', OLD.id, OLD.title);
+INSERT INTO {SEARCH_TABLE} (rowid, title) VALUES (NEW.id, NEW.title);
+END""",
+}
+
+
+def search_terms(query: str) -> List[str]:
+    return _TERM.findall(query)
+
+
+def match_expression(query: str, prefix: bool = True) -> str:
+    """
+    Turn free text into an FTS5 query matching every word.
+
+    Each word is quoted, so FTS5 operators typed by users are searched as
+    text; with prefix=True each word also matches longer words ("rep"
+    finds "report").
+
+    Raises:
+        ValueError: If the query contains no searchable words
+    """
+    terms = search_terms(query)
+    if not terms:
+        raise ValueError("Search query must contain at least one word")
+    star = "*" if prefix else ""
+    return " ".join(f'"{term}"{star}' for term in terms)
+
+
+def fts_match(expression: str) -> ColumnElement:
+    return literal_column(SEARCH_TABLE).op("MATCH")(expression)
+
+
+def fts_rank() -> ColumnElement:
+    """bm25 relevance; lower is better."""
+    return func.bm25(literal_column(SEARCH_TABLE))
+
+
+def rebuild_search(conn: Connection) -> None:
+    """Re-index every task title."""
+    conn.execute(text(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('rebuild')"))
+
+
+def install_search(conn: Connection) -> bool:
+    """
+    Create the FTS table and triggers if missing, rebuilding the index if anything was missing.
+
+    Returns:
+        bool: True if the index was (re)created and rebuilt
+    """
+    if conn.dialect.name != "sqlite":
+        return False
+    existing = set(conn.execute(text(
+        "SELECT name FROM sqlite_master WHERE (type = 'trigger' AND name LIKE 'fts_%') OR name = :table"
+    ), {"table": SEARCH_TABLE}).scalars())
+    if existing >= TRIGGERS.keys() | {SEARCH_TABLE}:
+        return False
+    conn.execute(text(_CREATE))
+    for ddl in TRIGGERS.values():
+        conn.execute(text(ddl))
+    rebuild_search(conn)
+    return True
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_search_after_create(target, connection, **kw) -> None:
+    install_search(connection)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the task title search index")
+    parser.add_argument("--url", default=SQLALCHEMY_DATABASE_URL)
+    args = parser.parse_args()
+    engine = build_engine(args.url)
+    with engine.begin() as conn:
+        if not install_search(conn):
+            rebuild_search(conn)
+    print(f"Rebuilt {SEARCH_TABLE} in {args.url}")
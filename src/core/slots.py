@@ -0,0 +1,266 @@
+"""
+Free-time index and greedy day packing.
+
+Free time is kept as sorted, disjoint gaps (working-hour windows minus busy
+intervals) with a max segment tree over the gap lengths, so "earliest gap of
+N minutes starting at or after T" is a binary search plus one O(log n) tree
+walk. Times are handled internally as float minutes since EPOCH.
+"""
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+# Default working hours and pause inserted after every planned task
+WORKDAY_START = time(9, 0)
+WORKDAY_END = time(17, 0)
+BREAK_MINUTES = 10
+
+# Planned duration for tasks without an estimate
+DEFAULT_SLOT_MINUTES = 30
+
+EPOCH = datetime(1970, 1, 1)
+
+Interval = Tuple[datetime, datetime]
+
+
+def _to_minutes(moment: datetime) -> float:
+    return (moment - EPOCH).total_seconds() / 60
+
+
+def _to_datetime(minutes: float) -> datetime:
+    return EPOCH + timedelta(minutes=minutes)
+
+
+def working_windows(
+    first_day: date,
+    days: int = 1,
+    start: time = WORKDAY_START,
+    end: time = WORKDAY_END
+) -> List[Interval]:
+    """Working-hour windows for `days` consecutive days starting at first_day."""
+    windows = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        windows.append((datetime.combine(day, start), datetime.combine(day, end)))
+    return windows
+
+
+def _subtract(windows: Sequence[Interval], busy: Iterable[Interval]) -> Tuple[List[float], List[float]]:
+    """Windows minus busy time as parallel lists of gap starts and ends (minutes)."""
+    merged: List[List[float]] = []
+    for start, end in sorted((_to_minutes(s), _to_minutes(e)) for s, e in busy if e > s):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    starts: List[float] = []
+    ends: List[float] = []
+    i = 0
+    for window_start, window_end in sorted((_to_minutes(s), _to_minutes(e)) for s, e in windows):
+        cursor = window_start
+        # Skip busy intervals that end before this window
+        while i < len(merged) and merged[i][1] <= cursor:
+            i += 1
+        j = i
+        while j < len(merged) and merged[j][0] < window_end:
+            if merged[j][0] > cursor:
+                starts.append(cursor)
+                ends.append(merged[j][0])
+            cursor = max(cursor, merged[j][1])
+            j += 1
+        if cursor < window_end:
+            starts.append(cursor)
+            ends.append(window_end)
+    return starts, ends
+
+
+class FreeSlotIndex:
+    """
+    Free gaps within working windows, queryable for the earliest fit.
+
+    find() is O(log n). reserve() is O(log n) when the reservation starts or
+    ends at a gap boundary (what first-fit packing produces) and O(n) when it
+    splits a gap in two.
+    """
+
+    def __init__(self, windows: Sequence[Interval], busy: Iterable[Interval] = ()):
+        self._starts, self._ends = _subtract(windows, busy)
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def gaps(self) -> List[Interval]:
+        """Remaining free intervals in order (zero-length gaps omitted)."""
+        return [
+            (_to_datetime(start), _to_datetime(end))
+            for start, end in zip(self._starts, self._ends) if end > start
+        ]
+
+    def find(self, after: datetime, minutes: float) -> Optional[datetime]:
+        """
+        Earliest start >= after of a free slot at least `minutes` long.
+
+        Returns:
+            Optional[datetime]: Slot start, or None if no gap fits
+
+        Raises:
+            ValueError: If minutes is not positive
+        """
+        position = self._find(_to_minutes(after), minutes)
+        return None if position is None else _to_datetime(position)
+
+    def reserve(self, start: datetime, minutes: float) -> None:
+        """
+        Mark [start, start + minutes) as busy.
+
+        Raises:
+            ValueError: If the interval is not entirely free
+        """
+        self._reserve(_to_minutes(start), minutes)
+
+    def allocate(self, after: datetime, minutes: float, padding: float = 0) -> Optional[datetime]:
+        """
+        Reserve the earliest slot of `minutes` starting at or after `after`.
+
+        Up to `padding` extra minutes are reserved after the slot, cut short
+        where the gap ends.
+
+        Returns:
+            Optional[datetime]: Slot start, or None if no gap fits
+        """
+        start = self._allocate(_to_minutes(after), minutes, padding)
+        return None if start is None else _to_datetime(start)
+
+    def _allocate(self, after: float, minutes: float, padding: float) -> Optional[float]:
+        start = self._find(after, minutes)
+        if start is not None:
+            gap_end = self._ends[bisect_right(self._ends, start)]
+            self._reserve(start, min(minutes + padding, gap_end - start))
+        return start
+
+    def _build(self) -> None:
+        n = len(self._starts)
+        size = 1
+        while size < n:
+            size *= 2
+        tree = [0.0] * (2 * size)
+        for i in range(n):
+            tree[size + i] = self._ends[i] - self._starts[i]
+        for p in range(size - 1, 0, -1):
+            tree[p] = max(tree[2 * p], tree[2 * p + 1])
+        self._size = size
+        self._tree = tree
+
+    def _update(self, i: int) -> None:
+        tree = self._tree
+        p = self._size + i
+        tree[p] = self._ends[i] - self._starts[i]
+        p //= 2
+        while p:
+            tree[p] = max(tree[2 * p], tree[2 * p + 1])
+            p //= 2
+
+    def _first_fit(self, lo: int, need: float) -> int:
+        """Index of the first gap at position >= lo with length >= need, or -1."""
+        if lo >= len(self._starts):
+            return -1
+        tree, size = self._tree, self._size
+        p = lo + size
+        while True:
+            if tree[p] >= need:
+                while p < size:
+                    p = 2 * p if tree[2 * p] >= need else 2 * p + 1
+                return p - size
+            # Climb while p is a right child, then step to the next subtree
+            while p & 1:
+                p >>= 1
+            if p == 0:
+                return -1
+            p += 1
+
+    def _find(self, after: float, minutes: float) -> Optional[float]:
+        if minutes <= 0:
+            raise ValueError("Slot length must be positive")
+        # The root holds the longest gap: nothing fits once the day is full
+        if self._tree[1] < minutes:
+            return None
+        k = bisect_right(self._ends, after)
+        if k >= len(self._starts):
+            return None
+        start = max(self._starts[k], after)
+        if self._ends[k] - start >= minutes:
+            return start
+        j = self._first_fit(k + 1, minutes)
+        return None if j < 0 else self._starts[j]
+
+    def _reserve(self, start: float, minutes: float) -> None:
+        end = start + minutes
+        k = bisect_right(self._ends, start)
+        if k >= len(self._starts) or start < self._starts[k] or end > self._ends[k]:
+            raise ValueError(f"Slot at {_to_datetime(start)} is not free")
+        if start == self._starts[k]:
+            self._starts[k] = end
+            self._update(k)
+        elif end == self._ends[k]:
+            self._ends[k] = start
+            self._update(k)
+        else:
+            self._starts.insert(k + 1, end)
+            self._ends.insert(k + 1, self._ends[k])
+            self._ends[k] = start
+            self._build()
+
+
+@dataclass
+class PlannedTask:
+    """A task placed into a free slot."""
+
+    task: Any
+    start: datetime
+    end: datetime
+
+
+def pack_tasks(
+    index: FreeSlotIndex,
+    tasks: Sequence[Any],
+    after: datetime,
+    break_minutes: int = BREAK_MINUTES
+) -> Tuple[List[PlannedTask], List[Any]]:
+    """
+    First-fit pack tasks into the index, most important first.
+
+    Tasks are taken by priority (1 = highest), then earliest due date, then
+    shortest estimate, and each goes into the earliest gap that fits it. A
+    break follows every task unless the gap ends first. The index is updated
+    in place. Tasks without an estimate take DEFAULT_SLOT_MINUTES; a zero or
+    negative estimate cannot be placed and comes back as unscheduled.
+
+    Args:
+        index: Free time to fill
+        tasks: Objects with priority, due_date and estimated_minutes attributes
+        after: Nothing is placed before this moment
+        break_minutes: Pause reserved after each task
+
+    Returns:
+        Tuple of planned tasks in start order and tasks that did not fit
+    """
+    # Read each attribute once; ORM and Row attribute access dominates otherwise
+    keyed = sorted(
+        (task.priority, task.due_date,
+         DEFAULT_SLOT_MINUTES if task.estimated_minutes is None else task.estimated_minutes, i)
+        for i, task in enumerate(tasks)
+    )
+    origin = _to_minutes(after)
+    planned: List[Tuple[float, float, Any]] = []
+    unscheduled: List[Any] = []
+    for _, _, minutes, i in keyed:
+        start = index._allocate(origin, minutes, break_minutes) if minutes > 0 else None
+        if start is None:
+            unscheduled.append(tasks[i])
+            continue
+        planned.append((start, start + minutes, tasks[i]))
+    planned.sort(key=lambda entry: entry[0])
+    return [PlannedTask(task, _to_datetime(s), _to_datetime(e)) for s, e, task in planned], unscheduled
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey, Table, Float
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey, Table, Float, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
-from datetime import datetime
+from datetime import date, datetime
 from typing import List
 from .database import Base
 
@@ -9,12 +9,19 @@ task_category = Table(
     'task_category', 
     Base.metadata,
     Column('task_id', Integer, ForeignKey('tasks.id', ondelete='CASCADE')),
-    Column('category_id', Integer, ForeignKey('categories.id', ondelete='CASCADE'))
+    Column('category_id', Integer, ForeignKey('categories.id', ondelete='CASCADE')),
+    Index('ix_task_category_category_task', 'category_id', 'task_id'),
+    Index('ix_task_category_task_category', 'task_id', 'category_id'),
 )
 
 class Task(Base):
     """Task model representing a scheduled task."""
     __tablename__ = "tasks"
+    # Composite indexes matching the keyset ordering (due_date, priority, id)
+    __table_args__ = (
+        Index("ix_tasks_due_priority_id", "due_date", "priority", "id"),
+        Index("ix_tasks_completed_due_priority_id", "completed", "due_date", "priority", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(255), index=True)
@@ -25,13 +32,19 @@ class Task(Base):
     actual_minutes: Mapped[int | None] = mapped_column(nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     
+    # Collections never lazy load; queries choose a strategy from core.loading.
+    # Deletes rely on the ON DELETE CASCADE foreign keys instead of loading rows.
     categories: Mapped[List["Category"]] = relationship(
         secondary=task_category, 
-        back_populates="tasks"
+        back_populates="tasks",
+        lazy="raise_on_sql",
+        passive_deletes=True
     )
     time_tracks: Mapped[List["TimeTracking"]] = relationship(
         back_populates="task",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        lazy="raise_on_sql",
+        passive_deletes=True
     )
 
 class Category(Base):
@@ -43,7 +56,9 @@ class Category(Base):
     color: Mapped[str] = mapped_column(String(7))  # For hex color codes
     parent_id: Mapped[int | None] = mapped_column(ForeignKey("categories.id", ondelete="SET NULL"), nullable=True)
     
-    tasks: Mapped[List[Task]] = relationship(secondary=task_category, back_populates="categories")
+    tasks: Mapped[List[Task]] = relationship(
+        secondary=task_category, back_populates="categories", lazy="raise_on_sql", passive_deletes=True
+    )
     subcategories: Mapped[List["Category"]] = relationship(cascade="all, delete-orphan")
 
 class TimeTracking(Base):
@@ -51,9 +66,33 @@ class TimeTracking(Base):
     __tablename__ = "time_tracking"
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    task_id: Mapped[int] = mapped_column(ForeignKey("tasks.id", ondelete="CASCADE"))
+    task_id: Mapped[int] = mapped_column(ForeignKey("tasks.id", ondelete="CASCADE"), index=True)
     start_time: Mapped[datetime] = mapped_column(DateTime)
     end_time: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     duration_minutes: Mapped[float | None] = mapped_column(nullable=True)
     
     task: Mapped[Task] = relationship(back_populates="time_tracks")
+
+class CategoryDailyLoad(Base):
+    """Per-category, per-day workload rollup kept current by triggers (see core.rollups)."""
+    __tablename__ = "category_daily_load"
+
+    category_id: Mapped[int] = mapped_column(ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    task_count: Mapped[int] = mapped_column(default=0)
+    completed_count: Mapped[int] = mapped_column(default=0)
+    planned_minutes: Mapped[float] = mapped_column(default=0)  # estimates of tasks due that day
+    open_minutes: Mapped[float] = mapped_column(default=0)  # estimates of incomplete tasks due that day
+    tracked_minutes: Mapped[float] = mapped_column(default=0)  # time tracked starting that day
+
+class CategoryClosure(Base):
+    """Ancestor/descendant pairs of the category tree kept current by triggers (see core.hierarchy)."""
+    __tablename__ = "category_closure"
+    # Reverse index serves ancestor lookups; the primary key serves subtrees
+    __table_args__ = (
+        Index("ix_category_closure_descendant_ancestor", "descendant_id", "ancestor_id", "depth"),
+    )
+
+    ancestor_id: Mapped[int] = mapped_column(ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id: Mapped[int] = mapped_column(ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    depth: Mapped[int] = mapped_column(default=0)  # 0 for the category itself
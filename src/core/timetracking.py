@@ -0,0 +1,298 @@
+"""
+Group-committed timer events for time tracking.
+
+Start/stop/heartbeat calls are checked against the in-memory set of running
+timers and appended to a buffer; they never touch the database themselves.
+A writer thread drains the buffer in one transaction per batch, once
+TRACKING_MAX_LATENCY seconds after the first buffered event or as soon as
+TRACKING_MAX_BATCH events are waiting, whichever comes first. Per batch it
+inserts one time_tracking row per started timer, writes the running or
+final duration of every timer that moved, and adds the whole minutes gained
+since the last flush to Task.actual_minutes. A running timer has end_time
+NULL and duration_minutes up to its last heartbeat, so a restart resumes
+from what was flushed. stop() flushes everything buffered before returning.
+
+Every committed batch bumps the cache write version and is flagged with
+session.info["history_changed"], which services that derive data from
+tracked time (the duration estimators) check in an after_commit listener.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from .cache import write_version
+from .task_manager import Task, TimeTracking
+
+# Longest an accepted event waits in the buffer, and the most events per transaction
+TRACKING_MAX_LATENCY = 0.05
+TRACKING_MAX_BATCH = 5000
+
+# Events buffered before record() pushes back instead of growing the backlog
+TRACKING_MAX_BUFFER = 50_000
+
+EVENT_KINDS = ("start", "heartbeat", "stop")
+
+logger = logging.getLogger(__name__)
+
+
+class TimerError(ValueError):
+    """The event does not fit the timer's state (already running / not running)."""
+
+
+class TrackerBusy(RuntimeError):
+    """The writer is TRACKING_MAX_BUFFER events behind; retry shortly."""
+
+
+@dataclass
+class TimerEvent:
+    kind: str
+    task_id: int
+    at: datetime
+    start_time: datetime
+
+
+@dataclass
+class _Session:
+    """A timer as the writer knows it."""
+    task_id: int
+    start_time: datetime
+    last_seen: datetime
+    row_id: Optional[int] = None
+    credited: int = 0  # minutes already added to Task.actual_minutes
+    stopped: bool = False
+
+    @property
+    def minutes(self) -> float:
+        return (self.last_seen - self.start_time).total_seconds() / 60
+
+
+@dataclass
+class TrackingStats:
+    events: int = 0
+    batches: int = 0
+    rows_inserted: int = 0
+    rows_updated: int = 0
+    failed_events: int = 0  # events dropped because their timer's write failed
+    largest_batch: int = 0
+    commit_seconds: float = 0.0
+
+    @property
+    def average_batch(self) -> float:
+        return self.events / self.batches if self.batches else 0.0
+
+
+class TimeTrackingWriter:
+    """Buffers timer events and writes them in batched transactions."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_latency: float = TRACKING_MAX_LATENCY,
+        max_batch: int = TRACKING_MAX_BATCH,
+        max_buffer: int = TRACKING_MAX_BUFFER,
+        clock: Callable[[], datetime] = datetime.now
+    ):
+        self.session_factory = session_factory
+        self.max_latency = max_latency
+        self.max_batch = max_batch
+        self.max_buffer = max_buffer
+        self.stats = TrackingStats()
+        self._clock = clock
+        self._running_timers: Dict[int, datetime] = {}  # task id -> start time, as accepted
+        self._sessions: Dict[int, _Session] = {}  # task id -> timer as persisted
+        self._buffer: List[TimerEvent] = []
+        self._accepted = 0
+        self._written = 0
+        self._flush_requested = False
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def running(self, task_id: int) -> Optional[datetime]:
+        """Start time of the task's running timer, or None."""
+        return self._running_timers.get(task_id)
+
+    def record(self, kind: str, task_id: int, at: Optional[datetime] = None) -> TimerEvent:
+        """
+        Accept a timer event; it is written with the next batch.
+
+        Raises:
+            TimerError: If starting a running timer, or heartbeat/stop on a
+                timer that is not running
+            TrackerBusy: If max_buffer events are already waiting
+            ValueError: If kind is not start, heartbeat or stop
+        """
+        if kind not in EVENT_KINDS:
+            raise ValueError(f"Unknown timer event: {kind}")
+        at = at or self._clock()
+        with self._cond:
+            if len(self._buffer) >= self.max_buffer:
+                raise TrackerBusy("Time tracking is behind, retry shortly")
+            started = self._running_timers.get(task_id)
+            if kind == "start":
+                if started is not None:
+                    raise TimerError(f"Timer for task {task_id} is already running")
+                started = self._running_timers[task_id] = at
+            elif started is None:
+                raise TimerError(f"No running timer for task {task_id}")
+            elif kind == "stop":
+                del self._running_timers[task_id]
+            event = TimerEvent(kind, task_id, max(at, started), started)
+            self._buffer.append(event)
+            self._accepted += 1
+            if len(self._buffer) == 1 or len(self._buffer) >= self.max_batch:
+                self._cond.notify_all()
+        return event
+
+    def start(self) -> None:
+        """Load running timers from the database and start the writer thread."""
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(TimeTracking.id, TimeTracking.task_id, TimeTracking.start_time, TimeTracking.duration_minutes)
+                .where(TimeTracking.end_time.is_(None))
+            ).all()
+        with self._cond:
+            if self._running:
+                return
+            for row_id, task_id, start_time, minutes in rows:
+                session = _Session(task_id, start_time, start_time, row_id)
+                session.last_seen = start_time + timedelta(minutes=minutes or 0)
+                session.credited = round(session.minutes)
+                self._sessions[task_id] = session
+                self._running_timers[task_id] = start_time
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="time-tracking-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Write everything accepted so far, then stop the writer thread."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        # Events accepted after the thread exited, or when it was never started
+        self._write_buffer()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write the buffer now and wait for it; False on timeout."""
+        if self._thread is None:
+            self._write_buffer()
+            return True
+        with self._cond:
+            target = self._accepted
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._written >= target, timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._buffer or not self._running)
+                if not self._running and not self._buffer:
+                    return
+                # Let more events join the batch, up to the latency bound
+                deadline = time.monotonic() + self.max_latency
+                while self._running and not self._flush_requested and len(self._buffer) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            self._write_buffer()
+
+    def _write_buffer(self) -> None:
+        with self._cond:
+            batch, self._buffer = self._buffer[:self.max_batch], self._buffer[self.max_batch:]
+            self._flush_requested = bool(self._buffer) and self._flush_requested
+        if batch:
+            self._write(batch)
+        with self._cond:
+            self._written += len(batch)
+            self._cond.notify_all()
+        if self._buffer and not self._running:
+            self._write_buffer()
+
+    def _write(self, batch: List[TimerEvent]) -> None:
+        # Fold the events into the timers they touch, in order
+        touched: Dict[int, _Session] = {}
+        counts: Dict[int, int] = {}
+        for event in batch:
+            session = self._sessions.get(event.task_id)
+            if event.kind == "start" or session is None:
+                session = self._sessions[event.task_id] = _Session(event.task_id, event.start_time, event.at)
+            session.last_seen = max(session.last_seen, event.at)
+            session.stopped = event.kind == "stop"
+            touched[id(session)] = session
+            counts[id(session)] = counts.get(id(session), 0) + 1
+
+        started = time.perf_counter()
+        try:
+            self._persist(list(touched.values()))
+        except Exception as e:
+            logger.warning("Time tracking batch of %d events failed, retrying per timer: %s", len(batch), e)
+            for key, session in touched.items():
+                try:
+                    self._persist([session])
+                except Exception:
+                    self.stats.failed_events += counts[key]
+                    self._sessions.pop(session.task_id, None)
+                    logger.exception("Dropping timer events for task %s", session.task_id)
+        self.stats.commit_seconds += time.perf_counter() - started
+        self.stats.events += len(batch)
+        self.stats.batches += 1
+        self.stats.largest_batch = max(self.stats.largest_batch, len(batch))
+
+    def _persist(self, sessions: List[_Session]) -> None:
+        new = [s for s in sessions if s.row_id is None]
+        existing = [s for s in sessions if s.row_id is not None]
+        gains = {id(s): round(s.minutes) - s.credited for s in sessions}
+        with self.session_factory() as db:
+            conn = db.connection()
+            if new:
+                ids = conn.execute(
+                    insert(TimeTracking).returning(TimeTracking.id, sort_by_parameter_order=True),
+                    [self._values(s) for s in new]
+                ).scalars().all()
+            if existing:
+                conn.execute(
+                    update(TimeTracking).where(TimeTracking.id == bindparam("row_id")),
+                    [{"row_id": s.row_id, **self._values(s)} for s in existing]
+                )
+            increments = [{"task": s.task_id, "gain": gains[id(s)]} for s in sessions if gains[id(s)]]
+            if increments:
+                conn.execute(
+                    update(Task).where(Task.id == bindparam("task"))
+                    .values(actual_minutes=func.coalesce(Task.actual_minutes, 0) + bindparam("gain")),
+                    increments
+                )
+            # Core statements skip the session events that keep caches current
+            db.info["history_changed"] = True
+            db.commit()
+        write_version.bump()
+
+        # Only now that the transaction committed does the in-memory state move on
+        if new:
+            for session, row_id in zip(new, ids):
+                session.row_id = row_id
+        for session in sessions:
+            session.credited += gains[id(session)]
+            if session.stopped and self._sessions.get(session.task_id) is session:
+                del self._sessions[session.task_id]
+        self.stats.rows_inserted += len(new)
+        self.stats.rows_updated += len(existing)
+
+    @staticmethod
+    def _values(session: _Session) -> Dict[str, object]:
+        return {
+            "task_id": session.task_id,
+            "start_time": session.start_time,
+            "end_time": session.last_seen if session.stopped else None,
+            "duration_minutes": session.minutes,
+        }
@@ -1,20 +1,72 @@
-from fastapi import FastAPI, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
 from datetime import date
 
-from .core.database import engine, Base, get_db
+from .core.database import engine, Base, SessionLocal, get_async_db, get_async_read_db
 from .core.config import INITIAL_TASKS
-from .models.schemas import Task, Category, TaskStats, WorkloadStats, TaskPrediction
-from .services.task_service import TaskService
+from .core.metrics import REGISTRY
+from .core.rollover import ROLLOVER_CHUNK_SIZE
+from .core.scheduler import TaskScheduler
+from .core.task_manager import Task as TaskModel
+from .core.timetracking import TimeTrackingWriter, TimerError, TrackerBusy
+from .models.schemas import Task, TaskFilter, Category, TaskStats, WorkloadStats, TaskPrediction, BatchPredictionRequest, RolloverReport, TimerState
+from .services.task_service import TaskService, parse_fields
+from .api.cache import cache_key, response_cache
+from .api.metrics import MetricsMiddleware
 from .api.routes import router
+from .api.serialization import encode_rows, encode_rows_ndjson
+from .utils.notification import NotificationDispatcher
+
+# Seconds shutdown waits for queued notifications to be delivered
+NOTIFIER_SHUTDOWN_SECONDS = 5.0
+
+# Longest window, in days, a workload report covers
+WORKLOAD_MAX_DAYS = 366
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The scheduler sleeps until its next deadline on the app's event loop;
+    # jobs themselves run in its worker pool
+    notifier = NotificationDispatcher()
+    notifier.start()
+    # A writer put in app.state before startup is used instead (tests point
+    # one at their own database); either way it is removed at shutdown
+    time_tracker = getattr(app.state, "time_tracker", None) or TimeTrackingWriter(SessionLocal)
+    time_tracker.start()
+    app.state.time_tracker = time_tracker
+    scheduler = TaskScheduler(session_factory=SessionLocal, notifier=notifier)
+    app.state.scheduler = scheduler
+    app.state.notifier = notifier
+    scheduler.schedule_rollover()
+    scheduler.schedule_due_reminders()
+    scheduler_task = asyncio.create_task(scheduler.serve())
+    try:
+        yield
+    finally:
+        scheduler_task.cancel()
+        try:
+            await scheduler_task
+        except asyncio.CancelledError:
+            pass
+        await asyncio.to_thread(notifier.stop, True, NOTIFIER_SHUTDOWN_SECONDS)
+        # Buffered timer events are written before the process exits
+        await asyncio.to_thread(time_tracker.stop)
+        del app.state.time_tracker
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Day Planner API",
     description="API for managing daily tasks and schedules",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
+app.add_middleware(MetricsMiddleware)
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -27,40 +79,200 @@ def read_root():
     return {"message": "Welcome to Day Planner API"}
 
 @app.get("/tasks", response_model=List[Task])
-async def get_tasks(db: Session = Depends(get_db)):
+async def get_tasks(
+    request: Request,
+    filters: TaskFilter = Depends(),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    fields: Optional[str] = Query(None, description="Comma-separated subset of task fields, e.g. id,title,due_date"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    # Rows are projected to the selected columns and encoded without ORM objects or schemas
+    try:
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     task_service = TaskService(db)
-    return await task_service.get_all_tasks()
+    if stream:
+        batches = task_service.stream_task_rows(filters, selected)
+        return StreamingResponse(
+            (encode_rows_ndjson(selected, batch) async for batch in batches), media_type="application/x-ndjson"
+        )
+
+    async def render():
+        rows, next_page = await task_service.list_task_rows(filters, limit, cursor, selected)
+        headers = {"X-Next-Cursor": next_page} if next_page else {}
+        return encode_rows(selected, rows), headers
+
+    try:
+        return await response_cache.respond(request, cache_key(request, db), render, db)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/tasks/search", response_model=List[Task])
+async def search_tasks(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    filters: TaskFilter = Depends(),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    prefix: bool = True,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    task_service = TaskService(db)
+    try:
+        tasks, next_page = await task_service.search_tasks(q, filters, limit, cursor, prefix)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_page:
+        response.headers["X-Next-Cursor"] = next_page
+    return tasks
 
 @app.post("/tasks", response_model=Task)
-async def add_task(task: Task, db: Session = Depends(get_db)):
+async def add_task(task: Task, db: AsyncSession = Depends(get_async_db)):
     task_service = TaskService(db)
     return await task_service.create_task(task)
 
 @app.put("/tasks/{task_id}", response_model=Task)
-async def update_task(task_id: int, updated_task: Task, db: Session = Depends(get_db)):
+async def update_task(task_id: int, updated_task: Task, db: AsyncSession = Depends(get_async_db)):
     task_service = TaskService(db)
-    return await task_service.update_task(task_id, updated_task)
+    task = await task_service.update_task(task_id, updated_task)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
 
 @app.delete("/tasks/{task_id}")
-async def delete_task(task_id: int, db: Session = Depends(get_db)):
+async def delete_task(task_id: int, db: AsyncSession = Depends(get_async_db)):
     task_service = TaskService(db)
-    return await task_service.delete_task(task_id)
+    result = await task_service.delete_task(task_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return result
 
 @app.get("/categories/{category}/workload", response_model=WorkloadStats)
 async def get_category_workload(
-    category: str, 
-    days: int = 7, 
-    db: Session = Depends(get_db)
+    request: Request,
+    category: str,
+    days: int = Query(7, ge=1, le=WORKLOAD_MAX_DAYS),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    task_service = TaskService(db)
+
+    async def render():
+        workload = await task_service.get_category_workload(category, days)
+        return None if workload is None else (workload.model_dump_json().encode(), {})
+
+    response = await response_cache.respond(request, cache_key(request, db), render, db)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return response
+
+@app.get("/categories/{category_id}/subtree/workload", response_model=WorkloadStats)
+async def get_subtree_workload(
+    category_id: int,
+    days: int = Query(7, ge=1, le=WORKLOAD_MAX_DAYS),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     task_service = TaskService(db)
-    return await task_service.get_category_workload(category, days)
+    workload = await task_service.get_subtree_workload(category_id, days)
+    if workload is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return workload
+
+@app.get("/categories/{category_id}/ancestors", response_model=List[Category])
+async def get_category_ancestors(category_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    task_service = TaskService(db)
+    path = await task_service.get_category_ancestors(category_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return path
+
+@app.post("/tasks/predictions", response_model=List[TaskPrediction])
+async def predict_tasks_completion(request: BatchPredictionRequest, db: AsyncSession = Depends(get_async_read_db)):
+    task_service = TaskService(db)
+    return await task_service.predict_tasks(request.task_ids)
+
+@app.post("/tasks/rollover", response_model=RolloverReport)
+async def rollover_overdue_tasks(
+    dry_run: bool = False,
+    chunk_size: int = Query(ROLLOVER_CHUNK_SIZE, ge=1, le=100000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    task_service = TaskService(db)
+    return await task_service.rollover_overdue_tasks(chunk_size=chunk_size, dry_run=dry_run)
+
+@app.get("/tasks/rollover", response_model=RolloverReport)
+def get_rollover_status(request: Request):
+    scheduler = getattr(request.app.state, "scheduler", None)
+    if scheduler is None or scheduler.rollover_report is None:
+        raise HTTPException(status_code=404, detail="No rollover has run yet")
+    return RolloverReport.model_validate(scheduler.rollover_report)
+
+@app.post("/tasks/{task_id}/timer/{event}", response_model=TimerState)
+async def record_timer_event(
+    request: Request,
+    task_id: int,
+    event: Literal["start", "heartbeat", "stop"],
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Accepted into the time tracker's buffer; written with its next batch
+    time_tracker = request.app.state.time_tracker
+    if event == "start" and time_tracker.running(task_id) is None and await db.get(TaskModel, task_id) is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    try:
+        recorded = time_tracker.record(event, task_id)
+    except TimerError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except TrackerBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    return TimerState(
+        task_id=task_id,
+        kind=recorded.kind,
+        running=recorded.kind != "stop",
+        start_time=recorded.start_time,
+        at=recorded.at,
+        elapsed_minutes=round((recorded.at - recorded.start_time).total_seconds() / 60, 2),
+    )
+
+@app.get("/time-tracking/stats")
+def get_time_tracking_stats(request: Request):
+    stats = request.app.state.time_tracker.stats
+    return {**asdict(stats), "average_batch": round(stats.average_batch, 1)}
+
+@app.get("/notifications/stats")
+def get_notification_stats(request: Request):
+    notifier = request.app.state.notifier
+    stats = notifier.stats
+    return {
+        **asdict(stats),
+        "reminders_per_second": round(stats.reminders_per_second, 2),
+        "open_batches": notifier.open_batches,
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/stats")
+def get_cache_stats():
+    stats = response_cache.cache.stats
+    return {
+        **asdict(stats),
+        "hit_rate": round(stats.hit_rate, 4),
+        "entries": len(response_cache.cache),
+        "write_version": response_cache.cache.version.value,
+    }
 
 @app.get("/tasks/{task_id}/prediction", response_model=TaskPrediction)
-async def predict_task_completion(task_id: int, db: Session = Depends(get_db)):
+async def predict_task_completion(task_id: int, db: AsyncSession = Depends(get_async_read_db)):
     task_service = TaskService(db)
-    return await task_service.predict_task_completion(task_id)
+    prediction = await task_service.predict_task_completion(task_id)
+    if prediction is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return prediction
 
 @app.get("/categories/workload-balance")
-async def get_workload_balance_recommendations(db: Session = Depends(get_db)):
+async def get_workload_balance_recommendations(db: AsyncSession = Depends(get_async_read_db)):
     task_service = TaskService(db)
-    return await task_service.get_workload_balance_recommendations()
\ No newline at end of file
+    return await task_service.get_workload_balance_recommendations()
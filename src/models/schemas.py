@@ -1,16 +1,120 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Set
+from typing import Dict, List, Optional, Set
 from datetime import datetime, date
 from enum import Enum
 
 class CategoryColor(str, Enum):
     RED = "red"
     BLUE = "blue"
-    # ... rest of colors ...
+    GREEN = "green"
+    YELLOW = "yellow"
+    PURPLE = "purple"
+    ORANGE = "orange"
+    GRAY = "gray"
 
 class TimeTracking(BaseModel):
     estimated_minutes: int
     actual_minutes: Optional[int] = None
-    # ... rest of fields ...
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
 
-# ... rest of your Pydantic models ...
+class Category(BaseModel):
+    id: Optional[int] = None
+    name: str
+    color: str = "#808080"
+    parent_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+class Task(BaseModel):
+    id: Optional[int] = None
+    title: str
+    completed: bool = False
+    due_date: date
+    priority: int = Field(default=1, ge=1, le=5)
+    estimated_minutes: Optional[int] = None
+    actual_minutes: Optional[int] = None
+    categories: List[str] = []
+
+    class Config:
+        from_attributes = True
+
+class TaskFilter(BaseModel):
+    completed: Optional[bool] = None
+    due_from: Optional[date] = None
+    due_to: Optional[date] = None
+    category: Optional[str] = None
+    category_id: Optional[int] = None
+    category_subtree: Optional[int] = None  # category id; includes all descendants
+
+class TaskImportRow(BaseModel):
+    title: str = Field(min_length=1, max_length=255)
+    due_date: date
+    priority: int = Field(default=1, ge=1, le=5)
+    completed: bool = False
+    estimated_minutes: Optional[int] = None
+    actual_minutes: Optional[int] = None
+    category_ids: List[int] = []
+
+class BulkRowError(BaseModel):
+    line: int
+    error: str
+
+class BulkChunkReport(BaseModel):
+    chunk: int
+    imported: int
+    failed: int
+    errors: List[BulkRowError] = []
+
+class BulkImportResult(BaseModel):
+    imported: int
+    failed: int
+    chunks: List[BulkChunkReport]
+
+class TaskStats(BaseModel):
+    total_tasks: int
+    completed_tasks: int
+    completion_rate: float
+    average_actual_minutes: Optional[float] = None
+
+class WorkloadStats(BaseModel):
+    category: str
+    days: int
+    total_tasks: int
+    completed_tasks: int
+    estimated_minutes: float
+    tracked_minutes: float
+    daily_minutes: Dict[date, float] = {}
+
+class TaskPrediction(BaseModel):
+    task_id: int
+    estimated_minutes: Optional[int] = None
+    predicted_minutes: float
+    predicted_minutes_p90: Optional[float] = None
+    overdue_probability: float
+    confidence: float
+
+class BatchPredictionRequest(BaseModel):
+    task_ids: List[int] = Field(max_length=10000)
+
+class TimerState(BaseModel):
+    task_id: int
+    kind: str
+    running: bool
+    start_time: datetime
+    at: datetime
+    elapsed_minutes: float
+
+class RolloverReport(BaseModel):
+    today: date
+    dry_run: bool
+    overdue: int
+    updated: int
+    chunks: int
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    done: bool
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,193 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core import rollups  # noqa: F401  (registers the rollup triggers)
+from ..core.hierarchy import subtree_task_ids
+from ..core.task_manager import Category as CategoryModel, CategoryDailyLoad, Task as TaskModel, TimeTracking
+from ..models.schemas import WorkloadStats
+
+# A category is flagged when its load is this far above/below the mean
+OVERLOAD_RATIO = 1.25
+UNDERLOAD_RATIO = 0.75
+
+_METRICS = ("task_count", "completed_count", "planned_minutes", "open_minutes", "tracked_minutes")
+
+
+@dataclass
+class DailyLoad:
+    """Rollup values as dense (category x day) matrices."""
+
+    start: date
+    category_ids: np.ndarray
+    category_names: List[str]
+    task_count: np.ndarray
+    completed_count: np.ndarray
+    planned_minutes: np.ndarray
+    open_minutes: np.ndarray
+    tracked_minutes: np.ndarray
+
+    @property
+    def days(self) -> List[date]:
+        return [self.start + timedelta(days=i) for i in range(self.tracked_minutes.shape[1])]
+
+
+class WorkloadAnalytics:
+    """Workload aggregation over the category_daily_load rollup using NumPy."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def load_matrix(
+        self,
+        start: date,
+        end: date,
+        category_ids: Optional[Sequence[int]] = None
+    ) -> DailyLoad:
+        """
+        Load rollup rows for [start, end] in one query into per-category, per-day matrices.
+
+        Args:
+            start: First day (inclusive)
+            end: Last day (inclusive)
+            category_ids: Restrict to these categories; all categories if None
+
+        Returns:
+            DailyLoad: Matrices indexed by (category position, day offset)
+        """
+        stmt = (
+            select(
+                CategoryDailyLoad.category_id,
+                CategoryModel.name,
+                CategoryDailyLoad.day,
+                *(getattr(CategoryDailyLoad, metric) for metric in _METRICS),
+            )
+            .join(CategoryModel, CategoryModel.id == CategoryDailyLoad.category_id)
+            .where(CategoryDailyLoad.day.between(start, end))
+        )
+        if category_ids is not None:
+            stmt = stmt.where(CategoryDailyLoad.category_id.in_(category_ids))
+        rows = (await self.db.execute(stmt)).all()
+
+        n_days = (end - start).days + 1
+        if not rows:
+            empty = np.zeros((0, n_days))
+            return DailyLoad(start, np.zeros(0, dtype=np.int64), [], *(empty for _ in _METRICS))
+
+        columns = list(zip(*rows))
+        ids, positions = np.unique(np.asarray(columns[0], dtype=np.int64), return_inverse=True)
+        names_by_id = dict(zip(columns[0], columns[1]))
+        offsets = (np.asarray(columns[2], dtype="datetime64[D]") - np.datetime64(start, "D")).astype(np.int64)
+
+        matrices = []
+        for values in columns[3:]:
+            matrix = np.zeros((len(ids), n_days))
+            np.add.at(matrix, (positions, offsets), np.asarray(values, dtype=np.float64))
+            matrices.append(matrix)
+        return DailyLoad(start, ids, [names_by_id[i] for i in ids.tolist()], *matrices)
+
+    async def category_workload(self, category: str, days: int = 7) -> Optional[WorkloadStats]:
+        category_id = await self.db.scalar(
+            select(CategoryModel.id).where(CategoryModel.name == category)
+        )
+        if category_id is None:
+            return None
+
+        end = date.today()
+        load = await self.load_matrix(end - timedelta(days=days - 1), end, [category_id])
+        tracked = load.tracked_minutes.sum(axis=0)
+        return WorkloadStats(
+            category=category,
+            days=days,
+            total_tasks=int(load.task_count.sum()),
+            completed_tasks=int(load.completed_count.sum()),
+            estimated_minutes=float(load.planned_minutes.sum()),
+            tracked_minutes=float(tracked.sum()),
+            daily_minutes={
+                day: float(minutes) for day, minutes in zip(load.days, tracked) if minutes
+            },
+        )
+
+    async def subtree_workload(self, category_id: int, days: int = 7) -> Optional[WorkloadStats]:
+        """
+        Workload of a category and all of its descendants over the last `days` days.
+
+        Reads tasks directly through the closure table instead of summing
+        per-category rollup rows, so a task filed under several categories of
+        the subtree is counted once. Query count is independent of tree depth.
+        """
+        name = await self.db.scalar(select(CategoryModel.name).where(CategoryModel.id == category_id))
+        if name is None:
+            return None
+
+        end = date.today()
+        start = end - timedelta(days=days - 1)
+        in_subtree = TaskModel.id.in_(subtree_task_ids(category_id))
+        total, completed, estimated = (await self.db.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(TaskModel.completed), 0),
+                func.coalesce(func.sum(TaskModel.estimated_minutes), 0),
+            ).where(in_subtree, TaskModel.due_date.between(start, end))
+        )).one()
+
+        day = func.date(TimeTracking.start_time)
+        tracked = (await self.db.execute(
+            select(day, func.sum(TimeTracking.duration_minutes))
+            .where(
+                TimeTracking.task_id.in_(subtree_task_ids(category_id)),
+                TimeTracking.start_time >= start,
+                TimeTracking.start_time < end + timedelta(days=1),
+            )
+            .group_by(day)
+        )).all()
+        daily_minutes = {date.fromisoformat(d): float(minutes) for d, minutes in tracked if minutes}
+        return WorkloadStats(
+            category=name,
+            days=days,
+            total_tasks=total,
+            completed_tasks=int(completed),
+            estimated_minutes=float(estimated),
+            tracked_minutes=float(sum(daily_minutes.values())),
+            daily_minutes=daily_minutes,
+        )
+
+    async def balance_recommendations(self, days: int = 7) -> List[Dict[str, Any]]:
+        """
+        Compare open (incomplete) planned minutes per category over the past and
+        next `days` days, flagging categories far above or below the mean.
+        """
+        today = date.today()
+        load = await self.load_matrix(today - timedelta(days=days), today + timedelta(days=days))
+        totals = load.open_minutes.sum(axis=1)
+        active = totals > 0
+        if not active.any():
+            return []
+
+        totals = totals[active]
+        daily_std = load.open_minutes[active].std(axis=1)
+        names = [name for name, keep in zip(load.category_names, active) if keep]
+        average = totals.mean()
+        imbalance = float(totals.std() / average) if average else 0.0
+        actions = np.select(
+            [totals > average * OVERLOAD_RATIO, totals < average * UNDERLOAD_RATIO],
+            ["reduce", "increase"],
+            default="keep",
+        )
+
+        order = np.argsort(-totals, kind="stable")
+        return [
+            {
+                "category": names[i],
+                "planned_minutes": float(totals[i]),
+                "average_minutes": round(float(average), 1),
+                "daily_std_minutes": round(float(daily_std[i]), 1),
+                "imbalance": round(imbalance, 3),
+                "recommendation": str(actions[i]),
+            }
+            for i in order
+        ]
@@ -0,0 +1,207 @@
+import csv
+import io
+import json
+from collections import defaultdict
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.task_manager import Task as TaskModel, Category as CategoryModel, task_category
+from ..models.schemas import BulkChunkReport, BulkImportResult, BulkRowError, TaskImportRow
+from ..utils.helpers import aiter_csv_rows, aiter_lines
+from .task_service import STREAM_BATCH_SIZE
+
+# Rows validated and written per transaction during bulk import
+IMPORT_CHUNK_SIZE = 5000
+
+EXPORT_FIELDS = [
+    "id", "title", "completed", "due_date", "priority",
+    "estimated_minutes", "actual_minutes", "category_ids",
+]
+
+# Separator for multiple category ids inside one CSV cell
+CSV_LIST_SEPARATOR = ";"
+
+
+class BulkTaskService:
+    """Chunked import and streaming export of tasks."""
+
+    def __init__(self, db: AsyncSession, chunk_size: int = IMPORT_CHUNK_SIZE):
+        self.db = db
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def _parse_row(raw: Union[str, List[str]], header: Optional[List[str]]) -> TaskImportRow:
+        if header is None:
+            return TaskImportRow.model_validate_json(raw)
+
+        record = {key: value for key, value in zip(header, raw) if value != ""}
+        if "category_ids" in record:
+            record["category_ids"] = [
+                int(category_id) for category_id in record["category_ids"].split(CSV_LIST_SEPARATOR)
+            ]
+        return TaskImportRow.model_validate(record)
+
+    async def import_tasks(self, chunks: AsyncIterator[bytes], fmt: str = "ndjson") -> BulkImportResult:
+        """
+        Import tasks from a CSV or NDJSON body in chunked transactions.
+
+        Invalid rows are reported and skipped; a chunk that fails to write is
+        rolled back and reported without aborting the remaining chunks.
+
+        Args:
+            chunks: Async iterator of raw body chunks (e.g. Request.stream())
+            fmt: "csv" (first record is the header) or "ndjson"
+
+        Returns:
+            BulkImportResult: Totals and per-chunk reports
+        """
+        header: Optional[List[str]] = None
+        batch: List[Tuple[int, Union[str, List[str]]]] = []
+        reports: List[BulkChunkReport] = []
+
+        async for line_no, raw in self._records(chunks, fmt):
+            if fmt == "csv" and header is None:
+                header = raw
+                continue
+            batch.append((line_no, raw))
+            if len(batch) >= self.chunk_size:
+                reports.append(await self._import_chunk(len(reports), batch, header))
+                batch = []
+        if batch:
+            reports.append(await self._import_chunk(len(reports), batch, header))
+
+        return BulkImportResult(
+            imported=sum(report.imported for report in reports),
+            failed=sum(report.failed for report in reports),
+            chunks=reports,
+        )
+
+    @staticmethod
+    async def _records(
+        chunks: AsyncIterator[bytes],
+        fmt: str
+    ) -> AsyncIterator[Tuple[int, Union[str, List[str]]]]:
+        """Non-blank records of the body with the line they start on: lines for NDJSON, fields for CSV."""
+        if fmt == "csv":
+            async for line_no, fields in aiter_csv_rows(chunks):
+                if fields and (len(fields) > 1 or fields[0].strip()):
+                    yield line_no, fields
+            return
+        line_no = 0
+        async for line in aiter_lines(chunks):
+            line_no += 1
+            if line.strip():
+                yield line_no, line
+
+    async def _insert_tasks(self, values: List[Dict]) -> List[int]:
+        """Insert task rows with executemany and return their ids in input order."""
+        tasks = TaskModel.__table__
+        if self.db.get_bind().dialect.name != "sqlite":
+            return list(await self.db.scalars(
+                insert(tasks).returning(tasks.c.id, sort_by_parameter_order=True), values
+            ))
+
+        # SQLite runs ordered RETURNING one row at a time. Insert the first row
+        # to take the write lock, then assign the remaining ids explicitly; no
+        # other writer can allocate ids until this transaction commits.
+        first_id = await self.db.scalar(insert(tasks).returning(tasks.c.id), values[0])
+        task_ids = list(range(first_id, first_id + len(values)))
+        if len(values) > 1:
+            await self.db.execute(
+                insert(tasks),
+                [{**row, "id": task_id} for row, task_id in zip(values[1:], task_ids[1:])],
+            )
+        return task_ids
+
+    async def _import_chunk(
+        self,
+        index: int,
+        batch: List[Tuple[int, Union[str, List[str]]]],
+        header: Optional[List[str]]
+    ) -> BulkChunkReport:
+        errors: List[BulkRowError] = []
+        rows: List[Tuple[int, TaskImportRow]] = []
+        for line_no, raw in batch:
+            try:
+                rows.append((line_no, self._parse_row(raw, header)))
+            except (ValidationError, ValueError) as e:
+                errors.append(BulkRowError(line=line_no, error=str(e)))
+
+        # Resolve every category id referenced by the chunk in one query
+        referenced = {category_id for _, row in rows for category_id in row.category_ids}
+        if referenced:
+            known = set(await self.db.scalars(
+                select(CategoryModel.id).where(CategoryModel.id.in_(referenced))
+            ))
+            valid_rows = []
+            for line_no, row in rows:
+                missing = set(row.category_ids) - known
+                if missing:
+                    errors.append(BulkRowError(line=line_no, error=f"Unknown category ids: {sorted(missing)}"))
+                else:
+                    valid_rows.append((line_no, row))
+            rows = valid_rows
+
+        if not rows:
+            return BulkChunkReport(chunk=index, imported=0, failed=len(errors), errors=errors)
+
+        try:
+            task_ids = await self._insert_tasks(
+                [row.model_dump(exclude={"category_ids"}) for _, row in rows]
+            )
+            links = [
+                {"task_id": task_id, "category_id": category_id}
+                for task_id, (_, row) in zip(task_ids, rows)
+                for category_id in row.category_ids
+            ]
+            if links:
+                await self.db.execute(insert(task_category), links)
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            errors.append(BulkRowError(line=rows[0][0], error=f"Chunk rolled back: {getattr(e, 'orig', None) or e}"))
+            return BulkChunkReport(chunk=index, imported=0, failed=len(batch), errors=errors)
+
+        return BulkChunkReport(chunk=index, imported=len(rows), failed=len(errors), errors=errors)
+
+    async def export_tasks(self, fmt: str = "ndjson") -> AsyncIterator[str]:
+        """Stream every task with its category ids as CSV or NDJSON."""
+        result = await self.db.stream(
+            select(
+                TaskModel.id, TaskModel.title, TaskModel.completed, TaskModel.due_date,
+                TaskModel.priority, TaskModel.estimated_minutes, TaskModel.actual_minutes,
+            )
+            .order_by(TaskModel.id)
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        if fmt == "csv":
+            yield ",".join(EXPORT_FIELDS) + "\r\n"
+
+        async for batch in result.partitions():
+            category_ids: Dict[int, List[int]] = defaultdict(list)
+            links = await self.db.execute(
+                select(task_category.c.task_id, task_category.c.category_id)
+                .where(task_category.c.task_id.in_([row.id for row in batch]))
+            )
+            for task_id, category_id in links:
+                category_ids[task_id].append(category_id)
+
+            if fmt == "csv":
+                out = io.StringIO()
+                writer = csv.writer(out)
+                for row in batch:
+                    writer.writerow([
+                        *row, CSV_LIST_SEPARATOR.join(str(c) for c in category_ids[row.id]),
+                    ])
+                yield out.getvalue()
+            else:
+                yield "".join(
+                    json.dumps({
+                        **row._asdict(),
+                        "due_date": row.due_date.isoformat(),
+                        "category_ids": category_ids[row.id],
+                    }) + "\n"
+                    for row in batch
+                )
@@ -0,0 +1,244 @@
+import time
+from dataclasses import dataclass
+from datetime import date
+from itertools import chain
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import case, event, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..core.task_manager import Task as TaskModel, TimeTracking as TimeTrackingModel, CategoryDailyLoad, task_category
+from ..models.schemas import TaskPrediction
+
+# Fallback duration when a task has no estimate and no category history
+DEFAULT_TASK_MINUTES = 30.0
+
+# Fitted estimators are refit at least this often even without writes
+# (overdue rates depend on today's date)
+ESTIMATOR_TTL_SECONDS = 300.0
+
+# Task ids per IN (...) lookup in batch predictions
+PREDICTION_CHUNK_SIZE = 1000
+
+# Task fields that change the history the estimators are fit on
+_HISTORY_FIELDS = ("completed", "actual_minutes", "estimated_minutes", "due_date")
+
+# Fitted estimators keyed by database URL: (fitted_at, estimators)
+_estimator_cache: Dict[str, Tuple[float, "CategoryEstimators"]] = {}
+
+
+@dataclass
+class CategoryEstimators:
+    """Per-category estimator parameters, sorted by category id, plus global fallbacks."""
+
+    category_ids: np.ndarray
+    samples: np.ndarray
+    ratio: np.ndarray  # geometric mean of actual / estimated minutes
+    mean_minutes: np.ndarray
+    std_minutes: np.ndarray
+    overdue_rate: np.ndarray
+    global_samples: int
+    global_ratio: float
+    global_mean_minutes: float
+    global_std_minutes: float
+    global_overdue_rate: float
+
+
+def invalidate_estimators() -> None:
+    """Drop every cached fit; the next prediction refits from history."""
+    _estimator_cache.clear()
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_on_history_change(session: Session, flush_context) -> None:
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, TimeTrackingModel):
+            invalidate_estimators()
+            return
+        if isinstance(obj, TaskModel):
+            if obj in session.new or obj in session.deleted:
+                invalidate_estimators()
+                return
+            state = inspect(obj)
+            if any(state.attrs[field].history.has_changes() for field in _HISTORY_FIELDS):
+                invalidate_estimators()
+                return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_tracked_time(session: Session) -> None:
+    # Set by writers whose Core statements skip after_flush (see core.timetracking)
+    if session.info.pop("history_changed", False):
+        invalidate_estimators()
+
+
+def _group_mean(positions: np.ndarray, values: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    sums = np.bincount(positions, values, minlength=len(counts)).astype(np.float64)
+    return np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+
+
+class PredictionEngine:
+    """Batch completion predictions from cached per-category estimators."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def estimators(self) -> CategoryEstimators:
+        key = str(self.db.get_bind().url)
+        cached = _estimator_cache.get(key)
+        if cached and time.monotonic() - cached[0] < ESTIMATOR_TTL_SECONDS:
+            return cached[1]
+        fitted = await self._fit()
+        _estimator_cache[key] = (time.monotonic(), fitted)
+        return fitted
+
+    async def _fit(self) -> CategoryEstimators:
+        tracked = (
+            select(func.sum(TimeTrackingModel.duration_minutes))
+            .where(TimeTrackingModel.task_id == TaskModel.id)
+            .scalar_subquery()
+        )
+        # One row per (task, category); uncategorized tasks get a NULL category
+        history = (await self.db.execute(
+            select(
+                TaskModel.id,
+                task_category.c.category_id,
+                func.coalesce(TaskModel.estimated_minutes, 0),
+                func.coalesce(TaskModel.actual_minutes, tracked, 0),
+            )
+            .outerjoin(task_category, task_category.c.task_id == TaskModel.id)
+            .where(TaskModel.completed == True)
+        )).all()
+        columns = np.array(
+            [(row[0], -1 if row[1] is None else row[1], row[2], row[3]) for row in history], dtype=np.float64
+        ).reshape(-1, 4)
+        columns = columns[columns[:, 3] > 0]
+        # Global figures count each task once, whatever its categories
+        _, first_rows = np.unique(columns[:, 0], return_index=True)
+        task_estimated, task_actual = columns[first_rows, 2], columns[first_rows, 3]
+        columns = columns[columns[:, 1] >= 0]
+        category_col, estimated, actual = columns[:, 1].astype(np.int64), columns[:, 2], columns[:, 3]
+
+        open_tasks = CategoryDailyLoad.task_count - CategoryDailyLoad.completed_count
+        overdue = (await self.db.execute(
+            select(
+                CategoryDailyLoad.category_id,
+                func.sum(case((CategoryDailyLoad.day < date.today(), open_tasks), else_=0)),
+                func.sum(open_tasks),
+            ).group_by(CategoryDailyLoad.category_id)
+        )).all()
+        overdue_cols = np.array([tuple(row) for row in overdue], dtype=np.float64).reshape(-1, 3)
+
+        category_ids = np.union1d(category_col, overdue_cols[:, 0].astype(np.int64))
+        positions = np.searchsorted(category_ids, category_col)
+        samples = np.bincount(positions, minlength=len(category_ids)).astype(np.float64)
+
+        mean_minutes = _group_mean(positions, actual, samples)
+        variance = _group_mean(positions, actual ** 2, samples) - mean_minutes ** 2
+        std_minutes = np.sqrt(np.clip(variance, 0, None))
+
+        has_estimate = estimated > 0
+        log_ratio = np.log(actual[has_estimate] / estimated[has_estimate])
+        ratio_positions = positions[has_estimate]
+        ratio_counts = np.bincount(ratio_positions, minlength=len(category_ids)).astype(np.float64)
+        task_has_estimate = task_estimated > 0
+        task_log_ratio = np.log(task_actual[task_has_estimate] / task_estimated[task_has_estimate])
+        global_ratio = float(np.exp(task_log_ratio.mean())) if len(task_log_ratio) else 1.0
+        ratio = np.where(
+            ratio_counts > 0,
+            np.exp(_group_mean(ratio_positions, log_ratio, ratio_counts)),
+            global_ratio,
+        )
+
+        overdue_positions = np.searchsorted(category_ids, overdue_cols[:, 0].astype(np.int64))
+        overdue_open = np.zeros(len(category_ids))
+        overdue_late = np.zeros(len(category_ids))
+        overdue_open[overdue_positions] = overdue_cols[:, 2]
+        overdue_late[overdue_positions] = overdue_cols[:, 1]
+        overdue_rate = np.divide(overdue_late, overdue_open, out=np.zeros_like(overdue_open), where=overdue_open > 0)
+
+        return CategoryEstimators(
+            category_ids=category_ids,
+            samples=samples,
+            ratio=ratio,
+            mean_minutes=mean_minutes,
+            std_minutes=std_minutes,
+            overdue_rate=overdue_rate,
+            global_samples=len(task_actual),
+            global_ratio=global_ratio,
+            global_mean_minutes=float(task_actual.mean()) if len(task_actual) else DEFAULT_TASK_MINUTES,
+            global_std_minutes=float(task_actual.std()) if len(task_actual) else 0.0,
+            global_overdue_rate=float(overdue_late.sum() / overdue_open.sum()) if overdue_open.sum() else 0.0,
+        )
+
+    async def predict(self, task_ids: Sequence[int]) -> List[TaskPrediction]:
+        """
+        Predict completion for many tasks using one query per PREDICTION_CHUNK_SIZE ids.
+
+        Unknown task ids are skipped. Tasks in several categories use the
+        category with the most history.
+        """
+        fitted = await self.estimators()
+        unique_ids = sorted(set(task_ids))
+        rows = []
+        for offset in range(0, len(unique_ids), PREDICTION_CHUNK_SIZE):
+            chunk = unique_ids[offset:offset + PREDICTION_CHUNK_SIZE]
+            rows.extend((await self.db.execute(
+                select(
+                    TaskModel.id, TaskModel.estimated_minutes, TaskModel.due_date,
+                    TaskModel.completed, task_category.c.category_id,
+                )
+                .outerjoin(task_category, task_category.c.task_id == TaskModel.id)
+                .where(TaskModel.id.in_(chunk))
+            )).all())
+        if not rows:
+            return []
+
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        estimated = np.fromiter((row[1] or 0 for row in rows), dtype=np.float64, count=len(rows))
+        today = date.today()
+        overdue_now = np.fromiter((row[2] < today for row in rows), dtype=bool, count=len(rows))
+        completed = np.fromiter((bool(row[3]) for row in rows), dtype=bool, count=len(rows))
+        categories = np.fromiter((row[4] if row[4] is not None else -1 for row in rows), dtype=np.int64, count=len(rows))
+
+        # Locate each row's category estimator; index n is the global fallback
+        n = len(fitted.category_ids)
+        positions = np.searchsorted(fitted.category_ids, categories)
+        found = positions < n
+        found[found] = fitted.category_ids[positions[found]] == categories[found]
+        positions = np.where(found, positions, n)
+
+        samples = np.append(fitted.samples, fitted.global_samples)[positions]
+        overdue_rate = np.append(fitted.overdue_rate, fitted.global_overdue_rate)[positions]
+        # Categories without completed history fall back to the global fit
+        positions = np.where(samples > 0, positions, n)
+        samples = np.append(fitted.samples, fitted.global_samples)[positions]
+        ratio = np.append(fitted.ratio, fitted.global_ratio)[positions]
+        mean_minutes = np.append(fitted.mean_minutes, fitted.global_mean_minutes)[positions]
+        std_minutes = np.append(fitted.std_minutes, fitted.global_std_minutes)[positions]
+
+        predicted = np.where(estimated > 0, estimated * ratio, mean_minutes)
+        # Normal approximation of the 90th percentile of the category's durations
+        predicted_p90 = predicted + 1.2816 * std_minutes
+        overdue_probability = np.where(completed, 0.0, np.where(overdue_now, 1.0, overdue_rate))
+        confidence = samples / (samples + 5)
+
+        # Keep one row per task: the category with the most history
+        order = np.lexsort((-samples, ids))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = ids[order][1:] != ids[order][:-1]
+        chosen = order[first]
+
+        return [
+            TaskPrediction(
+                task_id=int(ids[i]),
+                estimated_minutes=int(estimated[i]) if estimated[i] > 0 else None,
+                predicted_minutes=round(float(predicted[i]), 1),
+                predicted_minutes_p90=round(float(predicted_p90[i]), 1),
+                overdue_probability=float(overdue_probability[i]),
+                confidence=float(confidence[i]),
+            )
+            for i in chosen
+        ]
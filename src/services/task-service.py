@@ -1,14 +0,0 @@
-from typing import List, Dict
-from datetime import date
-from ..models.schemas import Task, TaskStats, TaskPrediction
-
-class TaskService:
-    @staticmethod
-    async def get_category_statistics() -> Dict[str, TaskStats]:
-        # Move category statistics logic here
-        pass
-
-    @staticmethod
-    async def predict_task_completion(task_id: int) -> TaskPrediction:
-        # Move prediction logic here
-        pass
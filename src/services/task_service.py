@@ -0,0 +1,370 @@
+from operator import itemgetter
+from typing import Any, AsyncIterator, Callable, List, Dict, Optional, Sequence, Tuple
+from sqlalchemy import ColumnElement, Select, case, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.hierarchy import ancestors, subtree_task_ids
+from ..core.loading import TASK_DETAIL_OPTIONS, TASK_LIST_OPTIONS, load_category_names, load_category_names_for_ids
+from ..core.rollover import ROLLOVER_CHUNK_SIZE, rollover_overdue_tasks
+from ..core.search import fts_match, fts_rank, match_expression, search_table, search_terms
+from ..core.task_manager import Task as TaskModel, Category as CategoryModel, task_category
+from ..models.schemas import Category, Task, TaskFilter, TaskStats, TaskPrediction, WorkloadStats, RolloverReport
+from ..utils.helpers import decode_cursor, decode_rank_cursor, encode_cursor, encode_rank_cursor
+from .analytics import WorkloadAnalytics
+from .prediction import PredictionEngine
+
+# Rows fetched per round trip when streaming large listings
+STREAM_BATCH_SIZE = 500
+
+# Task schema fields in response order, and the column behind each one;
+# categories come from the link table
+TASK_FIELDS: Tuple[str, ...] = tuple(Task.model_fields)
+TASK_COLUMNS = {
+    "id": TaskModel.id,
+    "title": TaskModel.title,
+    "completed": TaskModel.completed,
+    "due_date": TaskModel.due_date,
+    "priority": TaskModel.priority,
+    "estimated_minutes": TaskModel.estimated_minutes,
+    "actual_minutes": TaskModel.actual_minutes,
+}
+
+# Columns every projection selects, for the keyset cursor
+_CURSOR_FIELDS = ("due_date", "priority", "id")
+
+
+def task_filter_conditions(filters: TaskFilter) -> List[ColumnElement]:
+    """WHERE conditions for the listing filters."""
+    conditions = []
+    if filters.completed is not None:
+        conditions.append(TaskModel.completed == filters.completed)
+    if filters.due_from is not None:
+        conditions.append(TaskModel.due_date >= filters.due_from)
+    if filters.due_to is not None:
+        conditions.append(TaskModel.due_date <= filters.due_to)
+    if filters.category_id is not None:
+        conditions.append(TaskModel.id.in_(
+            select(task_category.c.task_id).where(task_category.c.category_id == filters.category_id)
+        ))
+    if filters.category is not None:
+        conditions.append(TaskModel.id.in_(
+            select(task_category.c.task_id)
+            .join(CategoryModel, CategoryModel.id == task_category.c.category_id)
+            .where(CategoryModel.name == filters.category)
+        ))
+    if filters.category_subtree is not None:
+        conditions.append(TaskModel.id.in_(subtree_task_ids(filters.category_subtree)))
+    return conditions
+
+
+def filter_task_query(stmt: Select, filters: TaskFilter, cursor: Optional[str] = None) -> Select:
+    """
+    Apply listing filters and keyset ordering on (due_date, priority, id).
+
+    Args:
+        stmt: Select over TaskModel (entity or columns)
+        filters: Listing filters
+        cursor: Cursor returned with the previous page
+
+    Returns:
+        Select: Filtered statement ordered for keyset pagination
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    stmt = stmt.where(*task_filter_conditions(filters))
+    position = decode_cursor(cursor)
+    if position is not None:
+        stmt = stmt.where(tuple_(TaskModel.due_date, TaskModel.priority, TaskModel.id) > tuple_(*position))
+    return stmt.order_by(TaskModel.due_date, TaskModel.priority, TaskModel.id)
+
+
+def next_cursor(rows: List[Any], limit: int) -> Optional[str]:
+    """Return the cursor after the last row if a further page exists (limit + 1 rows fetched)."""
+    if len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor(last.due_date, last.priority, last.id)
+
+
+def parse_fields(value: Optional[str], allowed: Sequence[str] = TASK_FIELDS) -> Tuple[str, ...]:
+    """
+    Parse a comma-separated field selection (e.g. "id,title,due_date").
+
+    Args:
+        value: Requested fields; empty or None selects all of them
+        allowed: Selectable fields, in response order
+
+    Returns:
+        Tuple[str, ...]: Requested fields in the order given, without duplicates
+
+    Raises:
+        ValueError: If a field is not in allowed
+    """
+    if not value or not value.strip():
+        return tuple(allowed)
+    fields = tuple(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in fields if name not in allowed]
+    if unknown or not fields:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}; choose from {', '.join(allowed)}")
+    return fields
+
+
+def task_projection(fields: Sequence[str]) -> Tuple[Select, Callable[[Any], Tuple[Any, ...]]]:
+    """
+    Column select for the requested task fields plus the cursor columns.
+
+    Returns:
+        Tuple[Select, Callable]: The select, and a function turning one of its
+        rows into the tuple of requested column values (categories excluded)
+    """
+    columns = [name for name in fields if name in TASK_COLUMNS]
+    selected = columns + [name for name in _CURSOR_FIELDS if name not in columns]
+    stmt = select(*(TASK_COLUMNS[name] for name in selected))
+    positions = [selected.index(name) for name in columns]
+    if len(positions) == 1:
+        position = positions[0]
+        return stmt, lambda row: (row[position],)
+    if not positions:
+        return stmt, lambda row: ()
+    return stmt, itemgetter(*positions)
+
+
+class TaskService:
+    """Task operations backed by an async database session."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def _to_schema(task: TaskModel, categories: Optional[List[str]] = None) -> Task:
+        if categories is None:
+            categories = [category.name for category in task.categories]
+        return Task(
+            id=task.id,
+            title=task.title,
+            completed=task.completed,
+            due_date=task.due_date,
+            priority=task.priority,
+            estimated_minutes=task.estimated_minutes,
+            actual_minutes=task.actual_minutes,
+            categories=categories,
+        )
+
+    async def _get_task(self, task_id: int) -> Optional[TaskModel]:
+        result = await self.db.execute(
+            select(TaskModel)
+            .options(*TASK_DETAIL_OPTIONS)
+            .where(TaskModel.id == task_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def _resolve_categories(self, names: List[str]) -> List[CategoryModel]:
+        if not names:
+            return []
+        result = await self.db.execute(
+            select(CategoryModel).where(CategoryModel.name.in_(names))
+        )
+        return list(result.scalars())
+
+    async def list_task_rows(
+        self,
+        filters: TaskFilter,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        fields: Sequence[str] = TASK_FIELDS
+    ) -> Tuple[List[Tuple[Any, ...]], Optional[str]]:
+        """
+        One keyset page of tasks as tuples of the requested fields.
+
+        Tasks are read as column tuples rather than ORM objects and schemas;
+        encode with api.serialization.encode_rows(fields, rows), which gives
+        the same JSON as dumping Task schemas.
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        projection, values = task_projection(fields)
+        stmt = filter_task_query(projection, filters, cursor).limit(limit + 1)
+        rows = (await self.db.execute(stmt)).all()
+        page = rows[:limit]
+        if "categories" not in fields:
+            return [values(row) for row in page], next_cursor(rows, limit)
+        names = await load_category_names(self.db, stmt)
+        return self._with_categories(fields, page, values, names), next_cursor(rows, limit)
+
+    async def stream_task_rows(
+        self,
+        filters: TaskFilter,
+        fields: Sequence[str] = TASK_FIELDS
+    ) -> AsyncIterator[List[Tuple[Any, ...]]]:
+        """Yield batches of matching tasks as tuples of the requested fields."""
+        projection, values = task_projection(fields)
+        stmt = filter_task_query(projection, filters).execution_options(yield_per=STREAM_BATCH_SIZE)
+        result = await self.db.stream(stmt)
+        async for batch in result.partitions():
+            if "categories" not in fields:
+                yield [values(row) for row in batch]
+            else:
+                names = await load_category_names_for_ids(self.db, [row.id for row in batch])
+                yield self._with_categories(fields, batch, values, names)
+
+    @staticmethod
+    def _with_categories(
+        fields: Sequence[str],
+        rows: Sequence[Any],
+        values: Callable[[Any], Tuple[Any, ...]],
+        names: Dict[int, List[str]]
+    ) -> List[Tuple[Any, ...]]:
+        at = fields.index("categories")
+        out = []
+        for row in rows:
+            picked = values(row)
+            out.append(picked[:at] + (names.get(row.id, []),) + picked[at:])
+        return out
+
+    async def search_tasks(
+        self,
+        query: str,
+        filters: TaskFilter,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        prefix: bool = True
+    ) -> Tuple[List[Task], Optional[str]]:
+        """
+        Full-text search over task titles, best matches first.
+
+        Every word of the query must match (as a prefix unless prefix=False).
+        Pages are keyed on (rank, id); the cursor is only meaningful for the
+        same query and filters.
+
+        Raises:
+            ValueError: If the query has no words or the cursor is malformed
+        """
+        expression = match_expression(query, prefix)
+        if self.db.get_bind().dialect.name != "sqlite":
+            return await self._search_tasks_like(query, filters, limit)
+
+        rank = fts_rank()
+        stmt = (
+            select(TaskModel, rank)
+            .options(*TASK_LIST_OPTIONS)
+            .select_from(search_table)
+            .join(TaskModel, TaskModel.id == search_table.c.rowid)
+            .where(fts_match(expression), *task_filter_conditions(filters))
+        )
+        position = decode_rank_cursor(cursor)
+        if position is not None:
+            stmt = stmt.where(tuple_(rank, TaskModel.id) > tuple_(*position))
+        rows = (await self.db.execute(stmt.order_by(rank, TaskModel.id).limit(limit + 1))).all()
+
+        names = await load_category_names_for_ids(self.db, [task.id for task, _ in rows[:limit]])
+        tasks = [self._to_schema(task, names.get(task.id, [])) for task, _ in rows[:limit]]
+        next_page = None
+        if len(rows) > limit:
+            last_task, last_rank = rows[limit - 1]
+            next_page = encode_rank_cursor(last_rank, last_task.id)
+        return tasks, next_page
+
+    async def _search_tasks_like(self, query: str, filters: TaskFilter, limit: int) -> Tuple[List[Task], None]:
+        # Dialects without FTS5: unranked substring scan, first page only
+        stmt = select(TaskModel).options(*TASK_LIST_OPTIONS).where(*task_filter_conditions(filters))
+        for term in search_terms(query):
+            stmt = stmt.where(TaskModel.title.ilike(f"%{term}%"))
+        rows = list((await self.db.scalars(stmt.order_by(TaskModel.id).limit(limit))).all())
+        names = await load_category_names_for_ids(self.db, [task.id for task in rows])
+        return [self._to_schema(task, names.get(task.id, [])) for task in rows], None
+
+    async def create_task(self, task: Task) -> Task:
+        db_task = TaskModel(
+            title=task.title,
+            completed=task.completed,
+            due_date=task.due_date,
+            priority=task.priority,
+            estimated_minutes=task.estimated_minutes,
+            actual_minutes=task.actual_minutes,
+        )
+        db_task.categories = await self._resolve_categories(task.categories)
+        self.db.add(db_task)
+        await self.db.commit()
+        return self._to_schema(db_task)
+
+    async def update_task(self, task_id: int, updated_task: Task) -> Optional[Task]:
+        db_task = await self._get_task(task_id)
+        if db_task is None:
+            return None
+
+        db_task.title = updated_task.title
+        db_task.completed = updated_task.completed
+        db_task.due_date = updated_task.due_date
+        db_task.priority = updated_task.priority
+        db_task.estimated_minutes = updated_task.estimated_minutes
+        db_task.actual_minutes = updated_task.actual_minutes
+        db_task.categories = await self._resolve_categories(updated_task.categories)
+        await self.db.commit()
+        return self._to_schema(db_task)
+
+    async def delete_task(self, task_id: int) -> Optional[Dict[str, Any]]:
+        db_task = await self.db.get(TaskModel, task_id)
+        if db_task is None:
+            return None
+        await self.db.delete(db_task)
+        await self.db.commit()
+        return {"deleted": task_id}
+
+    async def get_category_statistics(self) -> Dict[str, TaskStats]:
+        result = await self.db.execute(
+            select(
+                CategoryModel.name,
+                func.count(TaskModel.id),
+                func.sum(case((TaskModel.completed == True, 1), else_=0)),
+                func.avg(TaskModel.actual_minutes),
+            )
+            .join(task_category, task_category.c.category_id == CategoryModel.id)
+            .join(TaskModel, TaskModel.id == task_category.c.task_id)
+            .group_by(CategoryModel.name)
+        )
+        stats: Dict[str, TaskStats] = {}
+        for name, total, completed, average_actual in result:
+            completed = completed or 0
+            stats[name] = TaskStats(
+                total_tasks=total,
+                completed_tasks=completed,
+                completion_rate=completed / total if total else 0.0,
+                average_actual_minutes=average_actual,
+            )
+        return stats
+
+    async def get_category_workload(self, category: str, days: int = 7) -> Optional[WorkloadStats]:
+        return await WorkloadAnalytics(self.db).category_workload(category, days)
+
+    async def get_subtree_workload(self, category_id: int, days: int = 7) -> Optional[WorkloadStats]:
+        return await WorkloadAnalytics(self.db).subtree_workload(category_id, days)
+
+    async def get_category_ancestors(self, category_id: int) -> Optional[List[Category]]:
+        """Ancestors from the root down, or None if the category does not exist."""
+        if await self.db.get(CategoryModel, category_id) is None:
+            return None
+        result = await self.db.scalars(ancestors(category_id))
+        return [Category.model_validate(category) for category in result]
+
+    async def predict_task_completion(self, task_id: int) -> Optional[TaskPrediction]:
+        predictions = await PredictionEngine(self.db).predict([task_id])
+        return predictions[0] if predictions else None
+
+    async def predict_tasks(self, task_ids: List[int]) -> List[TaskPrediction]:
+        return await PredictionEngine(self.db).predict(task_ids)
+
+    async def get_workload_balance_recommendations(self, days: int = 7) -> List[Dict[str, Any]]:
+        """Flag categories whose planned minutes deviate strongly from the average."""
+        return await WorkloadAnalytics(self.db).balance_recommendations(days)
+
+    async def rollover_overdue_tasks(
+        self,
+        chunk_size: int = ROLLOVER_CHUNK_SIZE,
+        dry_run: bool = False
+    ) -> RolloverReport:
+        """Move overdue incomplete tasks to today in chunked set-based updates."""
+        report = await self.db.run_sync(
+            lambda session: rollover_overdue_tasks(session, chunk_size=chunk_size, dry_run=dry_run)
+        )
+        return RolloverReport.model_validate(report)
@@ -0,0 +1,1079 @@
+import asyncio
+import json
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.core.database import Base, build_async_engine, build_engine, get_async_db, get_async_read_db
+from src.core.loading import QueryBudgetExceeded, query_budget
+from src.core.task_manager import Category, Task, TimeTracking
+from src.main import app
+
+
+@pytest.fixture
+def db_urls(tmp_path):
+    path = tmp_path / "test.db"
+    sync_engine = build_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=sync_engine)
+    yield sync_engine, f"sqlite+aiosqlite:///{path}"
+    sync_engine.dispose()
+
+
+@pytest.fixture
+def async_engine(db_urls):
+    engine = build_async_engine(db_urls[1])
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def client(async_engine, db_urls):
+    from sqlalchemy.orm import sessionmaker
+    from src.core.timetracking import TimeTrackingWriter
+    session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
+    app.state.time_tracker = TimeTrackingWriter(sessionmaker(bind=db_urls[0]))
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+def test_sqlite_pragmas_applied_on_connect(db_urls):
+    sync_engine, _ = db_urls
+    with sync_engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+
+
+def test_async_engine_applies_pragmas(db_urls):
+    _, async_url = db_urls
+
+    async def check():
+        async_engine = build_async_engine(async_url)
+        async with async_engine.connect() as conn:
+            mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+        await async_engine.dispose()
+        return mode
+
+    assert asyncio.run(check()) == "wal"
+
+
+def test_task_crud_through_async_session(client):
+    payload = {"title": "Write report", "due_date": str(date.today()), "priority": 2}
+    created = client.post("/tasks", json=payload).json()
+    assert created["id"] is not None
+
+    payload["completed"] = True
+    updated = client.put(f"/tasks/{created['id']}", json=payload).json()
+    assert updated["completed"] is True
+
+    assert [t["id"] for t in client.get("/tasks").json()] == [created["id"]]
+    assert client.delete(f"/tasks/{created['id']}").status_code == 200
+    assert client.put(f"/tasks/{created['id']}", json=payload).status_code == 404
+
+
+def test_category_workload_and_prediction(client, db_urls):
+    sync_engine, _ = db_urls
+    from sqlalchemy.orm import Session
+    with Session(sync_engine) as db:
+        work = Category(name="Work", color="#0000ff")
+        done = Task(title="Done", due_date=date.today(), priority=1,
+                    estimated_minutes=60, actual_minutes=90, completed=True, categories=[work])
+        todo = Task(title="Todo", due_date=date.today(), priority=1,
+                    estimated_minutes=40, categories=[work])
+        db.add_all([done, todo])
+        db.flush()
+        start = date.today()
+        db.add(TimeTracking(task_id=done.id, start_time=start, duration_minutes=90))
+        db.commit()
+        todo_id = todo.id
+
+    workload = client.get("/categories/Work/workload").json()
+    assert workload["total_tasks"] == 2
+    assert workload["tracked_minutes"] == 90
+
+    prediction = client.get(f"/tasks/{todo_id}/prediction").json()
+    assert prediction["predicted_minutes"] == 60.0
+    assert client.get("/categories/Missing/workload").status_code == 404
+    for days in (0, -5, 367):
+        assert client.get("/categories/Work/workload", params={"days": days}).status_code == 422
+
+
+def test_api_router_uses_async_session(client):
+    response = client.post("/api/tasks/", json={
+        "title": "Router task", "due_date": str(date.today() + timedelta(days=1)), "priority": 3,
+    })
+    assert response.status_code == 200
+    task_id = response.json()["id"]
+    assert client.get(f"/api/tasks/{task_id}").json()["title"] == "Router task"
+    assert client.get("/api/tasks/999").status_code == 404
+
+
+def _seed_tasks(sync_engine, count):
+    from sqlalchemy.orm import Session
+    with Session(sync_engine) as db:
+        home = Category(name="Home", color="#00ff00")
+        for i in range(count):
+            db.add(Task(title=f"Task {i}", due_date=date.today() + timedelta(days=i % 3),
+                        priority=i % 5 + 1, completed=i % 4 == 0,
+                        categories=[home] if i % 2 else []))
+        db.commit()
+
+
+def test_keyset_pagination_walks_all_tasks_in_order(client, db_urls):
+    _seed_tasks(db_urls[0], 25)
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 10}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/tasks", params=params)
+        seen.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    keys = [(t["due_date"], t["priority"], t["id"]) for t in seen]
+    assert len(seen) == 25
+    assert keys == sorted(keys)
+
+
+def test_listing_filters_and_bad_cursor(client, db_urls):
+    _seed_tasks(db_urls[0], 20)
+    home = client.get("/tasks", params={"category": "Home", "completed": False}).json()
+    assert home and all("Home" in t["categories"] and not t["completed"] for t in home)
+
+    today = client.get("/api/tasks/", params={"due_to": str(date.today())}).json()
+    assert today and all(t["due_date"] == str(date.today()) for t in today)
+
+    assert client.get("/tasks", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_ndjson_stream_returns_every_row(client, db_urls):
+    import json
+    _seed_tasks(db_urls[0], 1200)
+    response = client.get("/api/tasks/", params={"stream": True})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 1200
+
+    rows = [json.loads(line) for line in client.get("/tasks?stream=true&category=Home").text.splitlines()]
+    assert len(rows) == 600
+
+
+def test_bulk_import_reports_bad_rows_per_chunk(client, db_urls):
+    import json
+    from sqlalchemy.orm import Session
+    with Session(db_urls[0]) as db:
+        db.add(Category(id=7, name="Errands", color="#ff0000"))
+        db.commit()
+
+    lines = [json.dumps({"title": f"Bulk {i}", "due_date": str(date.today()), "priority": 2,
+                         "category_ids": [7] if i % 2 else []}) for i in range(10)]
+    lines.insert(3, '{"title": "", "due_date": "nope"}')
+    lines.append(json.dumps({"title": "Orphan", "due_date": str(date.today()), "category_ids": [99]}))
+    response = client.post("/api/tasks/bulk", content="\n".join(lines),
+                           headers={"content-type": "application/x-ndjson"})
+    result = response.json()
+    assert result["imported"] == 10
+    assert result["failed"] == 2
+    assert sorted(e["line"] for c in result["chunks"] for e in c["errors"]) == [4, 12]
+    assert len(client.get("/tasks", params={"category": "Errands"}).json()) == 5
+
+
+def test_bulk_csv_export_round_trips_through_import(client, db_urls):
+    _seed_tasks(db_urls[0], 30)
+    exported = client.get("/api/tasks/bulk", params={"format": "csv"}).text
+    assert exported.splitlines()[0].startswith("id,title,completed")
+
+    result = client.post("/api/tasks/bulk", content=exported,
+                         headers={"content-type": "text/csv"}).json()
+    assert result == {"imported": 30, "failed": 0, "chunks": [{"chunk": 0, "imported": 30, "failed": 0, "errors": []}]}
+    assert len(client.get("/tasks", params={"category": "Home", "limit": 1000}).json()) == 30
+    assert client.post("/api/tasks/bulk", content="x", headers={"content-type": "text/plain"}).status_code == 415
+
+
+def test_bulk_csv_import_keeps_line_breaks_inside_quoted_fields(client):
+    titles = ["Call the bank\nthen the landlord", 'Pack: "tent",\r\nstove', "Café ☕"]
+    for title in titles:
+        client.post("/api/tasks/", json={"title": title, "due_date": str(date.today()), "priority": 2})
+    exported = client.get("/api/tasks/bulk", params={"format": "csv"}).content
+    # A broken row after the multi-line records is reported at the line it starts on
+    body = exported + f"99,,False,{date.today()},2,,,\r\n".encode()
+
+    def chunked():
+        # Small chunks split rows, quoted line breaks and multi-byte characters
+        for start in range(0, len(body), 7):
+            yield body[start:start + 7]
+
+    result = client.post("/api/tasks/bulk", content=chunked(), headers={"content-type": "text/csv"}).json()
+    assert result["imported"] == 3
+    assert [e["line"] for e in result["chunks"][0]["errors"]] == [7]
+    imported = [t["title"] for t in client.get("/tasks", params={"limit": 10}).json()][3:]
+    assert imported == titles
+
+
+def test_csv_rows_with_a_stray_quote_are_not_held_back():
+    from src.utils.helpers import aiter_csv_rows
+    lines = ['1,"24"" monitor",False\r\n', '2,24" monitor,False\r\n', '3,"Pack\r\n', 'stove",False\r\n',
+             '4,Desk,False\r\n']
+    seen = []
+
+    async def chunks():
+        for line in lines:
+            seen.append(line)
+            yield line.encode()
+
+    async def scenario():
+        # Each record comes out before the line after it is read
+        return [(start, row, len(seen)) async for start, row in aiter_csv_rows(chunks())]
+
+    assert asyncio.run(scenario()) == [
+        (1, ["1", '24" monitor', "False"], 1),
+        (2, ["2", '24" monitor', "False"], 2),
+        (3, ["3", "Pack\r\nstove", "False"], 4),
+        (5, ["4", "Desk", "False"], 5),
+    ]
+
+
+def test_task_listing_query_count_is_constant(client, async_engine, db_urls):
+    _seed_tasks(db_urls[0], 2000)
+    for limit in (10, 1000):
+        with query_budget(async_engine, 2):
+            tasks = client.get("/tasks", params={"limit": limit}).json()
+        assert len(tasks) == limit
+        assert all(("Home" in t["categories"]) == (t["id"] % 2 == 0) for t in tasks)
+
+    with query_budget(async_engine, 2):
+        client.get("/api/tasks/", params={"limit": 1000})
+
+
+def test_query_budget_reports_statements(db_urls):
+    from sqlalchemy.orm import Session
+    with pytest.raises(QueryBudgetExceeded, match="got 2"):
+        with query_budget(db_urls[0], 1), Session(db_urls[0]) as db:
+            db.execute(text("SELECT 1"))
+            db.execute(text("SELECT 2"))
+
+
+def test_relationships_do_not_lazy_load(db_urls):
+    from sqlalchemy.exc import InvalidRequestError
+    from sqlalchemy.orm import Session
+    _seed_tasks(db_urls[0], 3)
+    with Session(db_urls[0]) as db:
+        task = db.get(Task, 2)
+        with pytest.raises(InvalidRequestError):
+            task.categories
+        db.delete(task)
+        db.commit()
+        assert db.execute(text("SELECT count(*) FROM task_category WHERE task_id = 2")).scalar() == 0
+
+
+def _rollup_rows(conn):
+    rows = conn.execute(text(
+        "SELECT category_id, day, task_count, completed_count, planned_minutes, open_minutes, tracked_minutes "
+        "FROM category_daily_load WHERE task_count != 0 OR tracked_minutes != 0 ORDER BY category_id, day"
+    )).all()
+    return [tuple(round(v, 6) if isinstance(v, float) else v for v in row) for row in rows]
+
+
+def test_daily_load_rollup_tracks_writes(db_urls):
+    from datetime import datetime
+    from sqlalchemy.orm import Session
+    from src.core.rollups import rebuild_rollups
+    sync_engine = db_urls[0]
+    with Session(sync_engine) as db:
+        work, home = Category(name="Work", color="#0000ff"), Category(name="Home", color="#00ff00")
+        a = Task(title="A", due_date=date.today(), priority=1, estimated_minutes=60, categories=[work])
+        b = Task(title="B", due_date=date.today(), priority=2, estimated_minutes=30, categories=[work, home])
+        db.add_all([a, b])
+        db.flush()
+        tracks = [TimeTracking(task_id=t.id, start_time=datetime.now(), duration_minutes=m)
+                  for t, m in ((a, 20), (b, 15), (b, 5))]
+        db.add_all(tracks)
+        db.commit()
+
+        b.due_date = date.today() + timedelta(days=1)
+        a.completed = True
+        tracks[1].duration_minutes = 25
+        db.commit()
+        db.execute(text("DELETE FROM task_category WHERE task_id = :id AND category_id = :cat"),
+                   {"id": b.id, "cat": home.id})
+        db.delete(tracks[2])
+        db.commit()
+
+        c = Task(title="C", due_date=date.today(), priority=3, estimated_minutes=10, categories=[home])
+        db.add(c)
+        db.commit()
+        db.delete(a)
+        db.delete(home)
+        db.commit()
+
+    with sync_engine.begin() as conn:
+        incremental = _rollup_rows(conn)
+        rebuild_rollups(conn)
+        assert incremental == _rollup_rows(conn)
+        assert incremental  # Work still has task B and its tracked time
+
+
+def test_workload_balance_from_rollup(client, db_urls):
+    from sqlalchemy.orm import Session
+    with Session(db_urls[0]) as db:
+        for name, minutes in (("Heavy", 500), ("Normal", 300), ("Light", 100)):
+            category = Category(name=name, color="#808080")
+            db.add(Task(title=name, due_date=date.today(), priority=1,
+                        estimated_minutes=minutes, categories=[category]))
+        db.commit()
+
+    recommendations = client.get("/categories/workload-balance").json()
+    assert [(r["category"], r["recommendation"]) for r in recommendations] == [
+        ("Heavy", "reduce"), ("Normal", "keep"), ("Light", "increase"),
+    ]
+    assert recommendations[0]["imbalance"] > 0
+
+
+def test_batch_predictions_use_category_history(client, db_urls):
+    from sqlalchemy.orm import Session
+    with Session(db_urls[0]) as db:
+        work, home = Category(name="Work", color="#0000ff"), Category(name="Home", color="#00ff00")
+        for actual in (60, 90, 120):  # Work runs 2x over its 30-60 minute estimates
+            db.add(Task(title="Done", due_date=date.today(), priority=1, completed=True,
+                        estimated_minutes=actual // 2, actual_minutes=actual, categories=[work]))
+        open_tasks = [
+            Task(title=f"Open {i}", due_date=date.today() + timedelta(days=1), priority=2,
+                 estimated_minutes=40, categories=[work] if i % 2 else [home])
+            for i in range(200)
+        ]
+        db.add_all(open_tasks)
+        db.commit()
+        ids = [t.id for t in open_tasks]
+
+    predictions = client.post("/tasks/predictions", json={"task_ids": ids + [999999]}).json()
+    assert len(predictions) == 200
+    by_id = {p["task_id"]: p for p in predictions}
+    assert by_id[ids[1]]["predicted_minutes"] == 80.0
+    assert by_id[ids[1]]["confidence"] == 3 / 8
+    # Home has no history and falls back to the global ratio
+    assert by_id[ids[0]]["predicted_minutes"] == 80.0
+    assert client.get(f"/tasks/{ids[1]}/prediction").json() == by_id[ids[1]]
+
+
+def test_global_prediction_counts_every_completed_task_once(client, db_urls):
+    from sqlalchemy.orm import Session
+    with Session(db_urls[0]) as db:
+        work, home = Category(name="Work", color="#0000ff"), Category(name="Home", color="#00ff00")
+        for estimated, actual in ((None, 30), (None, 60), (45, 90)):  # uncategorized history
+            db.add(Task(title="Done", due_date=date.today(), priority=1, completed=True,
+                        estimated_minutes=estimated, actual_minutes=actual))
+        db.add(Task(title="Both", due_date=date.today(), priority=1, completed=True,
+                    actual_minutes=120, categories=[work, home]))
+        unknown = Task(title="Unknown", due_date=date.today() + timedelta(days=1), priority=2)
+        estimated = Task(title="Estimated", due_date=date.today() + timedelta(days=1), priority=2,
+                         estimated_minutes=10)
+        db.add_all([unknown, estimated])
+        db.commit()
+        unknown_id, estimated_id = unknown.id, estimated.id
+
+    by_id = {p["task_id"]: p for p in client.post(
+        "/tasks/predictions", json={"task_ids": [unknown_id, estimated_id]}).json()}
+    # Four tasks: the uncategorized ones count and the one in two categories counts once
+    assert by_id[unknown_id]["predicted_minutes"] == 75.0
+    assert by_id[unknown_id]["confidence"] == 4 / 9
+    assert by_id[estimated_id]["predicted_minutes"] == 20.0
+
+
+def test_prediction_cache_invalidated_by_new_time_tracks(client, db_urls):
+    from datetime import datetime
+    from sqlalchemy.orm import Session
+    with Session(db_urls[0]) as db:
+        work = Category(name="Work", color="#0000ff")
+        done = Task(title="Done", due_date=date.today(), priority=1, completed=True,
+                    estimated_minutes=30, categories=[work])
+        todo = Task(title="Todo", due_date=date.today(), priority=1, estimated_minutes=30, categories=[work])
+        db.add_all([done, todo])
+        db.commit()
+        done_id, todo_id = done.id, todo.id
+
+    assert client.get(f"/tasks/{todo_id}/prediction").json()["confidence"] == 0
+    with Session(db_urls[0]) as db:
+        db.add(TimeTracking(task_id=done_id, start_time=datetime.now(), duration_minutes=45))
+        db.commit()
+    prediction = client.get(f"/tasks/{todo_id}/prediction").json()
+    assert prediction["predicted_minutes"] == 45.0
+    assert prediction["confidence"] > 0
+
+
+def test_rollover_endpoint_moves_overdue_tasks(client, db_urls):
+    from sqlalchemy.orm import Session
+    sync_engine, _ = db_urls
+    today = date.today()
+    with Session(sync_engine) as db:
+        db.add_all([
+            Task(title="Late", due_date=today - timedelta(days=3), priority=1),
+            Task(title="Later", due_date=today - timedelta(days=1), priority=2),
+            Task(title="Done", due_date=today - timedelta(days=2), priority=3, completed=True),
+            Task(title="Upcoming", due_date=today + timedelta(days=1), priority=3),
+        ])
+        db.commit()
+
+    preview = client.post("/tasks/rollover", params={"dry_run": True}).json()
+    assert (preview["overdue"], preview["updated"], preview["done"]) == (2, 0, True)
+
+    report = client.post("/tasks/rollover", params={"chunk_size": 1}).json()
+    assert (report["overdue"], report["updated"], report["chunks"]) == (2, 2, 2)
+    due = {t["title"]: t["due_date"] for t in client.get("/tasks").json()}
+    assert due["Late"] == due["Later"] == str(today)
+    assert due["Done"] == str(today - timedelta(days=2))
+    assert client.get("/tasks/rollover").status_code == 404
+
+
+def _closure_rows(conn):
+    return sorted(conn.execute(text("SELECT ancestor_id, descendant_id, depth FROM category_closure")).all())
+
+
+def test_category_closure_follows_inserts_moves_and_deletes(db_urls):
+    from sqlalchemy.exc import IntegrityError
+    from sqlalchemy.orm import Session
+    from src.core.hierarchy import rebuild_closure
+    sync_engine = db_urls[0]
+    with Session(sync_engine) as db:
+        work = Category(name="Work", color="#0000ff")
+        db.add(work)
+        db.flush()
+        dev = Category(name="Dev", color="#0000ff", parent_id=work.id)
+        ops = Category(name="Ops", color="#0000ff", parent_id=work.id)
+        db.add_all([dev, ops])
+        db.flush()
+        backend = Category(name="Backend", color="#0000ff", parent_id=dev.id)
+        frontend = Category(name="Frontend", color="#0000ff", parent_id=dev.id)
+        db.add_all([backend, frontend])
+        db.commit()
+        ids = {c.name: c.id for c in (work, dev, ops, backend, frontend)}
+
+        depth = dict(((a, d), n) for a, d, n in _closure_rows(db.connection()))
+        assert depth[(ids["Work"], ids["Backend"])] == 2
+        assert len(depth) == 5 + 4 + 2  # self links, Work's descendants, Dev's children
+
+        backend.parent_id = ops.id
+        db.commit()
+        with pytest.raises(IntegrityError):
+            db.execute(text("UPDATE categories SET parent_id = :child WHERE id = :id"),
+                       {"child": ids["Backend"], "id": ids["Work"]})
+        db.rollback()
+
+        # Deleting Dev sets Frontend's parent to NULL, detaching it from Work
+        db.execute(text("DELETE FROM categories WHERE id = :id"), {"id": ids["Dev"]})
+        db.commit()
+
+    with sync_engine.begin() as conn:
+        incremental = _closure_rows(conn)
+        rebuild_closure(conn)
+        assert incremental == _closure_rows(conn)
+        assert (ids["Ops"], ids["Backend"], 1) in incremental
+        assert not any(a == ids["Work"] and d == ids["Frontend"] for a, d, _ in incremental)
+
+
+def test_category_subtree_listing_workload_and_ancestors(client, db_urls):
+    from datetime import datetime
+    from sqlalchemy.orm import Session
+    with Session(db_urls[0]) as db:
+        work = Category(name="Work", color="#0000ff")
+        db.add(work)
+        db.flush()
+        dev = Category(name="Dev", color="#0000ff", parent_id=work.id)
+        db.add(dev)
+        db.flush()
+        backend = Category(name="Backend", color="#0000ff", parent_id=dev.id)
+        home = Category(name="Home", color="#00ff00")
+        db.add_all([backend, home])
+        db.flush()
+        tasks = [
+            Task(title="Plan", due_date=date.today(), priority=1, estimated_minutes=30, categories=[work]),
+            Task(title="API", due_date=date.today(), priority=2, estimated_minutes=60, categories=[dev, backend]),
+            Task(title="DB", due_date=date.today(), priority=3, estimated_minutes=45, completed=True,
+                 categories=[backend]),
+            Task(title="Laundry", due_date=date.today(), priority=1, estimated_minutes=20, categories=[home]),
+        ]
+        db.add_all(tasks)
+        db.flush()
+        db.add(TimeTracking(task_id=tasks[1].id, start_time=datetime.now(), duration_minutes=40))
+        db.commit()
+        ids = {"work": work.id, "dev": dev.id, "backend": backend.id}
+
+    titles = [t["title"] for t in client.get("/tasks", params={"category_subtree": ids["work"]}).json()]
+    assert titles == ["Plan", "API", "DB"]
+    titles = [t["title"] for t in client.get("/tasks", params={"category_subtree": ids["dev"]}).json()]
+    assert titles == ["API", "DB"]
+
+    workload = client.get(f"/categories/{ids['work']}/subtree/workload").json()
+    assert (workload["total_tasks"], workload["completed_tasks"]) == (3, 1)
+    assert (workload["estimated_minutes"], workload["tracked_minutes"]) == (135, 40)
+
+    path = client.get(f"/categories/{ids['backend']}/ancestors").json()
+    assert [c["name"] for c in path] == ["Work", "Dev"]
+    assert client.get("/categories/999/ancestors").status_code == 404
+    assert client.get("/categories/999/subtree/workload").status_code == 404
+    assert client.get(f"/categories/{ids['work']}/subtree/workload", params={"days": -5}).status_code == 422
+
+
+def test_versioned_cache_evicts_expires_and_invalidates():
+    from src.core.cache import VersionedCache, WriteVersion
+    now = [0.0]
+    version = WriteVersion()
+    cache = VersionedCache(max_entries=2, ttl_seconds=10, version=version, clock=lambda: now[0])
+
+    for key in "abc":
+        cache.set(key, key.upper(), version.value)
+    assert cache.get("a") is None and cache.stats.evictions == 1
+    assert cache.get("b") == "B"
+
+    now[0] = 11
+    assert cache.get("b") is None and cache.stats.expired == 1
+    cache.set("d", "D", version.value)
+    version.bump()
+    assert cache.get("d") is None and cache.stats.stale == 1
+    assert (cache.stats.hits, cache.stats.misses) == (1, 3)
+    assert cache.stats.hit_rate == 0.25
+
+
+def test_task_reads_are_cached_and_revalidated_with_etags(client, async_engine, db_urls):
+    from sqlalchemy.orm import Session
+    payload = {"title": "Poll me", "due_date": str(date.today()), "priority": 2}
+    task_id = client.post("/tasks", json=payload).json()["id"]
+
+    first = client.get("/tasks", params={"limit": 10})
+    etag = first.headers["ETag"]
+    with query_budget(async_engine, 0):
+        assert client.get("/tasks", params={"limit": 10}).json() == first.json()
+        not_modified = client.get("/tasks", params={"limit": 10}, headers={"If-None-Match": etag})
+        assert (not_modified.status_code, not_modified.content) == (304, b"")
+
+    detail = client.get(f"/api/tasks/{task_id}")
+    with query_budget(async_engine, 0):
+        assert client.get(f"/api/tasks/{task_id}", headers={"If-None-Match": detail.headers["ETag"]}).status_code == 304
+
+    # Writes through any session, including set-based updates, change the ETag
+    with Session(db_urls[0]) as db:
+        db.get(Task, task_id).title = "Renamed"
+        db.commit()
+    fresh = client.get("/tasks", params={"limit": 10}, headers={"If-None-Match": etag})
+    assert fresh.status_code == 200 and fresh.json()[0]["title"] == "Renamed"
+    assert client.get(f"/api/tasks/{task_id}").json()["title"] == "Renamed"
+
+    etag = fresh.headers["ETag"]
+    client.post("/tasks/rollover")
+    assert client.get("/tasks", params={"limit": 10}, headers={"If-None-Match": etag}).status_code == 200
+
+    stats = client.get("/cache/stats").json()
+    assert stats["hits"] >= 1 and stats["not_modified"] >= 2 and 0 < stats["hit_rate"] <= 1
+    assert client.get("/api/tasks/999999").status_code == 404
+
+
+def test_expired_entries_are_revalidated_against_a_fresh_render():
+    from starlette.requests import Request
+    from src.api.cache import ResponseCache
+    from src.core.cache import VersionedCache
+    now = [0.0]
+    responses = ResponseCache(VersionedCache(ttl_seconds=10, clock=lambda: now[0]))
+    body = [b'["old"]']
+
+    async def render():
+        return body[0], {}
+
+    def request(etag=None):
+        headers = [(b"if-none-match", etag.encode())] if etag else []
+        return Request({"type": "http", "method": "GET", "path": "/tasks", "headers": headers, "query_string": b""})
+
+    async def scenario():
+        etag = (await responses.respond(request(), "tasks", render)).headers["ETag"]
+        assert (await responses.respond(request(etag), "tasks", render)).status_code == 304
+        # Another process changes the data; this process's write version does not move
+        body[0] = b'["new"]'
+        now[0] += 11
+        fresh = await responses.respond(request(etag), "tasks", render)
+        assert (fresh.status_code, fresh.body) == (200, b'["new"]')
+        assert fresh.headers["ETag"] != etag
+        assert (await responses.respond(request(fresh.headers["ETag"]), "tasks", render)).status_code == 304
+
+    asyncio.run(scenario())
+
+
+def _search_ids(conn, expression):
+    return sorted(conn.execute(text("SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH :q"), {"q": expression}).scalars())
+
+
+def test_search_index_follows_writes_and_installs_on_existing_db(db_urls):
+    from sqlalchemy.orm import Session
+    from src.core.search import install_search
+    sync_engine = db_urls[0]
+    with Session(sync_engine) as db:
+        report = Task(title="Quarterly report", due_date=date.today(), priority=1)
+        review = Task(title="Review café menu", due_date=date.today(), priority=2)
+        db.add_all([report, review])
+        db.commit()
+        assert _search_ids(db.connection(), "report") == [report.id]
+        assert _search_ids(db.connection(), "cafe") == [review.id]
+
+        report.title = "Annual summary"
+        db.commit()
+        assert _search_ids(db.connection(), "report") == []
+        assert _search_ids(db.connection(), "annual") == [report.id]
+
+        db.delete(review)
+        db.commit()
+        assert _search_ids(db.connection(), "menu") == []
+        report_id = report.id
+
+    # A database created before the index existed is backfilled on install
+    with sync_engine.begin() as conn:
+        conn.execute(text("DROP TABLE tasks_fts"))
+        for name in ("fts_task_insert", "fts_task_delete", "fts_task_update"):
+            conn.execute(text(f"DROP TRIGGER {name}"))
+        assert install_search(conn)
+        assert not install_search(conn)
+        assert _search_ids(conn, "summary") == [report_id]
+
+
+def test_search_endpoint_ranks_filters_and_pages(client, db_urls):
+    from sqlalchemy.orm import Session
+    with Session(db_urls[0]) as db:
+        work = Category(name="Work", color="#0000ff")
+        db.add_all([
+            Task(title="Write report", due_date=date.today(), priority=1, categories=[work]),
+            Task(title="Report report report", due_date=date.today(), priority=2),
+            Task(title="Reply to reporter", due_date=date.today() + timedelta(days=3), priority=3,
+                 completed=True),
+            Task(title="Water plants", due_date=date.today(), priority=4),
+        ])
+        db.commit()
+
+    titles = [t["title"] for t in client.get("/tasks/search", params={"q": "report"}).json()]
+    assert titles[0] == "Report report report"
+    assert set(titles) == {"Write report", "Report report report", "Reply to reporter"}
+    exact = client.get("/tasks/search", params={"q": "report", "prefix": False}).json()
+    assert {t["title"] for t in exact} == {"Write report", "Report report report"}
+
+    filtered = client.get("/tasks/search", params={"q": "rep", "completed": False, "category": "Work"}).json()
+    assert [(t["title"], t["categories"]) for t in filtered] == [("Write report", ["Work"])]
+    dated = client.get("/tasks/search", params={"q": "rep", "due_from": str(date.today() + timedelta(days=1))})
+    assert [t["title"] for t in dated.json()] == ["Reply to reporter"]
+
+    seen, cursor = [], None
+    while True:
+        params = {"q": "report", "limit": 1, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/tasks/search", params=params)
+        seen.extend(t["title"] for t in response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert seen == titles
+
+    # FTS5 syntax in user input is searched as plain words
+    assert client.get("/tasks/search", params={"q": 'report" OR title:*'}).status_code == 200
+    assert client.get("/tasks/search", params={"q": "^water* -("}).json()[0]["title"] == "Water plants"
+    assert client.get("/tasks/search", params={"q": "***"}).status_code == 400
+    assert client.get("/tasks/search", params={"q": "report", "cursor": "bogus"}).status_code == 400
+
+
+def test_timer_events_are_group_committed_and_roll_up(client, db_urls):
+    from datetime import datetime
+    from sqlalchemy.orm import Session
+    from src.core.timetracking import TimeTrackingWriter, TimerError
+    from src.services import prediction
+    sync_engine = db_urls[0]
+    with Session(sync_engine) as db:
+        work = Category(name="Work", color="#0000ff")
+        task = Task(title="Write docs", due_date=date.today(), priority=1, actual_minutes=5, categories=[work])
+        db.add(task)
+        db.commit()
+        task_id = task.id
+
+    # The app's writer is on the test database; keep batches open until flushed
+    writer = app.state.time_tracker
+    writer.max_latency = 10
+
+    assert client.post("/tasks/999/timer/start").status_code == 404
+    assert client.post(f"/tasks/{task_id}/timer/heartbeat").status_code == 409
+    started = client.post(f"/tasks/{task_id}/timer/start").json()
+    assert started["running"] and started["kind"] == "start"
+    assert client.post(f"/tasks/{task_id}/timer/start").status_code == 409
+    # Nothing is written until the batch closes
+    with sync_engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM time_tracking")).scalar() == 0
+
+    begin = datetime.fromisoformat(started["start_time"])
+    writer.record("heartbeat", task_id, begin + timedelta(minutes=20))
+    prediction._estimator_cache["stale"] = (0.0, None)
+    assert writer.flush(timeout=5)
+    # Estimators fit on the old history are dropped with the batch
+    assert prediction._estimator_cache == {}
+    with sync_engine.connect() as conn:
+        row = conn.execute(text("SELECT end_time, duration_minutes FROM time_tracking")).one()
+        assert row[0] is None and row[1] == pytest.approx(20)
+        assert conn.execute(text("SELECT actual_minutes FROM tasks")).scalar() == 25
+
+    for minutes in (30, 40):
+        writer.record("heartbeat", task_id, begin + timedelta(minutes=minutes))
+    writer.record("stop", task_id, begin + timedelta(minutes=45))
+    with pytest.raises(TimerError):
+        writer.record("stop", task_id)
+    # A second session started in the same batch gets its own row
+    writer.record("start", task_id, begin + timedelta(minutes=60))
+    writer.record("stop", task_id, begin + timedelta(minutes=70))
+    writer.record("start", task_id, begin + timedelta(minutes=80))
+    writer.stop()
+    assert (writer.stats.batches, writer.stats.events) == (2, 8)
+
+    with sync_engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT end_time IS NULL, duration_minutes FROM time_tracking ORDER BY id"
+        )).all()
+        assert [(open_, round(minutes)) for open_, minutes in rows] == [(0, 45), (0, 10), (1, 0)]
+        assert conn.execute(text("SELECT actual_minutes FROM tasks")).scalar() == 5 + 45 + 10
+        assert conn.execute(text("SELECT tracked_minutes FROM category_daily_load")).scalar() == pytest.approx(55)
+
+    # A restarted writer picks the open timer back up
+    resumed = TimeTrackingWriter(lambda: Session(sync_engine))
+    resumed.start()
+    assert resumed.running(task_id) == begin + timedelta(minutes=80)
+    resumed.record("stop", task_id, begin + timedelta(minutes=95))
+    resumed.stop()
+    with sync_engine.connect() as conn:
+        assert conn.execute(text("SELECT actual_minutes FROM tasks")).scalar() == 5 + 45 + 10 + 15
+
+
+def test_benchmark_data_is_deterministic_and_regressions_fail(tmp_path):
+    from src.benchmarks.datagen import DatasetSpec, generate
+    from src.benchmarks.suite import Result, compare
+    spec = DatasetSpec(tasks=300, root_categories=2, category_fanout=2, category_depth=2, seed=7)
+    dumps = []
+    for name in ("a", "b"):
+        sync_engine = build_engine(f"sqlite:///{tmp_path / name}.db")
+        counts = generate(sync_engine, spec)
+        with sync_engine.connect() as conn:
+            dumps.append([conn.execute(text(f"SELECT * FROM {table} ORDER BY 1, 2")).all()
+                          for table in ("tasks", "categories", "task_category", "time_tracking")])
+            depth = conn.execute(text("SELECT MAX(depth) FROM category_closure")).scalar()
+        sync_engine.dispose()
+    assert dumps[0] == dumps[1]
+    assert counts["tasks"] == 300 and counts["categories"] == spec.category_count == 14
+    assert depth == 2
+    with pytest.raises(ValueError):
+        generate(build_engine(f"sqlite:///{tmp_path / 'a'}.db"), spec)
+
+    baseline = {"results": {
+        "query.list_first_page": {"score_ms": 10.0, "calibration_ms": 20.0},
+        "scheduler.plan_day": {"score_ms": 10.0, "calibration_ms": 20.0},
+    }}
+    results = [
+        # Twice as slow, but so was the calibration loop
+        Result("query.list_first_page", 20.0, 20.0, 20.0, 5, calibration_ms=40.0),
+        Result("scheduler.plan_day", 14.0, 14.0, 14.0, 5, calibration_ms=20.0),
+        Result("new.benchmark", 99.0, 99.0, 99.0, 5, calibration_ms=20.0),
+    ]
+    regressions = compare(results, baseline)
+    assert len(regressions) == 1 and regressions[0].startswith("scheduler.plan_day")
+    assert compare(results, baseline, threshold=0.5) == []
+
+
+def test_metrics_endpoint_reports_routes_queries_and_slow_sql(client, db_urls, caplog, monkeypatch):
+    from src.core import metrics
+    from src.api.metrics import HTTP_REQUEST_QUERIES
+    before = HTTP_REQUEST_QUERIES.count("GET", "/tasks/{task_id}/prediction")
+    assert client.get("/tasks/1/prediction").status_code == 404
+    assert client.get("/tasks/2/prediction").status_code == 404
+    assert client.get("/no/such/path").status_code == 404
+
+    body = client.get("/metrics")
+    assert body.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text_format = body.text
+    # Route templates, never raw paths, become labels
+    assert ('dayplanner_http_requests_total{method="GET",route="/tasks/{task_id}/prediction",status="404"}'
+            in text_format)
+    assert "/tasks/1/prediction" not in text_format
+    assert 'route="<unmatched>"' in text_format
+    assert ('dayplanner_http_request_duration_seconds_bucket{method="GET",route="/tasks/{task_id}/prediction",'
+            'status="404",le="+Inf"}' in text_format)
+    assert HTTP_REQUEST_QUERIES.count("GET", "/tasks/{task_id}/prediction") == before + 2
+    assert HTTP_REQUEST_QUERIES.total("GET", "/tasks/{task_id}/prediction") > 0
+    assert 'dayplanner_sql_query_duration_seconds_count{statement="select"}' in text_format
+
+    monkeypatch.setattr(metrics, "SLOW_QUERY_SECONDS", 0.0)
+    with caplog.at_level("WARNING", logger="dayplanner.sql.slow"):
+        client.get("/tasks/7/prediction")
+    assert "slow query" in caplog.text
+    assert "params=(7,)" in caplog.text
+
+
+def test_database_settings_merge_file_and_environment(tmp_path):
+    import json
+    from src.core.config import DatabaseSettings, load_database_settings
+    assert load_database_settings({}) == DatabaseSettings()
+    config_file = tmp_path / "db.json"
+    config_file.write_text(json.dumps({
+        "database_url": f"sqlite:///{tmp_path / 'primary.db'}",
+        "replica_urls": [f"sqlite:///{tmp_path / 'replica.db'}"],
+        "pool": {"pool_size": 5, "pool_recycle": 60},
+        "sqlite_pragmas": {"cache_size": -1000},
+    }))
+    settings = load_database_settings({
+        "DAYPLANNER_CONFIG_FILE": str(config_file),
+        "DAYPLANNER_POOL_SIZE": "7",
+        "DAYPLANNER_SQLITE_PRAGMAS": "synchronous=FULL, temp_store=FILE",
+        "DAYPLANNER_READ_STICKY_SECONDS": "0.5",
+    })
+    assert settings.primary_async_url == f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}"
+    assert settings.replica_urls == (f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}",)
+    assert settings.pool == {"pool_size": 7, "pool_recycle": 60}
+    assert settings.sqlite_pragmas == {"cache_size": -1000, "synchronous": "FULL", "temp_store": "FILE"}
+    assert settings.read_sticky_seconds == 0.5
+
+    sync_engine = build_engine(settings.database_url, settings.sqlite_pragmas, **settings.pool)
+    assert (sync_engine.pool.size(), sync_engine.pool._recycle) == (7, 60)
+    with sync_engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 2  # FULL
+        assert conn.exec_driver_sql("PRAGMA cache_size").scalar() == -1000
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"  # default kept
+    sync_engine.dispose()
+    # In-memory SQLite runs on pools without overflow; their sizing options are dropped
+    build_engine("sqlite://", max_overflow=3, pool_timeout=1).dispose()
+    asyncio.run(build_async_engine("sqlite+aiosqlite://", max_overflow=3).dispose())
+
+    with pytest.raises(ValueError):
+        load_database_settings({"DAYPLANNER_POOL_SIZE": "many"})
+    with pytest.raises(ValueError):
+        load_database_settings({"DAYPLANNER_SQLITE_PRAGMAS": "synchronous"})
+    config_file.write_text(json.dumps({"pool_sise": 5}))
+    with pytest.raises(ValueError):
+        load_database_settings({"DAYPLANNER_CONFIG_FILE": str(config_file)})
+
+
+def test_module_engines_use_configured_pool(tmp_path):
+    import os
+    import subprocess
+    import sys
+    from pathlib import Path
+    env = {**os.environ, "DAYPLANNER_DATABASE_URL": f"sqlite:///{tmp_path / 'env.db'}",
+           "DAYPLANNER_POOL_SIZE": "3", "DAYPLANNER_POOL_RECYCLE": "90"}
+    script = ("from src.core.database import engine, async_engine\n"
+              "for e in (engine, async_engine.sync_engine): print(e.pool.size(), e.pool._recycle)")
+    out = subprocess.run([sys.executable, "-c", script], env=env, cwd=Path(__file__).parents[2],
+                         capture_output=True, text=True, check=True).stdout
+    assert out.split() == ["3", "90", "3", "90"]
+
+
+def test_reads_go_to_replicas_with_read_your_writes(tmp_path):
+    from fastapi import Request
+    from sqlalchemy import select
+    from sqlalchemy.orm import Session
+    from src.api.cache import response_cache
+    from src.core.database import client_key
+    from src.core.routing import DatabaseRouter
+    # Two unrelated files stand in for a primary and a replica that has not caught up
+    for name, title in (("primary", "Primary copy"), ("replica", "Replica copy")):
+        sync_engine = build_engine(f"sqlite:///{tmp_path / name}.db")
+        Base.metadata.create_all(bind=sync_engine)
+        with Session(sync_engine) as db:
+            db.add(Task(id=1, title=title, due_date=date.today(), priority=3))
+            db.commit()
+        sync_engine.dispose()
+
+    now = [0.0]
+    router = DatabaseRouter(
+        build_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}"),
+        [build_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")],
+        sticky_seconds=2.0, clock=lambda: now[0]
+    )
+
+    async def session_scope():
+        async with router.session("worker", read_only=True) as db:
+            assert await db.scalar(select(Task.title).where(Task.id == 1)) == "Replica copy"
+            db.add(Task(title="Written", due_date=date.today(), priority=3))
+            await db.commit()
+            # Pinned to the primary from the first write on
+            assert await db.scalar(select(Task.title).where(Task.id == 1)) == "Primary copy"
+        async with router.session("worker") as db:
+            assert await db.scalar(select(Task.title).where(Task.id == 1)) == "Primary copy"
+
+    asyncio.run(session_scope())
+    assert router.wrote_recently("worker") and not router.wrote_recently("someone else")
+
+    async def write_db(request: Request):
+        async with router.session(client_key(request)) as db:
+            yield db
+
+    async def read_db(request: Request):
+        async with router.session(client_key(request), read_only=True) as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = write_db
+    app.dependency_overrides[get_async_read_db] = read_db
+    try:
+        with TestClient(app) as client:
+            assert client.get("/api/tasks/1").json()["title"] == "Replica copy"
+            created = client.post("/api/tasks/", json={"title": "Fresh", "due_date": str(date.today()),
+                                                       "priority": 2}).json()
+            # The writer reads its own write straight away...
+            assert client.get(f"/api/tasks/{created['id']}").json()["title"] == "Fresh"
+            assert client.get("/api/tasks/1").json()["title"] == "Primary copy"
+            # ...and goes back to the replica once the sticky window has passed
+            now[0] += 3
+            stats = response_cache.cache.stats
+            misses = stats.misses
+            titles = [t["title"] for t in client.get("/tasks", params={"limit": 5}).json()]
+            assert titles == ["Replica copy"]
+            # Replica answers right after a write are served but not cached
+            assert [t["title"] for t in client.get("/tasks", params={"limit": 5}).json()] == titles
+            assert stats.misses == misses + 2
+            # What the primary answered is still cached under the current version
+            assert client.get(f"/api/tasks/{created['id']}").json()["title"] == "Fresh"
+    finally:
+        app.dependency_overrides.clear()
+        asyncio.run(router.dispose())
+
+
+def test_sqlite_commits_take_turns(tmp_path):
+    from sqlalchemy import event, func, select
+    from src.core.routing import DatabaseRouter
+    sync_engine = build_engine(f"sqlite:///{tmp_path / 'writers.db'}")
+    Base.metadata.create_all(bind=sync_engine)
+    sync_engine.dispose()
+    primary = build_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'writers.db'}")
+    router = DatabaseRouter(primary)
+    # Transactions holding SQLite's write lock: from their first INSERT to COMMIT
+    writing, most = set(), [0]
+
+    @event.listens_for(primary.sync_engine, "before_cursor_execute")
+    def started(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT"):
+            writing.add(id(conn))
+            most[0] = max(most[0], len(writing))
+
+    @event.listens_for(primary.sync_engine, "commit")
+    def finished(conn):
+        writing.discard(id(conn))
+
+    async def write(i: int):
+        async with router.session() as db:
+            db.add(Task(title=f"Writer {i}", due_date=date.today(), priority=3))
+            await db.commit()
+
+    async def connect():
+        async with router.session() as db:
+            await db.execute(select(Task.id).limit(1))
+            await asyncio.sleep(0.05)
+
+    async def scenario():
+        # Open connections up front so the writers are not spaced out by connecting
+        await asyncio.gather(*(connect() for _ in range(10)))
+        await asyncio.gather(*(write(i) for i in range(20)))
+        async with router.session() as db:
+            return await db.scalar(select(func.count(Task.id)))
+
+    try:
+        assert asyncio.run(scenario()) == 20
+        assert most[0] == 1
+    finally:
+        asyncio.run(router.dispose())
+
+
+def test_sqlite_write_lock_is_held_from_the_first_write(tmp_path):
+    from sqlalchemy import func, insert, select, update
+    from src.core.routing import DatabaseRouter
+    sync_engine = build_engine(f"sqlite:///{tmp_path / 'mixed.db'}")
+    Base.metadata.create_all(bind=sync_engine)
+    sync_engine.dispose()
+    # Shorter than the Core writer keeps SQLite's lock: waiting inside SQLite fails
+    router = DatabaseRouter(build_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'mixed.db'}",
+                                               {"busy_timeout": 100}))
+
+    async def core_writer():
+        async with router.session() as db:
+            await db.execute(insert(Task), [{"title": "Core", "due_date": date.today(), "priority": 3}])
+            await asyncio.sleep(0.3)
+            await db.commit()
+
+    async def orm_writer():
+        await asyncio.sleep(0.05)
+        async with router.session() as db:
+            db.add(Task(title="ORM", due_date=date.today(), priority=3))
+            await db.commit()
+
+    async def sync_writer():
+        await asyncio.sleep(0.05)
+        async with router.session() as db:
+            await db.run_sync(lambda session: session.execute(update(Task).values(priority=1)))
+            await db.commit()
+
+    async def scenario():
+        await asyncio.gather(core_writer(), orm_writer(), sync_writer())
+        async with router.session() as db:
+            return await db.scalar(select(func.count(Task.id)))
+
+    try:
+        assert asyncio.run(scenario()) == 2
+    finally:
+        asyncio.run(router.dispose())
+
+
+def test_task_listing_payload_matches_the_task_schema(client, db_urls):
+    from sqlalchemy.orm import Session
+    with Session(db_urls[0]) as db:
+        work, home = Category(name="Work", color="#0000ff"), Category(name="Home", color="#00ff00")
+        db.add_all([
+            Task(title="Plan \"Q3\"", due_date=date(2030, 1, 7), priority=1, estimated_minutes=30,
+                 actual_minutes=45, categories=[work, home]),
+            Task(title="Café", due_date=date(2030, 1, 8), priority=2, completed=True),
+        ])
+        db.commit()
+
+    # Byte-for-byte what the ORM + Pydantic path produced
+    assert client.get("/tasks", params={"limit": 20}).content == (
+        b'[{"id":1,"title":"Plan \\"Q3\\"","completed":false,"due_date":"2030-01-07","priority":1,'
+        b'"estimated_minutes":30,"actual_minutes":45,"categories":["Work","Home"]},'
+        b'{"id":2,"title":"Caf\xc3\xa9","completed":true,"due_date":"2030-01-08","priority":2,'
+        b'"estimated_minutes":null,"actual_minutes":null,"categories":[]}]'
+    )
+
+
+def test_task_listing_projects_selected_fields(client, async_engine, db_urls):
+    _seed_tasks(db_urls[0], 50)
+
+    full = client.get("/tasks", params={"limit": 50}).json()
+    with query_budget(async_engine, 1):
+        picked = client.get("/tasks", params={"limit": 50, "fields": "title,id,due_date"}).json()
+    assert picked == [{"title": t["title"], "id": t["id"], "due_date": t["due_date"]} for t in full]
+    with_categories = client.get("/tasks", params={"limit": 50, "fields": "categories,id"}).json()
+    assert [list(t) for t in with_categories[:1]] == [["categories", "id"]]
+    assert with_categories == [{"categories": t["categories"], "id": t["id"]} for t in full]
+
+    # Paging works without the cursor columns in the selection
+    titles, cursor = [], None
+    while True:
+        response = client.get("/tasks", params={"limit": 7, "fields": "title", **({"cursor": cursor} if cursor else {})})
+        titles.extend(t["title"] for t in response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert titles == [t["title"] for t in full]
+
+    lines = client.get("/tasks", params={"stream": True, "fields": "id,categories"}).text.splitlines()
+    assert [json.loads(line) for line in lines] == [{"id": t["id"], "categories": t["categories"]} for t in full]
+
+    api = client.get("/api/tasks/", params={"limit": 50}).json()
+    assert api == [{k: t[k] for k in ("id", "title", "completed", "due_date", "priority")} for t in full]
+    assert client.get("/api/tasks/", params={"fields": "priority,id", "limit": 1}).json() == [
+        {"priority": full[0]["priority"], "id": full[0]["id"]}
+    ]
+    assert client.get("/tasks", params={"fields": "id,secret"}).status_code == 400
+    assert client.get("/api/tasks/", params={"fields": "categories"}).status_code == 400
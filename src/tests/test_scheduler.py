@@ -0,0 +1,510 @@
+import asyncio
+import random
+import threading
+import time as clock_time
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.core.database import Base, build_engine
+from src.core.heap_scheduler import HeapScheduler, next_occurrence
+from src.core.scheduler import TaskScheduler
+from src.core.slots import FreeSlotIndex, pack_tasks, working_windows
+from src.core.task_manager import Task, TimeTracking
+
+
+class FakeClock:
+    def __init__(self, start: datetime):
+        self.now = start.timestamp()
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, **kwargs) -> None:
+        self.now += timedelta(**kwargs).total_seconds()
+
+
+@pytest.fixture
+def clock():
+    return FakeClock(datetime(2024, 1, 1, 9, 0))
+
+
+def _drain(scheduler: HeapScheduler, done, timeout: float = 5.0) -> None:
+    # Wait for dispatched jobs to finish, then stop the loop
+    deadline = clock_time.monotonic() + timeout
+    while not done() and clock_time.monotonic() < deadline:
+        clock_time.sleep(0.005)
+    scheduler.stop(wait=True)
+
+
+def test_next_occurrence_clamps_monthly_to_month_end():
+    jan_31 = datetime(2024, 1, 31, 8, 0)
+    feb = next_occurrence(jan_31, "monthly", 31)
+    assert feb == datetime(2024, 2, 29, 8, 0)
+    assert next_occurrence(feb, "monthly", 31) == datetime(2024, 3, 31, 8, 0)
+    assert next_occurrence(datetime(2024, 12, 15), "monthly", 15) == datetime(2025, 1, 15)
+    assert next_occurrence(jan_31, "weekly", 31) == datetime(2024, 2, 7, 8, 0)
+    with pytest.raises(ValueError):
+        next_occurrence(jan_31, "hourly", 31)
+
+
+def test_due_jobs_dispatch_in_priority_order(clock):
+    scheduler = HeapScheduler(max_workers=1, clock=clock)
+    order = []
+    gate = threading.Event()
+    scheduler.add("blocker", gate.wait, datetime(2024, 1, 1, 9, 0), priority=1)
+    for name, priority in (("low", 5), ("high", 1), ("mid", 3)):
+        scheduler.add(name, lambda name=name: order.append(name), datetime(2024, 1, 1, 9, 30), priority=priority)
+
+    scheduler.start()
+    clock.advance(hours=1)
+    scheduler.run_pending()
+    gate.set()
+    _drain(scheduler, lambda: len(order) == 3)
+    assert order == ["high", "mid", "low"]
+    assert len(scheduler) == 0
+
+
+def test_cancelled_job_never_fires(clock):
+    scheduler = HeapScheduler(max_workers=2, clock=clock)
+    fired = []
+    for i in range(10):
+        scheduler.add(f"job-{i}", lambda i=i: fired.append(i), datetime(2024, 1, 1, 9, 5))
+    for i in range(0, 10, 2):
+        assert scheduler.cancel(f"job-{i}")
+    assert not scheduler.cancel("job-0")
+
+    scheduler.start()
+    clock.advance(minutes=10)
+    scheduler.run_pending()
+    _drain(scheduler, lambda: len(fired) == 5)
+    assert sorted(fired) == [1, 3, 5, 7, 9]
+
+
+def test_recurring_job_is_pushed_back_and_skips_missed_runs(clock):
+    scheduler = HeapScheduler(clock=clock)
+    runs = []
+    job = scheduler.add("daily", lambda: runs.append(1), datetime(2024, 1, 1, 9, 30), recurrence="daily")
+
+    scheduler.start()
+    clock.advance(days=3)  # 2024-01-04 09:00: three occurrences missed
+    assert scheduler.run_pending() == 1
+    _drain(scheduler, lambda: runs)
+    assert runs == [1]
+    assert "daily" in scheduler
+    assert job.run_at == datetime(2024, 1, 4, 9, 30)
+    assert scheduler.next_deadline() == datetime(2024, 1, 4, 9, 30).timestamp()
+
+
+def test_replacing_a_job_keeps_one_entry(clock):
+    scheduler = HeapScheduler(clock=clock)
+    fired = []
+    scheduler.add("job", lambda: fired.append("old"), datetime(2024, 1, 1, 9, 5))
+    scheduler.add("job", lambda: fired.append("new"), datetime(2024, 1, 1, 9, 10))
+
+    scheduler.start()
+    clock.advance(hours=1)
+    assert scheduler.run_pending() == 1
+    _drain(scheduler, lambda: fired)
+    assert fired == ["new"]
+
+
+def test_serve_wakes_for_jobs_added_while_idle():
+    async def scenario():
+        scheduler = HeapScheduler(max_workers=2)
+        fired = threading.Event()
+        server = asyncio.create_task(scheduler.serve())
+        await asyncio.sleep(0.01)  # loop is now waiting with no deadline
+        scheduler.add("soon", fired.set, datetime.now() + timedelta(milliseconds=20))
+        for _ in range(100):
+            if fired.is_set():
+                break
+            await asyncio.sleep(0.01)
+        server.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await server
+        return fired.is_set()
+
+    assert asyncio.run(scenario())
+
+
+def test_task_scheduler_validates_and_retries_failures():
+    scheduler = TaskScheduler(max_workers=1)
+    with pytest.raises(ValueError):
+        scheduler.schedule_task("bad", lambda: True, "09:00", priority=9)
+    with pytest.raises(ValueError):
+        scheduler.schedule_task("bad", lambda: True, "09:00", recurring="hourly")
+
+    assert scheduler.schedule_task("once", lambda: True, "09:00")
+    assert scheduler.schedule_task("standup", lambda: False, "09:00", recurring="daily")
+    assert scheduler.engine.get_job("once").recurrence is None
+    assert scheduler.recurring_tasks["standup"]["frequency"] == "daily"
+
+    # A failed run is queued as a one-off retry without touching the recurring job
+    scheduler.engine.get_job("standup").func()
+    assert "standup:retry" in scheduler.engine
+    assert "standup" in scheduler.engine
+    assert scheduler.get_pending_tasks() == {}
+
+    assert scheduler.cancel_task("standup")
+    assert "standup:retry" not in scheduler.engine
+    assert "standup" not in scheduler.engine
+
+
+def _at(hour: int, minute: int = 0, day: int = 1) -> datetime:
+    return datetime(2024, 1, day, hour, minute)
+
+
+def test_free_slot_index_finds_earliest_fitting_gap():
+    windows = working_windows(date(2024, 1, 1), 2)
+    busy = [(_at(9), _at(10)), (_at(9, 30), _at(10, 30)), (_at(11), _at(16, 30)), (_at(9, day=2), _at(9, 15, day=2))]
+    index = FreeSlotIndex(windows, busy)
+
+    assert index.gaps()[:2] == [(_at(10, 30), _at(11)), (_at(16, 30), _at(17))]
+    assert index.find(_at(8), 30) == _at(10, 30)
+    assert index.find(_at(10, 45), 30) == _at(16, 30)
+    assert index.find(_at(10), 45) == _at(9, 15, day=2)
+    assert index.find(_at(9, 15, day=2), 24 * 60) is None
+    with pytest.raises(ValueError):
+        index.find(_at(8), 0)
+
+    index.reserve(_at(10, 30), 30)
+    assert index.find(_at(8), 15) == _at(16, 30)
+    with pytest.raises(ValueError):
+        index.reserve(_at(12), 10)
+    # Reserving inside a gap splits it
+    index.reserve(_at(12, day=2), 60)
+    assert index.find(_at(11, 30, day=2), 60) == _at(13, day=2)
+    assert index.allocate(_at(8), 20, padding=15) == _at(16, 30)
+    assert index.find(_at(8), 20) == _at(9, 15, day=2)
+
+
+def test_free_slot_index_matches_linear_scan():
+    rng = random.Random(3)
+    windows = working_windows(date(2024, 1, 1), 5)
+    busy = []
+    for _ in range(200):
+        start = _at(8) + timedelta(minutes=rng.randrange(0, 5 * 24 * 60, 5))
+        busy.append((start, start + timedelta(minutes=rng.choice([5, 15, 30, 60]))))
+    index = FreeSlotIndex(windows, busy)
+    gaps = index.gaps()
+
+    for _ in range(300):
+        after = _at(8) + timedelta(minutes=rng.randrange(0, 5 * 24 * 60))
+        minutes = rng.choice([5, 10, 30, 45, 90])
+        expected = next(
+            (max(start, after) for start, end in gaps
+             if end - max(start, after) >= timedelta(minutes=minutes)),
+            None,
+        )
+        assert index.find(after, minutes) == expected
+
+
+def test_pack_tasks_orders_by_priority_and_inserts_breaks():
+    tasks = [
+        SimpleNamespace(name="low", priority=5, due_date=date(2024, 1, 1), estimated_minutes=60),
+        SimpleNamespace(name="urgent", priority=1, due_date=date(2024, 1, 1), estimated_minutes=120),
+        SimpleNamespace(name="quick", priority=3, due_date=date(2024, 1, 1), estimated_minutes=None),
+        SimpleNamespace(name="huge", priority=2, due_date=date(2024, 1, 1), estimated_minutes=600),
+    ]
+    index = FreeSlotIndex(working_windows(date(2024, 1, 1)), [(_at(11, 30), _at(12))])
+    planned, unscheduled = pack_tasks(index, tasks, _at(9), break_minutes=10)
+
+    assert [(p.task.name, p.start, p.end) for p in planned] == [
+        ("urgent", _at(9), _at(11)),
+        ("quick", _at(12), _at(12, 30)),
+        ("low", _at(12, 40), _at(13, 40)),
+    ]
+    assert [t.name for t in unscheduled] == ["huge"]
+
+
+def test_optimize_schedule_packs_tasks_around_tracked_time(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'plan.db'}")
+    Base.metadata.create_all(bind=engine)
+    day = date(2030, 1, 7)
+    with Session(engine) as db:
+        tasks = [
+            Task(title="Write report", due_date=day, priority=2, estimated_minutes=90),
+            Task(title="Email", due_date=day, priority=4, estimated_minutes=15),
+            Task(title="Fix bug", due_date=day, priority=1, estimated_minutes=60),
+            Task(title="Done already", due_date=day, priority=1, estimated_minutes=30, completed=True),
+            Task(title="Overdue", due_date=day - timedelta(days=2), priority=1, estimated_minutes=30),
+        ]
+        db.add_all(tasks)
+        db.flush()
+        db.add(TimeTracking(task_id=tasks[0].id, start_time=datetime(2030, 1, 7, 10, 0),
+                            end_time=datetime(2030, 1, 7, 11, 0), duration_minutes=60))
+        db.commit()
+
+        planned, unscheduled = TaskScheduler.plan_day(db, day, break_minutes=15)
+        assert [(p.task.title, p.start.time()) for p in planned] == [
+            ("Fix bug", time(9, 0)),
+            ("Write report", time(11, 0)),
+            ("Email", time(12, 45)),
+        ]
+        assert unscheduled == []
+
+        # The short task backfills the gap the hour-long one no longer fits into
+        ordered = TaskScheduler.optimize_schedule(db, day, include_overdue=True)
+        assert [task.title for task in ordered] == ["Overdue", "Email", "Fix bug", "Write report"]
+    engine.dispose()
+
+
+def test_optimize_schedule_reports_tasks_without_a_positive_estimate(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'plan.db'}")
+    Base.metadata.create_all(bind=engine)
+    day = date(2030, 1, 7)
+    with Session(engine) as db:
+        db.add_all([
+            Task(title="Negative", due_date=day, priority=1, estimated_minutes=-10),
+            Task(title="Zero", due_date=day, priority=2, estimated_minutes=0),
+            Task(title="Unestimated", due_date=day, priority=3),
+            Task(title="Review", due_date=day, priority=4, estimated_minutes=45),
+        ])
+        db.commit()
+
+        planned, unscheduled = TaskScheduler.plan_day(db, day)
+        assert [(p.task.title, p.end - p.start) for p in planned] == [
+            ("Unestimated", timedelta(minutes=30)), ("Review", timedelta(minutes=45)),
+        ]
+        assert [task.title for task in unscheduled] == ["Negative", "Zero"]
+        ordered = TaskScheduler.optimize_schedule(db, day)
+        assert [task.title for task in ordered] == ["Unestimated", "Review", "Negative", "Zero"]
+    engine.dispose()
+
+
+def test_retry_slot_skips_scheduled_and_tracked_time(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'slots.db'}")
+    Base.metadata.create_all(bind=engine)
+    scheduler = TaskScheduler(session_factory=lambda: Session(engine),
+                              workday_start=time(0, 0), workday_end=time(23, 59))
+    now = datetime.now().replace(second=0, microsecond=0) + timedelta(minutes=1)
+    scheduler.engine.add("meeting", lambda: True, now)
+    scheduler.scheduled_tasks["meeting"] = {'time': now.strftime("%H:%M"), 'priority': 1, 'duration': 60}
+    with Session(engine) as db:
+        task = Task(title="Tracked", due_date=now.date(), priority=3)
+        db.add(task)
+        db.flush()
+        db.add(TimeTracking(task_id=task.id, start_time=now + timedelta(minutes=60),
+                            end_time=now + timedelta(minutes=90)))
+        db.commit()
+
+    slot = scheduler._find_next_available_slot(30, 3)
+    assert slot >= now + timedelta(minutes=90)
+    # Exact placement unless the busy hours run past the end of today's window
+    if slot.date() == now.date() and now + timedelta(minutes=120) < datetime.combine(now.date(), time(23, 59)):
+        assert slot == now + timedelta(minutes=90)
+    engine.dispose()
+
+
+def test_rollover_updates_in_chunks_and_keeps_rollup(tmp_path):
+    from src.core.rollover import rollover_overdue_tasks
+    from src.core.rollups import rebuild_rollups
+    from src.core.task_manager import Category, CategoryDailyLoad
+
+    engine = build_engine(f"sqlite:///{tmp_path / 'rollover.db'}")
+    Base.metadata.create_all(bind=engine)
+    today = date(2030, 1, 10)
+    with Session(engine) as db:
+        home = Category(name="Home", color="#00ff00")
+        db.add_all([
+            Task(title=f"Task {i}", due_date=today - timedelta(days=i % 4), priority=3,
+                 completed=i % 5 == 0, estimated_minutes=10, categories=[home] if i % 2 else [])
+            for i in range(40)
+        ])
+        db.commit()
+
+        preview = rollover_overdue_tasks(db, today, chunk_size=7, dry_run=True)
+        assert (preview.overdue, preview.updated, preview.done) == (24, 0, True)
+        assert db.query(Task).filter(Task.due_date < today, Task.completed == False).count() == 24
+
+        progress = []
+        report = rollover_overdue_tasks(
+            db, today, chunk_size=7, progress=lambda r, ids: progress.append((r.updated, len(ids)))
+        )
+        assert (report.overdue, report.updated, report.chunks) == (24, 24, 4)
+        assert progress == [(0, 0), (7, 7), (14, 7), (21, 7), (24, 3), (24, 0)]
+        assert db.query(Task).filter(Task.due_date < today, Task.completed == False).count() == 0
+        assert db.query(Task).filter(Task.due_date < today).count() == 6
+
+        live = sorted(tuple(r) for r in db.query(CategoryDailyLoad.day, CategoryDailyLoad.open_minutes))
+        rebuild_rollups(db.connection())
+        assert sorted(tuple(r) for r in db.query(CategoryDailyLoad.day, CategoryDailyLoad.open_minutes)) == live
+
+        plan = db.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM tasks WHERE completed = 0 AND due_date < '2030-01-10'"
+        )).all()
+        assert "ix_tasks_completed_due_priority_id" in " ".join(row[-1] for row in plan)
+    engine.dispose()
+
+
+def test_scheduled_rollover_records_progress(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'job.db'}")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        db.add_all([Task(title=f"Late {i}", due_date=date.today() - timedelta(days=1), priority=2) for i in range(5)])
+        db.commit()
+        assert len(TaskScheduler.reschedule_overdue_tasks(db, chunk_size=2)) == 5
+
+    scheduler = TaskScheduler(session_factory=lambda: Session(engine))
+    with pytest.raises(ValueError):
+        TaskScheduler().schedule_rollover()
+    assert scheduler.schedule_rollover(dry_run=True)
+    job = scheduler.engine.get_job("rollover-overdue")
+    assert (job.recurrence, job.priority, job.run_at.strftime("%H:%M")) == ("daily", 1, "00:05")
+
+    job.func()
+    assert scheduler.rollover_report.done and scheduler.rollover_report.dry_run
+    assert scheduler.rollover_report.overdue == 0
+    engine.dispose()
+
+
+class FlakyBackend:
+    """Fails the first `failures` sends, optionally taking `delay` seconds per send."""
+
+    def __init__(self, failures: int = 0, delay: float = 0.0):
+        self.failures = failures
+        self.delay = delay
+        self.sent = []
+        self.sent_at = []
+        self._lock = threading.Lock()
+
+    def send(self, notification):
+        clock_time.sleep(self.delay)
+        with self._lock:
+            if self.failures:
+                self.failures -= 1
+                raise OSError("notification service unavailable")
+            self.sent.append(notification)
+            self.sent_at.append(clock_time.monotonic())
+
+
+def test_enqueueing_100k_reminders_does_not_block_and_coalesces():
+    from src.utils.notification import NotificationDispatcher, Reminder
+    backend = FlakyBackend(delay=0.002)
+    dispatcher = NotificationDispatcher({"desktop": backend}, workers=4, coalesce_seconds=0.05)
+    dispatcher.start()
+    started = clock_time.perf_counter()
+    for i in range(100_000):
+        dispatcher.enqueue(Reminder(i, f"Task {i}", recipient=f"user{i % 50}"))
+    enqueue_seconds = clock_time.perf_counter() - started
+    # A synchronous send per reminder would take 200 s at 2 ms each
+    assert enqueue_seconds < 5
+    assert dispatcher.join(timeout=30)
+    dispatcher.stop()
+
+    stats = dispatcher.stats
+    assert (stats.enqueued, stats.delivered, stats.failed) == (100_000, 100_000, 0)
+    assert stats.sent == len(backend.sent) < 10_000
+    assert sorted(r.task_id for n in backend.sent for r in n.reminders) == list(range(100_000))
+    assert all(len({r.recipient for r in n.reminders}) == 1 for n in backend.sent)
+    assert stats.reminders_per_second > 0
+
+
+def test_dispatcher_retries_with_backoff_and_rate_limits(caplog):
+    from src.utils.notification import NotificationDispatcher, Notification, Reminder
+    flaky = FlakyBackend(failures=2)
+    dispatcher = NotificationDispatcher(
+        {"desktop": flaky}, workers=2, coalesce_seconds=0, backoff_seconds=0.01, max_attempts=3
+    )
+    dispatcher.start()
+    dispatcher.enqueue(Reminder(1, "Pay rent"))
+    assert dispatcher.join(timeout=5)
+    assert (dispatcher.stats.retries, dispatcher.stats.sent) == (2, 1)
+    assert flaky.sent[0].message == "It's time to Pay rent!"
+
+    flaky.failures = 5
+    dispatcher.enqueue(Reminder(2, "Call bank"))
+    assert dispatcher.join(timeout=5)
+    assert dispatcher.stats.failed == 1
+    assert any(r.levelname == "WARNING" and "after 3 attempts" in r.getMessage() for r in caplog.records)
+    dispatcher.stop()
+
+    limited = FlakyBackend()
+    dispatcher = NotificationDispatcher({"sms": limited}, workers=4, coalesce_seconds=0, rate_limits={"sms": (20, 2)})
+    dispatcher.start()
+    for i in range(6):
+        dispatcher.enqueue(Reminder(i, f"Task {i}", channel="sms", recipient=f"user{i}"))
+    assert dispatcher.join(timeout=5)
+    dispatcher.stop()
+    assert len(limited.sent) == 6 and dispatcher.stats.throttled > 0
+    # Burst of 2, then one every 50 ms
+    assert limited.sent_at[-1] - limited.sent_at[0] >= 0.15
+
+    with pytest.raises(ValueError):
+        dispatcher.enqueue(Reminder(7, "Nowhere", channel="pager"))
+    summary = Notification("desktop", "me", [Reminder(i, f"T{i}") for i in range(5)])
+    assert (summary.title, summary.message) == ("5 Task Reminders", "T0, T1, T2 (+2 more)")
+
+
+def test_scheduler_enqueues_reminders_for_due_tasks(tmp_path):
+    from src.utils.notification import MemoryBackend, NotificationDispatcher, Reminder
+    engine = build_engine(f"sqlite:///{tmp_path / 'remind.db'}")
+    Base.metadata.create_all(bind=engine)
+    today = date.today()
+    with Session(engine) as db:
+        db.add_all([
+            Task(title="Standup", due_date=today, priority=1),
+            Task(title="Done already", due_date=today, priority=1, completed=True),
+            Task(title="Tomorrow", due_date=today + timedelta(days=1), priority=1),
+        ])
+        db.commit()
+
+    backend = MemoryBackend()
+    notifier = NotificationDispatcher({"desktop": backend}, coalesce_seconds=0)
+    notifier.start()
+    scheduler = TaskScheduler(session_factory=lambda: Session(engine), notifier=notifier)
+    assert scheduler.remind_due_tasks(today) == 1
+    scheduler.schedule_due_reminders("08:00")
+    assert "due-reminders" in scheduler.engine
+
+    job_id = scheduler.schedule_reminder(Reminder(42, "Leave for airport"), datetime.now() - timedelta(seconds=1))
+    scheduler.start()
+    _drain(scheduler.engine, lambda: notifier.stats.enqueued == 2)
+    assert notifier.join(timeout=5)
+    notifier.stop()
+    engine.dispose()
+    assert job_id not in scheduler.engine
+    assert sorted(r.title for r in backend.reminders) == ["Leave for airport", "Standup"]
+    with pytest.raises(ValueError):
+        TaskScheduler().schedule_due_reminders()
+
+
+def test_scheduler_records_lag_durations_and_failures(clock, caplog):
+    from src.core.heap_scheduler import (
+        SCHEDULER_DISPATCH_LAG, SCHEDULER_JOB_FAILURES, SCHEDULER_JOB_SECONDS, SCHEDULER_READY
+    )
+    from src.core.metrics import REGISTRY
+    scheduler = HeapScheduler(max_workers=1, clock=clock)
+    gate = threading.Event()
+    done = []
+
+    def boom():
+        done.append("boom")
+        raise RuntimeError("disk full")
+
+    scheduler.add("metrics-blocker", gate.wait, datetime(2024, 1, 1, 9, 5))
+    scheduler.add("metrics-boom:1", boom, datetime(2024, 1, 1, 9, 5))
+    scheduler.add("metrics-boom:2", lambda: done.append("false") or False, datetime(2024, 1, 1, 9, 5))
+    failures = SCHEDULER_JOB_FAILURES.value("metrics-boom")
+
+    scheduler.start()
+    clock.advance(minutes=10)
+    scheduler.run_pending()
+    assert SCHEDULER_READY.value() >= 2
+    gate.set()
+    with caplog.at_level("ERROR", logger="src.core.heap_scheduler"):
+        _drain(scheduler, lambda: len(done) == 2)
+
+    assert SCHEDULER_JOB_FAILURES.value("metrics-boom") == failures + 2
+    assert SCHEDULER_JOB_SECONDS.count("metrics-boom") >= 2
+    # Fake time: every job fired five minutes late
+    assert SCHEDULER_DISPATCH_LAG.total("metrics-blocker") >= 300
+    assert "Error executing job metrics-boom:1" in caplog.text
+    assert "RuntimeError: disk full" in caplog.text
+    rendered = REGISTRY.render()
+    assert 'dayplanner_scheduler_job_failures_total{job="metrics-boom"}' in rendered
+    assert "# TYPE dayplanner_scheduler_ready_jobs gauge" in rendered
@@ -0,0 +1,190 @@
+import base64
+import codecs
+import csv
+import json
+from collections import deque
+from datetime import date
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+
+
+def encode_cursor(due_date: date, priority: int, task_id: int) -> str:
+    """
+    Encode a keyset position as an opaque, URL-safe cursor.
+
+    Args:
+        due_date: Due date of the last returned task
+        priority: Priority of the last returned task
+        task_id: Id of the last returned task
+
+    Returns:
+        str: Cursor string for the next page
+    """
+    raw = json.dumps([due_date.isoformat(), priority, task_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[date, int, int]]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        due_date, priority, task_id = json.loads(base64.urlsafe_b64decode(padded))
+        return date.fromisoformat(due_date), int(priority), int(task_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def encode_rank_cursor(rank: float, task_id: int) -> str:
+    """Encode a (relevance rank, id) position of a search result page."""
+    raw = json.dumps([rank, task_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_rank_cursor(cursor: Optional[str]) -> Optional[Tuple[float, int]]:
+    """
+    Decode a cursor produced by encode_rank_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, task_id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(rank), int(task_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+async def aiter_text(chunks: AsyncIterator[bytes], encoding: str = "utf-8") -> AsyncIterator[str]:
+    """
+    Decode a stream of byte chunks incrementally; characters split across chunks are kept whole.
+
+    Args:
+        chunks: Async iterator of raw byte chunks (e.g. Request.stream())
+        encoding: Text encoding of the body
+
+    Yields:
+        str: Decoded text, in pieces of arbitrary size
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    async for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+async def _aiter_line_ends(chunks: AsyncIterator[bytes], encoding: str) -> AsyncIterator[str]:
+    # Lines with their "\n" kept (the last one may lack it). Only newly
+    # decoded text is searched for line breaks, so a long line arriving in
+    # many chunks is joined once instead of re-split with every chunk.
+    pending: List[str] = []
+    async for text in aiter_text(chunks, encoding):
+        *lines, rest = text.split("\n")
+        if lines:
+            lines[0] = "".join(pending) + lines[0]
+            pending = []
+            for line in lines:
+                yield line + "\n"
+        if rest:
+            pending.append(rest)
+    if pending:
+        yield "".join(pending)
+
+
+async def aiter_lines(chunks: AsyncIterator[bytes], encoding: str = "utf-8") -> AsyncIterator[str]:
+    """
+    Split a stream of byte chunks into decoded lines without buffering the whole body.
+
+    For line-oriented formats such as NDJSON; CSV records may span lines,
+    use aiter_csv_rows for those.
+
+    Args:
+        chunks: Async iterator of raw byte chunks (e.g. Request.stream())
+        encoding: Text encoding of the body
+
+    Yields:
+        str: Each line with trailing newline characters stripped
+    """
+    async for line in _aiter_line_ends(chunks, encoding):
+        yield line.rstrip("\n").rstrip("\r")
+
+
+class _LineQueue(deque):
+    # Line source for a csv.reader that can be refilled after running dry
+    def __iter__(self) -> Iterator[str]:
+        return self
+
+    def __next__(self) -> str:
+        if not self:
+            raise StopIteration
+        return self.popleft()
+
+
+def _ends_in_quoted_field(line: str, in_quotes: bool) -> bool:
+    # Whether a quoted field is still open after line, given whether one was
+    # open before it. As in csv.reader, a quote opens a field only at the
+    # start of the field; anywhere else in an unquoted field it is literal.
+    i, field_start = 0, True
+    while True:
+        j = line.find('"', i)
+        if in_quotes:
+            if j < 0:
+                return True
+            if line.startswith('"', j + 1):
+                i = j + 2
+                continue
+            in_quotes, i, field_start = False, j + 1, False
+        else:
+            if j < 0:
+                return False
+            in_quotes = (j == i and field_start) or (j > i and line[j - 1] == ",")
+            i, field_start = j + 1, False
+
+
+async def aiter_csv_rows(
+    chunks: AsyncIterator[bytes],
+    encoding: str = "utf-8"
+) -> AsyncIterator[Tuple[int, List[str]]]:
+    """
+    Parse a CSV body streamed as byte chunks with a single csv.reader.
+
+    Lines are handed to the reader once no quoted field is left open, so a
+    quoted field holding line breaks (as csv.writer writes them) is read
+    whole rather than cut where a chunk or line ends. Quote state follows
+    csv.reader: a stray quote inside an unquoted field (24" monitor) is
+    plain text and does not hold back the lines after it.
+
+    Args:
+        chunks: Async iterator of raw byte chunks (e.g. Request.stream())
+        encoding: Text encoding of the body
+
+    Yields:
+        Tuple[int, List[str]]: Line number the record starts on and its fields
+            (an empty list for a blank line)
+    """
+    ready = _LineQueue()
+    reader = csv.reader(ready)
+    in_quotes = False
+    async for line in _aiter_line_ends(chunks, encoding):
+        ready.append(line)
+        in_quotes = _ends_in_quoted_field(line, in_quotes)
+        if in_quotes:
+            continue
+        while ready:
+            start = reader.line_num + 1
+            yield start, next(reader)
+    # An unterminated quoted field at the end runs to the end of the body
+    while ready:
+        start = reader.line_num + 1
+        yield start, next(reader)
@@ -1,9 +1,355 @@
-from plyer import notification
+"""
+Task reminders delivered off the caller's thread.
+
+NotificationDispatcher.enqueue() only appends to an in-memory batch. Reminders
+for the same channel and recipient that arrive within COALESCE_SECONDS of the
+first one are merged into a single message; a timer thread hands finished
+batches to a worker pool, which applies a per-channel rate limit, sends
+through the channel's backend and retries failures with exponential backoff.
+"""
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Protocol, Tuple
+
+# Seconds a batch stays open for more reminders to the same recipient
+COALESCE_SECONDS = 2.0
+
+# Send attempts per message and the backoff between them (doubling, capped)
+NOTIFY_MAX_ATTEMPTS = 5
+NOTIFY_BACKOFF_SECONDS = 1.0
+NOTIFY_MAX_BACKOFF_SECONDS = 60.0
+
+# Titles listed in a coalesced message before "(+N more)"
+SUMMARY_TITLES = 3
+
+DESKTOP_CHANNEL = "desktop"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Reminder:
+    task_id: Optional[int]
+    title: str
+    due_at: Optional[datetime] = None
+    channel: str = DESKTOP_CHANNEL
+    recipient: str = "default"
+
+
+@dataclass
+class Notification:
+    """One message to send, covering one or more reminders."""
+    channel: str
+    recipient: str
+    reminders: List[Reminder] = field(default_factory=list)
+    attempts: int = 0
+
+    @property
+    def title(self) -> str:
+        return "Task Reminder" if len(self.reminders) == 1 else f"{len(self.reminders)} Task Reminders"
+
+    @property
+    def message(self) -> str:
+        if len(self.reminders) == 1:
+            return f"It's time to {self.reminders[0].title}!"
+        titles = ", ".join(r.title for r in self.reminders[:SUMMARY_TITLES])
+        extra = len(self.reminders) - SUMMARY_TITLES
+        return f"{titles} (+{extra} more)" if extra > 0 else titles
+
+
+class NotificationBackend(Protocol):
+    def send(self, notification: Notification) -> None:
+        """Deliver the notification; raise to have it retried."""
+
+
+class DesktopBackend:
+    """OS notifications through plyer."""
+
+    def __init__(self, timeout: int = 10):
+        try:
+            from plyer import notification
+        except ImportError as e:
+            raise RuntimeError("Desktop notifications need the 'plyer' package") from e
+        self._notify = notification.notify
+        self.timeout = timeout
+
+    def send(self, notification: Notification) -> None:
+        self._notify(title=notification.title, message=notification.message, timeout=self.timeout)
+
+
+class LogBackend:
+    """Writes notifications to the log; the fallback when plyer is missing."""
+
+    def __init__(self, logger: Optional[logging.Logger] = None):
+        self.logger = logger or logging.getLogger(__name__)
+
+    def send(self, notification: Notification) -> None:
+        self.logger.info("[%s → %s] %s: %s", notification.channel, notification.recipient,
+                         notification.title, notification.message)
+
+
+class MemoryBackend:
+    """Keeps sent notifications in a list, for tests."""
+
+    def __init__(self):
+        self.sent: List[Notification] = []
+        self._lock = threading.Lock()
+
+    def send(self, notification: Notification) -> None:
+        with self._lock:
+            self.sent.append(notification)
+
+    @property
+    def reminders(self) -> List[Reminder]:
+        with self._lock:
+            return [r for n in self.sent for r in n.reminders]
+
+
+def default_backends() -> Dict[str, NotificationBackend]:
+    """Desktop notifications when plyer is available, the log otherwise."""
+    try:
+        return {DESKTOP_CHANNEL: DesktopBackend()}
+    except RuntimeError:
+        return {DESKTOP_CHANNEL: LogBackend()}
 
 
 def send_notification(task):
-    notification.notify(
-        title =" Task Reminder"
-        message =f+It's time to {task}"!
-        timeout = 10
-    )
\ No newline at end of file
+    """Show a desktop reminder for `task` right away, on the calling thread."""
+    DesktopBackend().send(Notification(DESKTOP_CHANNEL, "default", [Reminder(None, str(task))]))
+
+
+class RateLimiter:
+    """Token bucket: `rate` sends per second with bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token; returns 0, or the seconds to wait before trying again."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+
+@dataclass
+class DispatcherStats:
+    enqueued: int = 0
+    coalesced: int = 0  # reminders merged into an already open batch
+    sent: int = 0  # messages delivered
+    delivered: int = 0  # reminders inside delivered messages
+    retries: int = 0
+    failed: int = 0  # messages dropped after NOTIFY_MAX_ATTEMPTS
+    throttled: int = 0  # sends postponed by a rate limit
+    first_enqueued_at: Optional[float] = None
+    last_sent_at: Optional[float] = None
+
+    @property
+    def reminders_per_second(self) -> float:
+        if self.first_enqueued_at is None or self.last_sent_at is None:
+            return 0.0
+        elapsed = self.last_sent_at - self.first_enqueued_at
+        return self.delivered / elapsed if elapsed > 0 else float(self.delivered)
+
+
+class NotificationDispatcher:
+    """
+    Queue, coalesce, rate limit and deliver reminders in the background.
+
+    Call start() before or after enqueueing and stop() on shutdown; join()
+    waits until everything enqueued so far has been sent or dropped.
+    """
+
+    def __init__(
+        self,
+        backends: Optional[Dict[str, NotificationBackend]] = None,
+        workers: int = 4,
+        coalesce_seconds: float = COALESCE_SECONDS,
+        rate_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+        max_attempts: int = NOTIFY_MAX_ATTEMPTS,
+        backoff_seconds: float = NOTIFY_BACKOFF_SECONDS,
+        max_backoff_seconds: float = NOTIFY_MAX_BACKOFF_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            backends: Backend per channel; defaults to default_backends()
+            workers: Threads sending messages
+            coalesce_seconds: How long a batch collects reminders
+            rate_limits: (sends per second, burst) per channel; unlimited if absent
+            max_attempts: Send attempts before a message is dropped
+            backoff_seconds: Delay before the first retry, doubled after each failure
+            max_backoff_seconds: Upper bound of the retry delay
+        """
+        self.backends = backends if backends is not None else default_backends()
+        self.workers = workers
+        self.coalesce_seconds = coalesce_seconds
+        self.limiters = {
+            channel: RateLimiter(rate, burst, clock) for channel, (rate, burst) in (rate_limits or {}).items()
+        }
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.stats = DispatcherStats()
+        self._clock = clock
+        self._open: Dict[Tuple[str, str], Notification] = {}
+        # (due, seq, key of an open batch or a notification to retry)
+        self._timers: List[Tuple[float, int, object]] = []
+        self._seq = itertools.count()
+        self._ready: "queue.Queue[Optional[Notification]]" = queue.Queue()
+        self._outstanding = 0
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._running = False
+
+    @property
+    def open_batches(self) -> int:
+        return len(self._open)
+
+    def enqueue(self, reminder: Reminder) -> None:
+        """
+        Add a reminder to its recipient's open batch. Never blocks on delivery.
+
+        Raises:
+            ValueError: If no backend is configured for the reminder's channel
+        """
+        if reminder.channel not in self.backends:
+            raise ValueError(f"No notification backend for channel: {reminder.channel}")
+        key = (reminder.channel, reminder.recipient)
+        with self._cond:
+            now = self._clock()
+            stats = self.stats
+            stats.enqueued += 1
+            if stats.first_enqueued_at is None:
+                stats.first_enqueued_at = now
+            batch = self._open.get(key)
+            if batch is not None:
+                batch.reminders.append(reminder)
+                stats.coalesced += 1
+                return
+            self._open[key] = Notification(reminder.channel, reminder.recipient, [reminder])
+            self._outstanding += 1
+            self._push(now + self.coalesce_seconds, key)
+
+    def enqueue_many(self, reminders: List[Reminder]) -> None:
+        for reminder in reminders:
+            self.enqueue(reminder)
+
+    def _push(self, due: float, item: object) -> None:
+        # Caller holds self._cond
+        entry = (due, next(self._seq), item)
+        heapq.heappush(self._timers, entry)
+        if self._timers[0] is entry:
+            self._cond.notify_all()
+
+    def start(self) -> None:
+        """Start the timer thread and the worker pool."""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._threads = [threading.Thread(target=self._run_timers, name="notify-timers", daemon=True)]
+        self._threads += [
+            threading.Thread(target=self._run_worker, name=f"notify-{i}", daemon=True) for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, drain: bool = True, timeout: Optional[float] = None) -> None:
+        """
+        Stop the threads, first delivering what is queued if drain is True.
+
+        Open batches are flushed immediately rather than waiting out their
+        coalescing window.
+        """
+        if drain and self._running:
+            with self._cond:
+                for key in list(self._open):
+                    self._push(self._clock(), key)
+            self.join(timeout)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for _ in range(self.workers):
+            self._ready.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every enqueued reminder is sent or dropped; False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._outstanding == 0, timeout)
+
+    def _run_timers(self) -> None:
+        with self._cond:
+            while self._running:
+                now = self._clock()
+                while self._timers and self._timers[0][0] <= now:
+                    _, _, item = heapq.heappop(self._timers)
+                    if isinstance(item, Notification):
+                        self._ready.put(item)
+                    else:
+                        batch = self._open.pop(item, None)
+                        if batch is not None:  # already flushed by stop()
+                            self._ready.put(batch)
+                wait = self._timers[0][0] - now if self._timers else None
+                self._cond.wait(wait)
+
+    def _run_worker(self) -> None:
+        while True:
+            notification = self._ready.get()
+            if notification is None:
+                return
+            limiter = self.limiters.get(notification.channel)
+            wait = limiter.reserve() if limiter is not None else 0.0
+            if wait > 0:
+                with self._cond:
+                    self.stats.throttled += 1
+                    self._push(self._clock() + wait, notification)
+                continue
+            self._deliver(notification)
+
+    def _deliver(self, notification: Notification) -> None:
+        try:
+            self.backends[notification.channel].send(notification)
+        except Exception as e:
+            notification.attempts += 1
+            with self._cond:
+                if notification.attempts < self.max_attempts:
+                    self.stats.retries += 1
+                    delay = min(self.backoff_seconds * 2 ** (notification.attempts - 1), self.max_backoff_seconds)
+                    self._push(self._clock() + delay, notification)
+                    return
+                self.stats.failed += 1
+                # Logged before _finish() so join() returns after the drop is reported
+                logger.warning("Dropping %s notification to %s after %d attempts: %s",
+                               notification.channel, notification.recipient, notification.attempts, e)
+                self._finish()
+            return
+        with self._cond:
+            self.stats.sent += 1
+            self.stats.delivered += len(notification.reminders)
+            self.stats.last_sent_at = self._clock()
+            self._finish()
+
+    def _finish(self) -> None:
+        # Caller holds self._cond
+        self._outstanding -= 1
+        if self._outstanding == 0:
+            self._cond.notify_all()